@@ -1,54 +1,50 @@
+import time
+_INICIO_ARRANQUE = time.perf_counter()
+
 import flet as ft
 import os
 import sys
 import threading
-import time
 from datetime import datetime
-import msvcrt
 from http.server import BaseHTTPRequestHandler, HTTPServer
 import json
 import logging
-from logging.handlers import RotatingFileHandler
+from typing import NamedTuple
+from src.infrastructure.logging_pipeline import configurar_logging
 
 
-LOG_DIR = r"C:\KioscoPP\logs"
-os.makedirs(LOG_DIR, exist_ok=True)
-log_filename = f"app-{datetime.now().strftime('%Y-%m-%d')}.log"
-LOG_FILE = os.path.join(LOG_DIR, log_filename)
-
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+LOG_DIR = os.getenv("KIOSCO_LOG_DIR", r"C:\KioscoPP\logs")
 
+try:
+    with open("config.json", "r") as f:
+        _config_logging = json.load(f)
+except (OSError, ValueError):
+    _config_logging = {}
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s | %(levelname)s | %(name)s | %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    handlers=[
-        logging.FileHandler(LOG_FILE, encoding='utf-8'),
-        #logging.StreamHandler(sys.stdout),
-    ]
-)
-
-# console_handler = logging.StreamHandler()
-# console_handler.setFormatter(fmt)
-# logger.addHandler(console_handler)
+# Los handlers solo encolan; el archivo (app-AAAA-MM-DD.log, rotado por día y tamaño) lo escribe un hilo aparte.
+escritor_logs = configurar_logging(LOG_DIR, _config_logging)
+logger = logging.getLogger()
 
 # === Watchdog integration flags (optional, defensive) ===
 ENABLE_HEARTBEAT = os.getenv("ENABLE_HEARTBEAT", "1") == "1"
 ENABLE_HEALTH_HTTP = os.getenv("ENABLE_HEALTH_HTTP", "1") == "1"
-ENABLE_FS_WATCH = os.getenv("ENABLE_FS_WATCH", "0") == "1"  # off by default
+ENABLE_FS_WATCH = os.getenv("ENABLE_FS_WATCH", "1") == "1"
 
 HEARTBEAT_PATH = r"C:\\KioscoPP\\heartbeat.txt"
 HEARTBEAT_INTERVAL_SEC = 10
 _HEARTBEAT_STOP = threading.Event()
 
+# Rutas que solo se muestran después de iniciar sesión desde la pulsación larga sobre el logo
+RUTAS_ADMIN = ("/admin/impresion",)
+
 # Lockfile for single-instance
 LOCKFILE_PATH = r"C:\\KioscoPP\\app.lock"
 _lockfile_handle = None
 
 def acquire_lock_or_exit():
     global _lockfile_handle
+    import msvcrt
+
     try:
         os.makedirs(os.path.dirname(LOCKFILE_PATH), exist_ok=True)
         _lockfile_handle = open(LOCKFILE_PATH, "a+")
@@ -78,17 +74,42 @@ def start_heartbeat():
     threading.Thread(target=_beat, daemon=True).start()
 
 
-def start_health_server(port: int = 35791):
+def start_health_server(port: int = 35791, estado_extra=None, verificar=None, metricas=None):
+    """/health es de readiness: 503 si `verificar()` reporta problemas (o falla, p. ej. durante el arranque).
+    /metrics devuelve `metricas()` en formato de texto de Prometheus."""
     if not ENABLE_HEALTH_HTTP:
         return None
 
     class HealthHandler(BaseHTTPRequestHandler):
+        def _responder(self, codigo: int, tipo: str, cuerpo: str):
+            self.send_response(codigo)
+            self.send_header("Content-Type", tipo)
+            self.end_headers()
+            self.wfile.write(cuerpo.encode("utf-8"))
+
         def do_GET(self):
             if self.path == "/health":
-                self.send_response(200)
-                self.send_header("Content-Type", "application/json")
-                self.end_headers()
-                self.wfile.write(b'{"status":"ok"}')
+                estado = {"status": "ok"}
+                if estado_extra:
+                    try:
+                        estado.update(estado_extra())
+                    except Exception as e:
+                        estado["detalle_error"] = str(e)
+                if verificar:
+                    try:
+                        problemas = verificar()
+                    except Exception as e:
+                        problemas = [f"verificación fallida: {e}"]
+                    if problemas:
+                        estado["status"] = "degradado"
+                        estado["problemas"] = problemas
+                codigo = 200 if estado["status"] == "ok" else 503
+                self._responder(codigo, "application/json", json.dumps(estado))
+            elif self.path == "/metrics" and metricas:
+                try:
+                    self._responder(200, "text/plain; version=0.0.4; charset=utf-8", metricas())
+                except Exception as e:
+                    self._responder(500, "text/plain; charset=utf-8", f"error: {e}\n")
             else:
                 self.send_response(404)
                 self.end_headers()
@@ -99,61 +120,59 @@ def start_health_server(port: int = 35791):
     try:
         server = HTTPServer(("127.0.0.1", port), HealthHandler)
         threading.Thread(target=server.serve_forever, daemon=True).start()
-        print(f"[HEALTH] Servidor de healthcheck en http://127.0.0.1:{port}/health")
+        print(f"[HEALTH] Servidor de healthcheck en http://127.0.0.1:{port}/health (métricas en /metrics)")
         return server
     except OSError as e:
         print(f"[HEALTH] No se pudo iniciar en puerto {port}: {e}. Desactivado.")
         return None
 
 
-def start_fs_watch(path: str, on_change):
-    if not ENABLE_FS_WATCH:
-        print("[FS] Watch de archivos desactivado por configuración.")
-        return None
-    try:
-        from watchdog.observers import Observer
-        from watchdog.events import FileSystemEventHandler
-    except Exception:
-        print("[FS] Librería 'watchdog' no instalada; watch desactivado.")
-        return None
-
-    class _Handler(FileSystemEventHandler):
-        def __init__(self, cb):
-            self.cb = cb
-        def on_modified(self, event):
-            try:
-                self.cb(event.src_path)
-            except Exception as e:
-                print(f"[FS] Error en callback de cambio: {e}")
-
-    try:
-        observer = Observer()
-        observer.schedule(_Handler(on_change), path, recursive=False)
-        observer.start()
-        print(f"[FS] Observando cambios en: {path}")
-        return observer
-    except Exception as e:
-        print(f"[FS] No se pudo iniciar file watch: {e}")
-        return None
-
 from src.application.use_cases import PedidoUseCases, AuthUseCases, FinalizarPedidoUseCases
+from src.application.pricing import PricingEngine, COTIZACION_VACIA
+from src.application.agenda_entregas import AgendaEntregas
+from src.infrastructure.price_matrix import MatrizPrecios
+from src.infrastructure.tracing import Trazador
+from src.infrastructure.metrics import RegistroMetricas, VentanaEventos, observar_trazas, metricas_de_proceso
 from src.infrastructure.persistence.memory_repository import PedidoRepositoryEnMemoria
+from src.infrastructure.persistence.sqlite_pool import SQLiteConnectionPool
+from src.infrastructure.persistence.config_db_watcher import ConfigDbWatcher
 from src.infrastructure.persistence.sqlite_repository import (
-    TamanoRepositorySQLite, CategoriaRepositorySQLite,
-    TipoPanRepositorySQLite, TipoFormaRepositorySQLite,
-    TipoRellenoRepositorySQLite, TipoCoberturaRepositorySQLite,
     FinalizarPedidoRepositorySQLite, ImagenGaleriaRepositorySQLite,
-    TipoColorRepositorySQLite, HorarioEntregaRepositorySQLite, DiaFestivoRepositorySQLite,
-    PastelConfiguradoRepositorySQLite, ExtraRepositorySQLite, ExtraChorreadoRepositorySQLite,
-    TamanoRectangularRepositorySQLite
+    HorarioEntregaRepositorySQLite, DiaFestivoRepositorySQLite, OcupacionEntregaRepositorySQLite,
+    SucursalRepositorySQLite,
+)
+from src.infrastructure.persistence.catalog_snapshot import (
+    CatalogSnapshotStore, TamanoRepositorySnapshot, CategoriaRepositorySnapshot,
+    TipoPanRepositorySnapshot, TipoFormaRepositorySnapshot,
+    TipoRellenoRepositorySnapshot, TipoCoberturaRepositorySnapshot,
+    TipoColorRepositorySnapshot, PastelConfiguradoRepositorySnapshot, ExtraRepositorySnapshot,
+    ExtraChorreadoRepositorySnapshot, TamanoRectangularRepositorySnapshot
 )
 from src.infrastructure.flet_adapter import views
-from src.infrastructure.persistence.api_repository import FinalizarPedidoRepositoryAPI
-from src.infrastructure.persistence.composite_repository import FinalizarPedidoRepositoryComposite
+from src.infrastructure.flet_adapter.view_cache import CacheVistas
+from src.infrastructure.flet_adapter.prefetch import PrefetchVistas, VistaCacheable
+from src.infrastructure.persistence.outbox_repository import OutboxRepositorySQLite
+from src.infrastructure.identidad_kiosco import IdentidadKiosco
+from src.infrastructure.asset_pipeline import AssetPipeline
+from src.infrastructure.carga_diferida import SubsistemaDiferido
+from src.infrastructure.perfil_arranque import PerfilArranque
 from src.infrastructure.flet_adapter.controles_comunes import crear_boton_navegacion
 
+perfil_arranque = PerfilArranque(_INICIO_ARRANQUE)
+perfil_arranque.marcar("imports")
+
+
+class SubsistemaCobro(NamedTuple):
+    """Lo que solo se usa al cobrar: HTTP (requests), impresión (reportlab) y sus hilos."""
+    sesion_http: object
+    finalizar_repo_api: object
+    sync_worker: object
+    cola_impresion: object
+    finalizar_pedido_use_cases: FinalizarPedidoUseCases
+
 
 def main(page: ft.Page):
+    perfil_arranque.marcar("main")
     page.title = "Pastelería Pepe"
 
     page.window.width = 1920
@@ -165,19 +184,11 @@ def main(page: ft.Page):
 
     start_heartbeat()
 
-    health_server = start_health_server(35791)
-
-    fs_observer = None
-    def _on_fs_change(path_changed):
-        try:
-            page.snack_bar = ft.SnackBar(ft.Text(f"Actualizado: {os.path.basename(path_changed)}"))
-            page.snack_bar.open = True
-            page.update()
-        except Exception as e:
-            print(f"[FS] Error notificando cambio: {e}")
-
-    if ENABLE_FS_WATCH:
-        fs_observer = start_fs_watch(r"C:\\KioscoPP", _on_fs_change)
+    health_server = start_health_server(
+        35791, estado_extra=lambda: _estado_extra(),
+        verificar=lambda: _verificar_listo(),
+        metricas=lambda: registro_metricas.exponer(),
+    )
 
     page.fonts = {
         "Bebas Neue": "fuentes/BebasNeue-Regular.ttf",
@@ -188,21 +199,25 @@ def main(page: ft.Page):
     }
 
     db_path = r"C:/KioscoPP/config.db"
+    outbox_path = r"C:/KioscoPP/outbox.db"
+    db_pool = SQLiteConnectionPool(db_path, adjuntos={"outbox": outbox_path})
+    catalogo = CatalogSnapshotStore(db_pool)
     pedido_repo = PedidoRepositoryEnMemoria()
-    tamano_repo = TamanoRepositorySQLite(db_path)
-    categoria_repo = CategoriaRepositorySQLite(db_path)
-    tipo_pan_repo = TipoPanRepositorySQLite(db_path)
-    tipo_forma_repo = TipoFormaRepositorySQLite(db_path)
-    tipo_relleno_repo = TipoRellenoRepositorySQLite(db_path)
-    tipo_cobertura_repo = TipoCoberturaRepositorySQLite(db_path)
-    imagen_galeria_repo = ImagenGaleriaRepositorySQLite(db_path)
-    tipo_color_repo = TipoColorRepositorySQLite(db_path)
-    horario_repo = HorarioEntregaRepositorySQLite(db_path)
-    dia_festivo_repo = DiaFestivoRepositorySQLite(db_path)
-    pastel_config_repo = PastelConfiguradoRepositorySQLite(db_path)
-    extra_repo = ExtraRepositorySQLite(db_path)
-    extra_chorreado_repo = ExtraChorreadoRepositorySQLite(db_path)
-    tamano_rectangular_repo = TamanoRectangularRepositorySQLite(db_path)
+    tamano_repo = TamanoRepositorySnapshot(catalogo)
+    categoria_repo = CategoriaRepositorySnapshot(catalogo)
+    tipo_pan_repo = TipoPanRepositorySnapshot(catalogo)
+    tipo_forma_repo = TipoFormaRepositorySnapshot(catalogo)
+    tipo_relleno_repo = TipoRellenoRepositorySnapshot(catalogo)
+    tipo_cobertura_repo = TipoCoberturaRepositorySnapshot(catalogo)
+    imagen_galeria_repo = ImagenGaleriaRepositorySQLite(db_pool)
+    tipo_color_repo = TipoColorRepositorySnapshot(catalogo)
+    horario_repo = HorarioEntregaRepositorySQLite(db_pool)
+    dia_festivo_repo = DiaFestivoRepositorySQLite(db_pool)
+    pastel_config_repo = PastelConfiguradoRepositorySnapshot(catalogo)
+    extra_repo = ExtraRepositorySnapshot(catalogo)
+    extra_chorreado_repo = ExtraChorreadoRepositorySnapshot(catalogo)
+    tamano_rectangular_repo = TamanoRectangularRepositorySnapshot(catalogo)
+    identidad = IdentidadKiosco(SucursalRepositorySQLite(db_pool))
 
     config = {}
     default_api_url = "http://localhost:8000/api/pedidos"
@@ -217,30 +232,227 @@ def main(page: ft.Page):
         logger.warning(f"ADVERTENCIA: No se encontró config.json. Usando URL por defecto: {API_URL_PEDIDOS}")
 
 
-    finalizar_repo_api = FinalizarPedidoRepositoryAPI(api_url=API_URL_PEDIDOS, db_path=db_path)
-    finalizar_pedido_repo = FinalizarPedidoRepositorySQLite(db_path)
+    finalizar_pedido_repo = FinalizarPedidoRepositorySQLite(db_pool)
 
     auth_use_cases = AuthUseCases()
+    pricing = PricingEngine(pastel_config_repo)
+    ruta_matriz_precios = r"C:/KioscoPP/matriz_precios.json"
+
+    def _actualizar_matriz_precios():
+        configuraciones = catalogo.actual.configuraciones.values()
+        pricing.usar_matriz(MatrizPrecios.vigente(ruta_matriz_precios, configuraciones))
+
+    _actualizar_matriz_precios()
+    # 0 = sin límite de pedidos por rango de hora.
+    agenda_entregas = AgendaEntregas(
+        horario_repo, dia_festivo_repo, OcupacionEntregaRepositorySQLite(db_pool),
+        capacidad_por_rango=int(config.get("capacidad_por_rango", 0)),
+    )
     pedido_use_cases = PedidoUseCases(
         pedido_repo, tamano_repo, categoria_repo,
         tipo_pan_repo, tipo_forma_repo, tipo_relleno_repo,
         tipo_cobertura_repo, finalizar_pedido_repo, imagen_galeria_repo,
-        tipo_color_repo, horario_repo, dia_festivo_repo, pastel_config_repo,
-        extra_repo, extra_chorreado_repo, tamano_rectangular_repo,
+        tipo_color_repo, agenda_entregas, pastel_config_repo,
+        extra_repo, extra_chorreado_repo, tamano_rectangular_repo, pricing,
     )
 
-    finalizar_repo_compuesto = FinalizarPedidoRepositoryComposite(
-        sqlite_repo=finalizar_pedido_repo,
-        api_repo=finalizar_repo_api
-    )
+    # Trazas de latencia por interacción ("trazas_activas": false las apaga sin quitar la instrumentación).
+    trazador = Trazador(r"C:/KioscoPP/trazas", activo=bool(config.get("trazas_activas", True)))
+    trazador.iniciar()
+    trazador.instrumentar(page, "update", metodos=["update"], prefijo="page.")
+    trazador.instrumentar(views, "vista", metodos=[m for m in dir(views) if m.startswith("vista_")])
+    trazador.instrumentar(pedido_use_cases, "caso_uso", nuevas_correlaciones=("iniciar_nuevo_pedido",))
+    for repo in (tamano_repo, categoria_repo, tipo_pan_repo, tipo_forma_repo, tipo_relleno_repo,
+                 tipo_cobertura_repo, imagen_galeria_repo, tipo_color_repo, horario_repo, dia_festivo_repo,
+                 pastel_config_repo, extra_repo, extra_chorreado_repo, tamano_rectangular_repo,
+                 finalizar_pedido_repo):
+        trazador.instrumentar(repo, "repo")
+
+    cache_vistas = CacheVistas()
+
+    # Derivados de imágenes al tamaño de cada ranura; al terminar se reconstruyen las vistas con ellos.
+    assets = AssetPipeline(r"C:/KioscoPP/img")
+    views.configurar_assets(assets)
+
+    def _generar_derivados():
+        assets.iniciar_en_segundo_plano(
+            lambda: [img.ruta for img in imagen_galeria_repo.buscar()],
+            al_terminar=cache_vistas.invalidar,
+        )
 
-    finalizar_pedido_use_cases = FinalizarPedidoUseCases(
-        pedido_repo=pedido_repo,
-        finalizar_repo=finalizar_repo_compuesto,
-        categoria_repo=categoria_repo,
-        extra_repo=extra_repo,
-        pastel_config_repo=pastel_config_repo,
-    )
+    _generar_derivados()
+
+    def _pedido():
+        return pedido_use_cases.obtener_pedido_actual()
+
+    # Vistas que se reutilizan entre navegaciones; la clave son los datos del pedido que cambian su contenido
+    # (categorías y formas dependen del tamaño, los panes además de la forma elegida).
+    vistas_cacheables = {
+        "/": VistaCacheable(lambda: None, lambda: views.vista_bienvenida(page)),
+        "/seleccion": VistaCacheable(lambda: None, lambda: views.vista_seleccion(page)),
+        "/tamano": VistaCacheable(lambda: None, lambda: views.vista_tamano(page, pedido_use_cases)),
+        "/categorias": VistaCacheable(lambda: _pedido().id_tamano,
+                                      lambda: views.vista_categorias(page, pedido_use_cases)),
+        "/forma": VistaCacheable(lambda: (_pedido().id_categoria, _pedido().tamano_pastel),
+                                 lambda: views.vista_forma(page, pedido_use_cases)),
+        "/pan": VistaCacheable(lambda: (_pedido().id_categoria, _pedido().tipo_forma, _pedido().id_tamano),
+                               lambda: views.vista_pan(page, pedido_use_cases)),
+        "/relleno": VistaCacheable(lambda: (_pedido().id_categoria, _pedido().tipo_pan),
+                                   lambda: views.vista_relleno(page, pedido_use_cases)),
+        "/cobertura": VistaCacheable(lambda: (_pedido().id_categoria, _pedido().tipo_pan),
+                                     lambda: views.vista_cobertura(page, pedido_use_cases)),
+    }
+    siguiente_paso = {
+        "/": "/seleccion", "/fecha": "/tamano", "/tamano": "/categorias", "/categorias": "/forma",
+        "/forma": "/pan", "/pan": "/relleno", "/relleno": "/cobertura",
+    }
+    prefetch_vistas = PrefetchVistas(cache_vistas, vistas_cacheables, siguiente_paso)
+    pedido_use_cases.suscribir_seleccion(lambda: prefetch_vistas.programar(page.route))
+    config_watcher = None
+
+    def _on_config_db_change():
+        catalogo.recargar()
+        _actualizar_matriz_precios()
+        identidad.recargar()
+        imagen_galeria_repo.asegurar_indice()
+        pedido_use_cases.invalidar_cache_catalogo()
+        cache_vistas.invalidar()
+        _generar_derivados()
+        try:
+            page.snack_bar = ft.SnackBar(ft.Text("Catálogo actualizado"))
+            page.snack_bar.open = True
+            page.update()
+        except Exception as e:
+            logger.warning(f"[FS] Error notificando cambio: {e}")
+
+    if ENABLE_FS_WATCH:
+        config_watcher = ConfigDbWatcher(db_pool)
+        config_watcher.suscribir(_on_config_db_change)
+        config_watcher.iniciar()
+    else:
+        logger.info("[FS] Watch de config.db desactivado por configuración.")
+
+    outbox_repo = OutboxRepositorySQLite(db_pool, esquema="outbox")
+    registro_metricas = RegistroMetricas()
+    observar_trazas(registro_metricas, trazador)
+    pedidos_guardados = registro_metricas.contador("kiosco_pedidos_total", "Pedidos guardados desde el inicio.")
+    pedidos_ultima_hora = VentanaEventos(3600)
+
+    def _pedido_guardado(ticket):
+        pedidos_guardados.incrementar()
+        pedidos_ultima_hora.registrar()
+
+    def _crear_subsistema_cobro() -> SubsistemaCobro:
+        # Imports pesados (requests, reportlab): se cargan después del primer frame, no al arrancar.
+        from src.infrastructure.persistence.api_repository import FinalizarPedidoRepositoryAPI
+        from src.infrastructure.persistence.http_session import SesionHttp
+        from src.infrastructure.persistence.composite_repository import FinalizarPedidoRepositoryComposite
+        from src.infrastructure.sync_worker import OutboxSyncWorker
+        from src.infrastructure.printing_service import PrintingService
+        from src.infrastructure.printer_backends import ImpresoraEscPos, ImpresoraPDF, crear_salida
+        from src.infrastructure.print_queue import ColaImpresion
+
+        sesion_http = SesionHttp(
+            timeout_conexion_seg=float(config.get("api_timeout_conexion_seg", 3.05)),
+            timeout_lectura_seg=float(config.get("api_timeout_lectura_seg", 15.0)),
+            tamano_pool=int(config.get("api_tamano_pool", 4)),
+        )
+        finalizar_repo_api = FinalizarPedidoRepositoryAPI(
+            api_url=API_URL_PEDIDOS, identidad=identidad, sesion=sesion_http,
+            api_url_lote=config.get("api_url_pedidos_lote"),
+        )
+        trazador.instrumentar(finalizar_repo_api, "api", metodos=["enviar_payload", "enviar_lote"])
+        sync_worker = OutboxSyncWorker(outbox_repo, finalizar_repo_api)
+        sync_worker.iniciar()
+
+        finalizar_repo_compuesto = FinalizarPedidoRepositoryComposite(
+            sqlite_repo=finalizar_pedido_repo,
+            api_repo=finalizar_repo_api,
+            outbox=outbox_repo,
+            sync_worker=sync_worker,
+        )
+
+        # "impresora_backend": "escpos" imprime directo en la térmica ("impresora_destino": tcp://ip:9100,
+        # spooler:NombreImpresora o la ruta del puerto) y deja el PDF como respaldo; "pdf" usa el visor de Windows.
+        if config.get("impresora_backend", "pdf") == "escpos":
+            printing_service = PrintingService(
+                identidad,
+                backend=ImpresoraEscPos(crear_salida(config.get("impresora_destino", "spooler:")),
+                                        columnas=int(config.get("impresora_columnas", 48))),
+                respaldo=ImpresoraPDF(),
+            )
+        else:
+            printing_service = PrintingService(identidad, backend=ImpresoraPDF())
+        logger.info(f"INFO: Backend de impresión: {printing_service.backend.nombre}")
+        cola_impresion = ColaImpresion(printing_service)
+        cola_impresion.iniciar()
+
+        finalizar_pedido_use_cases = FinalizarPedidoUseCases(
+            pedido_repo=pedido_repo,
+            finalizar_repo=finalizar_repo_compuesto,
+            categoria_repo=categoria_repo,
+            extra_repo=extra_repo,
+            pricing=pricing,
+            cola_impresion=cola_impresion,
+            agenda=agenda_entregas,
+        )
+        trazador.instrumentar(finalizar_pedido_use_cases, "caso_uso")
+        finalizar_pedido_use_cases.suscribir_pedido_guardado(_pedido_guardado)
+        perfil_arranque.marcar("cobro_listo")
+        return SubsistemaCobro(sesion_http, finalizar_repo_api, sync_worker, cola_impresion,
+                               finalizar_pedido_use_cases)
+
+    cobro = SubsistemaDiferido("cobro", _crear_subsistema_cobro)
+
+    def _de_cobro(leer):
+        """Lector de métrica que no fuerza la carga del subsistema de cobro (None mientras no esté listo)."""
+        def _leer():
+            subsistema = cobro.si_listo()
+            return leer(subsistema) if subsistema else None
+        return _leer
+
+    registro_metricas.medidor("kiosco_pedidos_ultima_hora", "Pedidos guardados en la última hora.",
+                              pedidos_ultima_hora.cantidad)
+    registro_metricas.medidor("kiosco_api_sync_enviados_total", "Pedidos sincronizados con el web service.",
+                              _de_cobro(lambda c: c.sync_worker.enviados), tipo="counter")
+    registro_metricas.medidor("kiosco_api_sync_fallidos_total", "Intentos de sincronización fallidos.",
+                              _de_cobro(lambda c: c.sync_worker.fallidos), tipo="counter")
+    registro_metricas.medidor("kiosco_outbox_pendientes", "Pedidos en la bandeja de salida sin sincronizar.",
+                              outbox_repo.profundidad)
+    registro_metricas.medidor("kiosco_impresion_pendientes", "Tickets en la cola de impresión.",
+                              _de_cobro(lambda c: c.cola_impresion.profundidad()))
+    registro_metricas.medidor("kiosco_impresion_fallidas", "Tickets cuya impresión falló.",
+                              _de_cobro(lambda c: len(c.cola_impresion.fallidos())))
+    registro_metricas.medidor("kiosco_db_conexiones_en_uso", "Conexiones SQLite prestadas.",
+                              lambda: db_pool.estadisticas()["en_uso"])
+    registro_metricas.medidor("kiosco_logs_en_cola", "Registros de log pendientes de escribir.",
+                              escritor_logs.profundidad)
+    registro_metricas.medidor("kiosco_arranque_primer_frame_segundos", "Tiempo del inicio del proceso al primer frame.",
+                              lambda: perfil_arranque.segundos("primer_frame"))
+    metricas_de_proceso(registro_metricas)
+
+    max_outbox_pendientes = int(config.get("health_max_outbox_pendientes", 50))
+
+    def _estado_extra() -> dict:
+        estado = {"outbox_pendientes": outbox_repo.profundidad(), "logs_en_cola": escritor_logs.profundidad()}
+        subsistema = cobro.si_listo()
+        if subsistema:
+            estado["impresiones_pendientes"] = subsistema.cola_impresion.profundidad()
+            estado["impresiones_fallidas"] = len(subsistema.cola_impresion.fallidos())
+        else:
+            estado["cobro"] = f"error: {cobro.error}" if cobro.error else "cargando"
+        return estado
+
+    def _verificar_listo() -> list[str]:
+        problemas = []
+        if not db_pool.verificar():
+            problemas.append("base de datos inaccesible")
+        pendientes = outbox_repo.profundidad()
+        if pendientes > max_outbox_pendientes:
+            problemas.append(f"{pendientes} pedidos sin sincronizar (máximo {max_outbox_pendientes})")
+        if cobro.error:
+            problemas.append(f"subsistema de cobro: {cobro.error}")
+        return problemas
 
     def cerrar_resumen(e):
         bs.open = False
@@ -255,7 +467,7 @@ def main(page: ft.Page):
         return ft.Row(
             spacing=15,
             controls=[
-                ft.Image(src=f"C:/KioscoPP/img/iconos/{icono}", width=50, height=50),
+                ft.Image(src=views.asset(f"C:/KioscoPP/img/iconos/{icono}", "icono"), width=50, height=50),
                 ft.Column(
                     spacing=0,
                     controls=[
@@ -292,29 +504,11 @@ def main(page: ft.Page):
             except Exception:
                 return f"${v}"
 
-        precio_pastel = pedido.precio_pastel or 0.0
-        precio_chocolate = pedido.precio_chocolate
-        unit = pedido.extra_precio or 0.0
-        qty = pedido.extra_flor_cantidad or 0
-        if pedido.extra_seleccionado == "Flor Artificial" and qty > 0:
-            extra_monto = unit * qty
-            extra_detalle = f"{pedido.extra_seleccionado} ({qty} x {mxn(unit)})"
-        else:
-            extra_monto = unit
-            extra_detalle = pedido.extra_seleccionado or ""
-
-        # if pedido.tipo_cobertura and "fondant" in pedido.tipo_cobertura.lower():
-        #     precio_pastel *= 2
-
-        if (str(pedido.id_pan) == "2") and precio_chocolate > 0.0:
-            precio_elegido = precio_chocolate
+        cotizacion = pedido_use_cases.cotizar_pedido_actual() or COTIZACION_VACIA
+        if cotizacion.extra_cantidad > 1:
+            extra_detalle = f"{cotizacion.extra_seleccionado} ({cotizacion.extra_cantidad} x {mxn(cotizacion.extra_unitario)})"
         else:
-            precio_elegido = precio_pastel
-
-        subtotal = precio_pastel + extra_monto
-        costo_envio = 50.0 if subtotal < 500 else 0.0
-        monto_deposito = pedido.monto_deposito or 0.0
-        total_mostrar = subtotal + costo_envio + monto_deposito
+            extra_detalle = cotizacion.extra_seleccionado or ""
 
         categorias = {c.id: c.nombre for c in pedido_use_cases.obtener_categorias()}
         nombre_categoria = categorias.get(pedido.id_categoria, "N/A")
@@ -354,33 +548,33 @@ def main(page: ft.Page):
                         controls=[
                             ft.Row(
                                 alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                                controls=[ft.Text("Precio del pastel"), ft.Text(mxn(precio_elegido))]
+                                controls=[ft.Text("Precio del pastel"), ft.Text(mxn(cotizacion.precio_pastel))]
                             ),
                             ft.Row(
                                 alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
                                 controls=[
                                     ft.Text("Extra" + (f" – {extra_detalle}" if extra_detalle else "")),
-                                    ft.Text(mxn(extra_monto))
+                                    ft.Text(mxn(cotizacion.extra_costo))
                                 ]
                             ),
                             ft.Row(
                                 alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
                                 controls=[
                                     ft.Text("Depósito (base)"),
-                                    ft.Text(mxn(monto_deposito))
+                                    ft.Text(mxn(cotizacion.monto_deposito))
                                 ]
                             ),
                             ft.Row(
                                 alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
                                 controls=[
                                     ft.Text("Costro de envio"),
-                                    ft.Text(mxn(costo_envio))
+                                    ft.Text(mxn(cotizacion.costo_envio))
                                 ]
                             ),
                             ft.Divider(height=10),
                             ft.Row(
                                 alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                                controls=[ft.Text("Total", weight=ft.FontWeight.W_700), ft.Text(mxn(total_mostrar), weight=ft.FontWeight.W_700)]
+                                controls=[ft.Text("Total", weight=ft.FontWeight.W_700), ft.Text(mxn(cotizacion.total), weight=ft.FontWeight.W_700)]
                             ),
                         ]
                     )
@@ -412,32 +606,31 @@ def main(page: ft.Page):
     page.overlay.append(bs)
 
     def route_change(route):
+        with trazador.span("ruta", page.route):
+            _route_change(route)
+
+    def _route_change(route):
         logger.info(f"Cambiando a la ruta: {page.route}")
+        if page.route in RUTAS_ADMIN:
+            if not auth_use_cases.sesion_admin:
+                logger.warning(f"WARN: Acceso a {page.route} sin iniciar sesión; se pide el inicio de sesión.")
+                page.ruta_tras_login = page.route
+                page.go("/login")
+                return
+        else:
+            auth_use_cases.cerrar_sesion_admin()
         page.views.clear()
         funcion_animacion = None
 
         if page.route == "/login":
             page.views.append(views.vista_login(page, auth_use_cases))
-        elif page.route == "/":
-            page.views.append(views.vista_bienvenida(page))
-        elif page.route == "/seleccion":
-            page.views.append(views.vista_seleccion(page))
+        elif page.route in vistas_cacheables:
+            definicion = vistas_cacheables[page.route]
+            page.views.append(cache_vistas.obtener(page.route, definicion.clave(), definicion.construir))
         elif page.route == "/fecha":
             page.views.append(views.vista_fecha(page, pedido_use_cases))
-        elif page.route == "/tamano":
-            page.views.append(views.vista_tamano(page, pedido_use_cases))
-        elif page.route == "/categorias":
-            page.views.append(views.vista_categorias(page, pedido_use_cases))
-        elif page.route == "/forma":
-            page.views.append(views.vista_forma(page, pedido_use_cases))
-        elif page.route == "/pan":
-            page.views.append(views.vista_pan(page, pedido_use_cases))
         elif page.route == "/variante":
             page.views.append(views.vista_variante(page, pedido_use_cases))
-        elif page.route == "/relleno":
-            page.views.append(views.vista_relleno(page, pedido_use_cases))
-        elif page.route == "/cobertura":
-            page.views.append(views.vista_cobertura(page, pedido_use_cases))
         elif page.route == "/decorado1":
             page.views.append(views.vista_decorado1(page, pedido_use_cases))
         elif page.route == "/decorado2":
@@ -449,15 +642,21 @@ def main(page: ft.Page):
         elif page.route == "/extras":
             page.views.append(views.vista_extras(page, pedido_use_cases))
         elif page.route == "/datos_cliente":
-            page.views.append(views.vista_datos_cliente(page, pedido_use_cases, finalizar_pedido_use_cases))
+            page.views.append(views.vista_datos_cliente(page, pedido_use_cases,
+                                                        cobro.obtener().finalizar_pedido_use_cases))
         elif page.route == "/confirmacion":
-            vista, funcion_animacion = views.vista_confirmacion(page, finalizar_pedido_use_cases, pedido_use_cases)
+            vista, funcion_animacion = views.vista_confirmacion(page, cobro.obtener().finalizar_pedido_use_cases,
+                                                                pedido_use_cases)
             page.views.append(vista)
+        elif page.route == "/admin/impresion":
+            page.views.append(views.vista_admin_impresion(page, cobro.obtener().finalizar_pedido_use_cases))
         page.update()
 
         if funcion_animacion:
             funcion_animacion()
 
+        prefetch_vistas.programar(page.route)
+
     def view_pop(view):
         if len(page.views) > 1:
             page.views.pop()
@@ -476,12 +675,35 @@ def main(page: ft.Page):
                         health_server.shutdown()
                 except Exception:
                     pass
+                subsistema_cobro = cobro.si_listo()
+                if subsistema_cobro:
+                    try:
+                        subsistema_cobro.sync_worker.detener()
+                        logger.info(f"INFO: Tiempos HTTP de sincronización: "
+                                    f"{subsistema_cobro.sesion_http.estadisticas.resumen()}")
+                        subsistema_cobro.sesion_http.cerrar()
+                    except Exception:
+                        pass
+                    try:
+                        subsistema_cobro.cola_impresion.detener()
+                    except Exception:
+                        pass
+                try:
+                    if config_watcher:
+                        config_watcher.detener()
+                except Exception:
+                    pass
                 try:
-                    if fs_observer:
-                        fs_observer.stop()
-                        fs_observer.join(timeout=3)
+                    prefetch_vistas.detener()
+                    logger.info(f"INFO: Caché de vistas: {cache_vistas.estadisticas()}, "
+                                f"precarga: {prefetch_vistas.estadisticas()}")
+                    logger.info(f"INFO: Estadísticas del pool SQLite: {db_pool.estadisticas()}")
+                    db_pool.cerrar()
                 except Exception:
                     pass
+                logger.info(f"INFO: Escritor de logs: {escritor_logs.estadisticas()}")
+                trazador.detener()
+                escritor_logs.detener()
 
                 dlg.open = False
                 page.update()
@@ -508,6 +730,10 @@ def main(page: ft.Page):
     page.on_view_pop = view_pop
 
     page.go("/login")
+    perfil_arranque.marcar("primer_frame")
+    # El cobro (HTTP, impresión, sincronización) se carga ya con la primera pantalla a la vista; el perfil
+    # se guarda al terminar para que incluya el hito "cobro_listo".
+    cobro.precargar(al_terminar=lambda: perfil_arranque.registrar(os.path.join(LOG_DIR, "arranque.jsonl")))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,128 @@
+import datetime
+import threading
+from dateutil.relativedelta import relativedelta
+from .repositories import HorarioEntregaRepository, DiaFestivoRepository, OcupacionEntregaRepository, Horario
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+DIAS_ANTICIPACION = 2
+MESES_RESERVABLES = 6
+INTERVALO_HORAS = 1
+INTERVALO_HORAS_FESTIVO = 2
+
+
+def generar_rangos(horario: Horario, intervalo_horas: int) -> tuple[str, ...]:
+    """Rangos "09:00 AM - 10:00 AM" de hora_inicio a hora_fin; el último se recorta a hora_fin."""
+    dia = datetime.date.min
+    hora_actual = datetime.datetime.combine(dia, horario.hora_inicio)
+    hora_final = datetime.datetime.combine(dia, horario.hora_fin)
+    rangos = []
+    while hora_actual < hora_final:
+        hora_siguiente = min(hora_actual + datetime.timedelta(hours=intervalo_horas), hora_final)
+        rangos.append(f"{hora_actual.strftime('%I:%M %p')} - {hora_siguiente.strftime('%I:%M %p')}")
+        hora_actual = hora_siguiente
+    return tuple(rangos)
+
+
+class AgendaEntregas:
+    """Rangos de entrega precalculados para toda la ventana reservable y su ocupación.
+
+    El horario, los días festivos (mes-día, se repiten cada año) y los pedidos ya agendados se leen una sola
+    vez; después cada fecha se responde desde memoria. Con `capacidad_por_rango` > 0 un rango con ese número
+    de pedidos deja de ofrecerse, y un día sin rangos libres queda como no disponible. Los pedidos nuevos se
+    suman con `registrar()`; `invalidar()` vuelve a leer todo en la siguiente consulta (p. ej. al cambiar el
+    catálogo) y también se recarga sola al cambiar de día.
+    """
+
+    def __init__(self, horario_repo: HorarioEntregaRepository, dia_festivo_repo: DiaFestivoRepository,
+                 ocupacion_repo: OcupacionEntregaRepository, capacidad_por_rango: int = 0,
+                 dias_anticipacion: int = DIAS_ANTICIPACION, meses_reservables: int = MESES_RESERVABLES):
+        self.horario_repo = horario_repo
+        self.dia_festivo_repo = dia_festivo_repo
+        self.ocupacion_repo = ocupacion_repo
+        self.capacidad_por_rango = capacidad_por_rango
+        self.dias_anticipacion = dias_anticipacion
+        self.meses_reservables = meses_reservables
+
+        self._lock = threading.Lock()
+        self._cargada_el: datetime.date | None = None
+        self._primer_dia: datetime.date | None = None
+        self._ultimo_dia: datetime.date | None = None
+        self._rangos: dict[datetime.date, tuple[str, ...]] = {}
+        self._ocupacion: dict[tuple[datetime.date, str], int] = {}
+
+    def invalidar(self):
+        with self._lock:
+            self._cargada_el = None
+
+    def _vigente(self, hoy: datetime.date | None = None):
+        hoy = hoy or datetime.date.today()
+        with self._lock:
+            if self._cargada_el == hoy:
+                return
+            self._cargar(hoy)
+
+    def _cargar(self, hoy: datetime.date):
+        primer_dia = hoy + datetime.timedelta(days=self.dias_anticipacion)
+        ultimo_dia = hoy + relativedelta(months=+self.meses_reservables)
+        horario = self.horario_repo.obtener_horario()
+        festivos = self.dia_festivo_repo.obtener_todos()
+
+        rangos = {}
+        if horario:
+            normales = generar_rangos(horario, INTERVALO_HORAS)
+            en_festivo = generar_rangos(horario, INTERVALO_HORAS_FESTIVO)
+            dia = primer_dia
+            while dia <= ultimo_dia:
+                rangos[dia] = en_festivo if (dia.month, dia.day) in festivos else normales
+                dia += datetime.timedelta(days=1)
+        else:
+            logger.warning("WARN: No hay horario de entrega configurado; no se ofrecerán fechas de entrega.")
+
+        self._ocupacion = {(fecha, rango): cantidad for (fecha, rango), cantidad
+                           in self.ocupacion_repo.contar_por_rango(primer_dia, ultimo_dia).items()}
+        self._rangos = rangos
+        self._primer_dia = primer_dia
+        self._ultimo_dia = ultimo_dia
+        self._cargada_el = hoy
+        logger.info(f"INFO: Agenda de entregas cargada: {len(rangos)} días, {len(festivos)} festivos, "
+                    f"{sum(self._ocupacion.values())} pedidos agendados.")
+
+    def _libre(self, fecha: datetime.date, rango: str) -> bool:
+        return not self.capacidad_por_rango or self._ocupacion.get((fecha, rango), 0) < self.capacidad_por_rango
+
+    def ventana(self, hoy: datetime.date | None = None) -> tuple[datetime.date, datetime.date]:
+        """Primer y último día que se pueden reservar."""
+        self._vigente(hoy)
+        return self._primer_dia, self._ultimo_dia
+
+    def rangos(self, fecha: datetime.date, hoy: datetime.date | None = None) -> list[str]:
+        """Rangos con cupo para la fecha; vacío si la fecha está fuera de la ventana o el día está lleno."""
+        self._vigente(hoy)
+        with self._lock:
+            return [r for r in self._rangos.get(fecha, ()) if self._libre(fecha, r)]
+
+    def dias_no_disponibles(self, hoy: datetime.date | None = None) -> list[datetime.date]:
+        """Días dentro de la ventana sin ningún rango libre."""
+        self._vigente(hoy)
+        with self._lock:
+            return [dia for dia, rangos in self._rangos.items() if not any(self._libre(dia, r) for r in rangos)]
+
+    def primer_dia_disponible(self, hoy: datetime.date | None = None) -> datetime.date | None:
+        self._vigente(hoy)
+        with self._lock:
+            return next((dia for dia, rangos in self._rangos.items()
+                         if any(self._libre(dia, r) for r in rangos)), None)
+
+    def registrar(self, fecha: datetime.date | None, rango: str | None):
+        """Suma a la ocupación un pedido recién guardado."""
+        if not fecha or not rango:
+            return
+        with self._lock:
+            self._ocupacion[(fecha, rango)] = self._ocupacion.get((fecha, rango), 0) + 1
+
+    def estadisticas(self) -> dict:
+        return {"dias": len(self._rangos), "pedidos_agendados": sum(self._ocupacion.values()),
+                "capacidad_por_rango": self.capacidad_por_rango}
@@ -0,0 +1,170 @@
+import re
+from typing import NamedTuple
+from .repositories import (
+    CategoriaRepository, TipoFormaRepository, TipoPanRepository, TipoRellenoRepository,
+    TipoCoberturaRepository, PastelConfiguradoRepository, TamanoPastel, FormaPastel, TipoPan
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ReglaFormaPorTamano(NamedTuple):
+    patron_forma: str  # se busca dentro del nombre de la forma en minúsculas
+    tamanos_permitidos: frozenset[int] | None = None
+    tamano_maximo: int | None = None
+
+
+class ReglaPanPorForma(NamedTuple):
+    patron_forma: str
+    patron_pan_excluido: str
+
+
+REGLAS_FORMA_POR_TAMANO = (
+    ReglaFormaPorTamano("corazón", tamano_maximo=10),
+    ReglaFormaPorTamano("redonda", frozenset({5, 10, 15, 18, 20, 60})),
+    ReglaFormaPorTamano("rectangular", frozenset({20, 40, 60, 80, 120, 150, 180})),
+    ReglaFormaPorTamano("alto (3 o 4 capas)", frozenset({15, 30, 35, 40})),
+    ReglaFormaPorTamano("pisos", frozenset({25, 30, 35, 40, 60, 70, 80, 100, 150, 160, 200, 250})),
+)
+
+REGLAS_PAN_POR_FORMA = (
+    ReglaPanPorForma("pisos", "chocolate"),
+)
+
+
+DECORADO_LISO = "Liso c/s Conchas de Betún"
+DECORADO_IMAGENES = "Imágenes Prediseñadas"
+DECORADO_TEMATICA = "Temática o Personaje"
+
+
+class ReglaDecorado(NamedTuple):
+    categoria: str
+    coberturas: frozenset[str]
+    decorados: tuple[str, ...]
+    detalle_directo: str | None = None  # con un solo decorado: se elige con este detalle y se salta la pantalla
+
+
+REGLAS_DECORADO = (
+    ReglaDecorado("CASERO", frozenset({"CHORREADO"}), (DECORADO_LISO,), detalle_directo="Chorreado"),
+    ReglaDecorado("TRES LECHES", frozenset({"CHANTILLY", "ESCENARIO DE ACETATOS"}), (DECORADO_IMAGENES, DECORADO_TEMATICA)),
+    ReglaDecorado("TRES LECHES", frozenset({"CHORREADO"}), (DECORADO_LISO,)),
+    ReglaDecorado("ESPECIALIDAD", frozenset({"BETUN CON MERENGUE", "ESCENARIO DE ACETATOS", "GANACHE DE CHOCOLATE"}),
+                  (DECORADO_IMAGENES, DECORADO_TEMATICA)),
+    ReglaDecorado("CASERO", frozenset({"FONDANT", "ESCENARIO DE ACETATOS"}), (DECORADO_IMAGENES, DECORADO_TEMATICA)),
+)
+DECORADOS_POR_DEFECTO = (DECORADO_LISO, DECORADO_IMAGENES)
+
+
+class OpcionesDecorado(NamedTuple):
+    decorados: tuple[str, ...]
+    detalle_directo: str | None = None
+
+
+def personas_de_tamano(nombre_tamano: str | None) -> int | None:
+    """"20" -> 20; en rangos como "150 a 180" cuenta el mayor. None si el nombre no trae números."""
+    numeros = [int(n) for n in re.findall(r"\d+", nombre_tamano or "")]
+    return max(numeros) if numeros else None
+
+
+def forma_permitida(nombre_forma: str, personas: int | None) -> bool:
+    if personas is None:
+        return True
+    nombre = nombre_forma.lower()
+    for regla in REGLAS_FORMA_POR_TAMANO:
+        if regla.patron_forma not in nombre:
+            continue
+        if regla.tamanos_permitidos is not None and personas not in regla.tamanos_permitidos:
+            return False
+        if regla.tamano_maximo is not None and personas > regla.tamano_maximo:
+            return False
+    return True
+
+
+def pan_permitido(nombre_pan: str, nombre_forma: str | None) -> bool:
+    forma = (nombre_forma or "").lower()
+    pan = nombre_pan.lower()
+    return not any(r.patron_forma in forma and r.patron_pan_excluido in pan for r in REGLAS_PAN_POR_FORMA)
+
+
+def opciones_decorado(nombre_categoria: str | None, tipo_cobertura: str | None) -> OpcionesDecorado:
+    for regla in REGLAS_DECORADO:
+        if regla.categoria == nombre_categoria and tipo_cobertura in regla.coberturas:
+            return OpcionesDecorado(regla.decorados, regla.detalle_directo)
+    return OpcionesDecorado(DECORADOS_POR_DEFECTO)
+
+
+class IndiceDisponibilidad:
+    """Opciones válidas del asistente precalculadas para cada combinación de tamaño, categoría y forma.
+
+    Una opción "sin salida" pasa las reglas pero no lleva a ningún pastel configurado (o a un pan sin rellenos o
+    sin coberturas); la interfaz la muestra deshabilitada en lugar de dejar que el cliente llegue a un error.
+    """
+
+    def __init__(self):
+        self._formas: dict[tuple[int, int], tuple[FormaPastel, ...]] = {}
+        self._panes: dict[tuple[int, int, int], tuple[TipoPan, ...]] = {}
+        self._formas_sin_salida: dict[tuple[int, int], frozenset[int]] = {}
+        self._panes_sin_salida: dict[tuple[int, int, int], frozenset[int]] = {}
+        self._categorias_sin_salida: dict[int, frozenset[int]] = {}
+
+    @classmethod
+    def construir(cls, tamanos: list[TamanoPastel], categoria_repo: CategoriaRepository,
+                  tipo_forma_repo: TipoFormaRepository, tipo_pan_repo: TipoPanRepository,
+                  tipo_relleno_repo: TipoRellenoRepository, tipo_cobertura_repo: TipoCoberturaRepository,
+                  pastel_config_repo: PastelConfiguradoRepository) -> "IndiceDisponibilidad":
+        indice = cls()
+        componentes: dict[tuple[int, int], bool] = {}
+
+        def tiene_componentes(id_categoria: int, id_pan: int) -> bool:
+            llave = (id_categoria, id_pan)
+            if llave not in componentes:
+                componentes[llave] = bool(
+                    tipo_relleno_repo.obtener_por_categoria_y_pan(id_categoria, id_pan)
+                    and tipo_cobertura_repo.obtener_por_categoria_y_pan(id_categoria, id_pan)
+                )
+            return componentes[llave]
+
+        for tamano in tamanos:
+            personas = personas_de_tamano(tamano.nombre)
+            categorias_sin_salida = set()
+            for categoria in categoria_repo.obtener_todas(tamano.id):
+                formas = tuple(f for f in tipo_forma_repo.obtener_por_categoria(categoria.id)
+                               if forma_permitida(f.nombre, personas))
+                panes_categoria = tipo_pan_repo.obtener_por_categoria(categoria.id)
+                formas_sin_salida = set()
+                for forma in formas:
+                    panes = tuple(p for p in panes_categoria if pan_permitido(p.nombre, forma.nombre))
+                    panes_sin_salida = frozenset(
+                        p.id for p in panes
+                        if not (tiene_componentes(categoria.id, p.id)
+                                and pastel_config_repo.obtener_configuraciones(categoria.id, p.id, forma.id, tamano.id))
+                    )
+                    indice._panes[(tamano.id, categoria.id, forma.id)] = panes
+                    indice._panes_sin_salida[(tamano.id, categoria.id, forma.id)] = panes_sin_salida
+                    if len(panes_sin_salida) == len(panes):
+                        formas_sin_salida.add(forma.id)
+                indice._formas[(tamano.id, categoria.id)] = formas
+                indice._formas_sin_salida[(tamano.id, categoria.id)] = frozenset(formas_sin_salida)
+                if len(formas_sin_salida) == len(formas):
+                    categorias_sin_salida.add(categoria.id)
+            indice._categorias_sin_salida[tamano.id] = frozenset(categorias_sin_salida)
+
+        logger.info(f"INFO: Índice de disponibilidad construido ({len(indice._panes)} combinaciones de forma).")
+        return indice
+
+    def formas(self, id_tamano: int | None, id_categoria: int | None) -> tuple[FormaPastel, ...] | None:
+        """Formas que pasan las reglas de tamaño; None si la combinación no está en el índice."""
+        return self._formas.get((id_tamano, id_categoria))
+
+    def panes(self, id_tamano: int | None, id_categoria: int | None, id_forma: int | None) -> tuple[TipoPan, ...] | None:
+        return self._panes.get((id_tamano, id_categoria, id_forma))
+
+    def categorias_sin_salida(self, id_tamano: int | None) -> frozenset[int]:
+        return self._categorias_sin_salida.get(id_tamano, frozenset())
+
+    def formas_sin_salida(self, id_tamano: int | None, id_categoria: int | None) -> frozenset[int]:
+        return self._formas_sin_salida.get((id_tamano, id_categoria), frozenset())
+
+    def panes_sin_salida(self, id_tamano: int | None, id_categoria: int | None, id_forma: int | None) -> frozenset[int]:
+        return self._panes_sin_salida.get((id_tamano, id_categoria, id_forma), frozenset())
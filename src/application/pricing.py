@@ -0,0 +1,255 @@
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+from .repositories import PastelConfiguradoRepository, PastelConfigurado, Ticket
+from src.domain.pedido import Pedido
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+ID_PAN_CHOCOLATE = 2
+FACTOR_FONDANT = 2
+EXTRA_POR_PIEZA = "Flor Artificial"
+COSTO_ENVIO = 50.0
+MINIMO_ENVIO_GRATIS = 500.0
+
+
+class ClaveCotizacion(NamedTuple):
+    """Todo lo del pedido que influye en el precio."""
+    id_pastel_configurado: int | None
+    id_categoria: int | None
+    id_pan: int | None
+    id_forma: int | None
+    id_tamano: int | None
+    fondant: bool
+    extra_seleccionado: str | None
+    extra_precio: float | None
+    extra_flor_cantidad: int | None
+
+
+class PrecioPastel(NamedTuple):
+    """Parte del precio que depende solo del catálogo: la configuración, el fondant y si el pan es de chocolate."""
+    id_pastel_configurado: int
+    precio_base: float
+    precio_chocolate: float
+    precio_pastel: float
+    monto_deposito: float
+    peso_pastel: str | None
+    medidas_pastel: str | None
+    incluye: str | None
+
+
+class Cotizacion(NamedTuple):
+    id_pastel_configurado: int | None
+    precio_base: float  # ya con el recargo de fondant
+    precio_chocolate: float
+    precio_pastel: float  # el que se cobra: el de chocolate si el pan es de chocolate y tiene precio
+    extra_seleccionado: str | None
+    extra_unitario: float
+    extra_cantidad: int
+    extra_costo: float
+    subtotal: float  # pastel + extras; es lo que se guarda como `total` del pedido
+    costo_envio: float
+    monto_deposito: float
+    total: float  # lo que paga el cliente: subtotal + envío + depósito
+    peso_pastel: str | None = None
+    medidas_pastel: str | None = None
+    incluye: str | None = None
+
+    def lineas(self) -> list[tuple[str, float]]:
+        """Desglose para el ticket, en el mismo orden que el resumen en pantalla."""
+        lineas = [
+            ("Costo Pastel", self.precio_pastel),
+            ("Costo Extras", self.extra_costo),
+            ("Deposito", self.monto_deposito),
+        ]
+        if self.costo_envio > 0:
+            lineas.append(("Costo Envío", self.costo_envio))
+        return lineas
+
+
+def _armar(precio_pastel: float, extra_costo: float, monto_deposito: float, **campos) -> Cotizacion:
+    subtotal = precio_pastel + extra_costo
+    costo_envio = COSTO_ENVIO if subtotal < MINIMO_ENVIO_GRATIS else 0.0
+    campos.setdefault("id_pastel_configurado", None)
+    campos.setdefault("precio_base", precio_pastel)
+    campos.setdefault("precio_chocolate", 0.0)
+    campos.setdefault("extra_seleccionado", None)
+    campos.setdefault("extra_unitario", extra_costo)
+    campos.setdefault("extra_cantidad", 1 if extra_costo else 0)
+    return Cotizacion(
+        precio_pastel=precio_pastel,
+        extra_costo=extra_costo,
+        subtotal=subtotal,
+        costo_envio=costo_envio,
+        monto_deposito=monto_deposito,
+        total=subtotal + costo_envio + monto_deposito,
+        **campos,
+    )
+
+
+COTIZACION_VACIA = _armar(0.0, 0.0, 0.0)
+
+
+class PricingEngine:
+    """Única fuente de los precios del pedido: pantallas, guardado y ticket usan la misma `Cotizacion`.
+
+    Reglas: el fondant duplica el precio base y el de chocolate; con pan de chocolate se cobra el precio de
+    chocolate si la configuración lo tiene; la Flor Artificial se cobra por pieza; el envío cuesta $50 cuando
+    pastel + extras no llega a $500. Las cotizaciones se memorizan por `ClaveCotizacion` y se descartan al
+    cambiar el catálogo.
+
+    Con una matriz de precios precalculada (`usar_matriz`) la parte del catálogo sale de una sola búsqueda
+    en la matriz; si la configuración no está en ella se calcula con el repositorio como siempre.
+    """
+
+    def __init__(self, pastel_config_repo: PastelConfiguradoRepository, max_cotizaciones: int = 256):
+        self.pastel_config_repo = pastel_config_repo
+        self.max_cotizaciones = max_cotizaciones
+        self._cotizaciones: OrderedDict[ClaveCotizacion, Cotizacion | None] = OrderedDict()
+        self._lock = threading.Lock()
+        self.matriz = None
+        self.aciertos = 0
+        self.calculadas = 0
+
+    def usar_matriz(self, matriz):
+        """`matriz` responde `buscar(clave) -> PrecioPastel | None`; None vuelve a calcular con el repositorio."""
+        self.matriz = matriz
+        self.invalidar()
+
+    @staticmethod
+    def clave(pedido: Pedido) -> ClaveCotizacion:
+        return ClaveCotizacion(
+            id_pastel_configurado=pedido.id_pastel_configurado,
+            id_categoria=pedido.id_categoria,
+            id_pan=pedido.id_pan,
+            id_forma=pedido.id_forma,
+            id_tamano=pedido.id_tamano,
+            fondant=bool(pedido.tipo_cobertura and "fondant" in pedido.tipo_cobertura.lower()),
+            extra_seleccionado=pedido.extra_seleccionado,
+            extra_precio=pedido.extra_precio,
+            extra_flor_cantidad=pedido.extra_flor_cantidad,
+        )
+
+    def cotizar(self, pedido: Pedido) -> Cotizacion | None:
+        """Cotización del pedido, o None si todavía no corresponde a ningún pastel configurado."""
+        clave = self.clave(pedido)
+        with self._lock:
+            if clave in self._cotizaciones:
+                self.aciertos += 1
+                self._cotizaciones.move_to_end(clave)
+                return self._cotizaciones[clave]
+
+        precio = self.matriz.buscar(clave) if self.matriz else None
+        if precio is None:
+            config = self._buscar_configuracion(clave)
+            if config:
+                precio = self.precio_pastel(config, clave.fondant, clave.id_pan == ID_PAN_CHOCOLATE)
+        cotizacion = self.calcular(precio, clave) if precio else None
+        with self._lock:
+            self.calculadas += 1
+            self._cotizaciones[clave] = cotizacion
+            while len(self._cotizaciones) > self.max_cotizaciones:
+                self._cotizaciones.popitem(last=False)
+        return cotizacion
+
+    def _buscar_configuracion(self, clave: ClaveCotizacion) -> PastelConfigurado | None:
+        if clave.id_pastel_configurado:
+            return self.pastel_config_repo.obtener_configuracion_por_id(clave.id_pastel_configurado)
+        if all([clave.id_categoria, clave.id_pan, clave.id_forma, clave.id_tamano]):
+            return self.pastel_config_repo.obtener_configuracion(
+                id_cat=clave.id_categoria,
+                id_pan=clave.id_pan,
+                id_forma=clave.id_forma,
+                id_tam=clave.id_tamano
+            )
+        return None
+
+    @staticmethod
+    def precio_pastel(config: PastelConfigurado, fondant: bool, pan_chocolate: bool) -> PrecioPastel:
+        precio_base = config.precio_base or 0.0
+        precio_chocolate = config.precio_chocolate or 0.0
+        if fondant:
+            logger.debug(f"Cobertura de Fondant: se duplica el precio base de ${precio_base}.")
+            precio_base *= FACTOR_FONDANT
+            precio_chocolate *= FACTOR_FONDANT
+
+        return PrecioPastel(
+            id_pastel_configurado=config.id_pastel_configurado,
+            precio_base=precio_base,
+            precio_chocolate=precio_chocolate,
+            precio_pastel=precio_chocolate if pan_chocolate and precio_chocolate > 0.0 else precio_base,
+            monto_deposito=config.monto_deposito or 0.0,
+            peso_pastel=config.peso_pastel,
+            medidas_pastel=config.medidas_pastel,
+            incluye=config.incluye,
+        )
+
+    @staticmethod
+    def calcular(precio: PrecioPastel, clave: ClaveCotizacion) -> Cotizacion:
+        extra_unitario = clave.extra_precio or 0.0
+        extra_cantidad = 1 if clave.extra_seleccionado else 0
+        if clave.extra_seleccionado == EXTRA_POR_PIEZA and clave.extra_flor_cantidad:
+            extra_cantidad = clave.extra_flor_cantidad
+
+        return _armar(
+            precio.precio_pastel,
+            extra_unitario * max(extra_cantidad, 1),
+            precio.monto_deposito,
+            id_pastel_configurado=precio.id_pastel_configurado,
+            precio_base=precio.precio_base,
+            precio_chocolate=precio.precio_chocolate,
+            extra_seleccionado=clave.extra_seleccionado,
+            extra_unitario=extra_unitario,
+            extra_cantidad=extra_cantidad,
+            peso_pastel=precio.peso_pastel,
+            medidas_pastel=precio.medidas_pastel,
+            incluye=precio.incluye,
+        )
+
+    @staticmethod
+    def cotizar_ticket(ticket: Ticket) -> Cotizacion:
+        """Vuelve a armar la cotización con los montos ya guardados del pedido, sin consultar el catálogo.
+
+        La columna `extra_costo` de `pedidos` guarda el precio unitario del extra (`Pedido.extra_precio`), así
+        que la Flor Artificial se vuelve a multiplicar por las piezas, igual que en `calcular`.
+        """
+        extra_unitario = ticket.extra_costo or 0.0
+        extra_cantidad = 0
+        if ticket.extra_seleccionado:
+            extra_cantidad = 1
+            if ticket.extra_seleccionado == EXTRA_POR_PIEZA and ticket.extra_flor_cantidad:
+                extra_cantidad = ticket.extra_flor_cantidad
+        return _armar(
+            ticket.precio_pastel or 0.0,
+            extra_unitario * max(extra_cantidad, 1),
+            ticket.monto_deposito or 0.0,
+            extra_seleccionado=ticket.extra_seleccionado,
+            extra_unitario=extra_unitario,
+            extra_cantidad=extra_cantidad,
+            peso_pastel=ticket.tamano_peso,
+            medidas_pastel=ticket.tamano_descripcion,
+        )
+
+    @staticmethod
+    def aplicar(pedido: Pedido, cotizacion: Cotizacion | None):
+        """Copia la cotización a los campos de precio del pedido (en ceros si no hay cotización)."""
+        cotizacion = cotizacion or COTIZACION_VACIA
+        pedido.precio_pastel = cotizacion.precio_pastel
+        pedido.precio_chocolate = cotizacion.precio_chocolate
+        pedido.monto_deposito = cotizacion.monto_deposito
+        pedido.extra_costo = cotizacion.extra_costo
+        pedido.total = cotizacion.subtotal
+        pedido.tamano_peso = cotizacion.peso_pastel
+        pedido.tamano_descripcion = cotizacion.medidas_pastel
+        pedido.incluye = cotizacion.incluye
+        if cotizacion.id_pastel_configurado:
+            pedido.id_pastel_configurado = cotizacion.id_pastel_configurado
+
+    def invalidar(self):
+        with self._lock:
+            self._cotizaciones.clear()
+
+    def estadisticas(self) -> dict:
+        return {"cotizaciones": len(self._cotizaciones), "aciertos": self.aciertos, "calculadas": self.calculadas}
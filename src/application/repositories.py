@@ -87,11 +87,21 @@ class TipoCoberturaRepository(ABC):
        pass
 
 
+class PaginaGaleria(NamedTuple):
+    imagenes: list[ImagenGaleria]
+    cursor_siguiente: int | None  # Se pasa tal cual para pedir la siguiente página; None cuando ya no hay más
+
+
 class ImagenGaleriaRepository(ABC):
     @abstractmethod
     def buscar(self, categoria: str | None = None, termino: str | None = None) -> list[ImagenGaleria]:
         pass
 
+    @abstractmethod
+    def buscar_pagina(self, categoria: str | None = None, termino: str | None = None,
+                      despues_de: int | None = None, limite: int = 30) -> PaginaGaleria:
+        pass
+
     @abstractmethod
     def obtener_por_id(self, id_imagen: int) -> ImagenGaleria | None:
         pass
@@ -116,6 +126,17 @@ class DiaFestivoRepository(ABC):
     def es_festivo(self, fecha: datetime.date) -> bool:
         pass
 
+    @abstractmethod
+    def obtener_todos(self) -> set[tuple[int, int]]:
+        """(mes, día) de cada festivo; se repiten cada año."""
+        pass
+
+class OcupacionEntregaRepository(ABC):
+    @abstractmethod
+    def contar_por_rango(self, desde: datetime.date, hasta: datetime.date) -> dict[tuple[datetime.date, str], int]:
+        """Pedidos agendados por (fecha de entrega, rango de hora) entre `desde` y `hasta`, inclusive."""
+        pass
+
 
 class Ticket(NamedTuple):
     id_pedido: int
@@ -231,3 +252,14 @@ class TamanoRectangularRepository(ABC):
     @abstractmethod
     def obtener_precio_por_peso(self, peso: str) -> float | None:
         pass
+
+
+class Sucursal(NamedTuple):
+    n_sucursal_pk: int
+    c_identificador: str
+
+
+class SucursalRepository(ABC):
+    @abstractmethod
+    def obtener(self) -> Sucursal | None:
+        pass
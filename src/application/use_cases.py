@@ -1,5 +1,6 @@
 import datetime
 import os.path
+from typing import TYPE_CHECKING
 import logging
 
 logger = logging.getLogger(__name__)
@@ -8,27 +9,43 @@ from .repositories import (
     PedidoRepository, TamanoRepository, CategoriaRepository, TipoCobertura,
     TipoPanRepository, TipoFormaRepository, TipoRellenoRepository,
     TipoCoberturaRepository, FinalizarPedidoRepository, Categoria, TipoPan,
-    ImagenGaleriaRepository, TipoColorRepository, FormaPastel, TipoRelleno, Ticket,
-    HorarioEntregaRepository, DiaFestivoRepository, PastelConfiguradoRepository,
+    ImagenGaleriaRepository, PaginaGaleria, TipoColorRepository, FormaPastel, TipoRelleno, Ticket,
+    PastelConfiguradoRepository,
     TamanoPastel, ExtraRepository, PastelConfigurado, ExtraChorreadoRepository, TamanoRectangularRepository
 )
+from .pricing import PricingEngine, Cotizacion
+from .agenda_entregas import AgendaEntregas
+from .disponibilidad import (
+    IndiceDisponibilidad, OpcionesDecorado, forma_permitida, pan_permitido, personas_de_tamano, opciones_decorado
+)
 from src.domain.datos_entrega import DatosEntrega
 from src.domain.pedido import Pedido
 from src.domain.imagen_galeria import ImagenGaleria
-from src.infrastructure.printing_service import PrintingService
+
+if TYPE_CHECKING:
+    # Solo para anotaciones: la cola de impresión carga reportlab y se construye hasta que hace falta cobrar.
+    from src.infrastructure.print_queue import ColaImpresion, TrabajoImpresion
 
 
 
 class AuthUseCases:
+    def __init__(self):
+        # Vale desde un inicio de sesión correcto hasta que se navega a una ruta que no es de administración.
+        self.sesion_admin = False
+
     def login(self, username: str, password: str) -> bool:
 
         if username.lower() == "admin" and password == "1234":
             logger.info("INFO: Credenciales correctas.")
+            self.sesion_admin = True
             return True
         else:
             logger.error("ERROR: Credenciales incorrectas.")
             return False
 
+    def cerrar_sesion_admin(self):
+        self.sesion_admin = False
+
 
 class PedidoUseCases:
     def __init__(self, pedido_repo: PedidoRepository, tamano_repo: TamanoRepository,
@@ -36,9 +53,10 @@ class PedidoUseCases:
                  tipo_forma_repo: TipoFormaRepository, tipo_relleno_repo: TipoRellenoRepository,
                  tipo_cobertura_repo: TipoCoberturaRepository, finalizar_repo: FinalizarPedidoRepository,
                  imagen_galeria_repo: ImagenGaleriaRepository, tipo_color_repo: TipoColorRepository,
-                 horario_repo: HorarioEntregaRepository, dia_festivo_repo: DiaFestivoRepository,
-                 pastel_config_repo: PastelConfiguradoRepository, extra_repo: ExtraRepository,
-                 extra_chorreado_repo: ExtraChorreadoRepository, tamano_rectangular_repo: TamanoRectangularRepository):
+                 agenda: AgendaEntregas, pastel_config_repo: PastelConfiguradoRepository,
+                 extra_repo: ExtraRepository,
+                 extra_chorreado_repo: ExtraChorreadoRepository, tamano_rectangular_repo: TamanoRectangularRepository,
+                 pricing: PricingEngine):
         self.pedido_repo = pedido_repo
         self.tamano_repo = tamano_repo
         self.categoria_repo = categoria_repo
@@ -50,12 +68,25 @@ class PedidoUseCases:
         self.tamanos_disponibles = []
         self.imagen_galeria_repo = imagen_galeria_repo
         self.tipo_color_repo = tipo_color_repo
-        self.horario_repo = horario_repo
-        self.dia_festivo_repo = dia_festivo_repo
+        self.agenda = agenda
         self.pastel_config_repo = pastel_config_repo
         self.extra_repo = extra_repo
         self.extra_chorreado_repo = extra_chorreado_repo
         self.tamano_rectangular_repo = tamano_rectangular_repo
+        self.pricing = pricing
+        self._indice_disponibilidad: IndiceDisponibilidad | None = None
+        self._observadores_seleccion = []
+
+    def suscribir_seleccion(self, callback):
+        """`callback()` se llama cada vez que se elige categoría, forma, pan o relleno."""
+        self._observadores_seleccion.append(callback)
+
+    def _notificar_seleccion(self):
+        for callback in self._observadores_seleccion:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"WARN: Falló un observador de selección: {e}")
 
     def guardar_datos_cliente(
             self, nombre, telefono, direccion, num_ext,
@@ -91,6 +122,10 @@ class PedidoUseCases:
     def buscar_imagenes_galeria(self, categoria: str | None, termino: str | None) -> list[ImagenGaleria]:
         return self.imagen_galeria_repo.buscar(categoria, termino)
 
+    def buscar_pagina_galeria(self, categoria: str | None, termino: str | None,
+                              despues_de: int | None = None, limite: int = 30) -> PaginaGaleria:
+        return self.imagen_galeria_repo.buscar_pagina(categoria, termino, despues_de, limite)
+
     def seleccionar_imagen_decorado(self, id_imagen: int):
         pedido = self.pedido_repo.obtener()
         pedido.decorado_imagen_id = id_imagen
@@ -216,60 +251,55 @@ class PedidoUseCases:
         pedido.tipo_relleno = nombre_relleno
         self.pedido_repo.guardar(pedido)
         logger.info(f"INFO: Relleno '{nombre_relleno}' seleccionado. Estado del pedido: {pedido}")
+        self._notificar_seleccion()
+
+    def indice_disponibilidad(self) -> IndiceDisponibilidad:
+        if self._indice_disponibilidad is None:
+            self._indice_disponibilidad = IndiceDisponibilidad.construir(
+                self.tamano_repo.obtener_todos(), self.categoria_repo, self.tipo_forma_repo, self.tipo_pan_repo,
+                self.tipo_relleno_repo, self.tipo_cobertura_repo, self.pastel_config_repo
+            )
+        return self._indice_disponibilidad
 
     def obtener_formas_por_categoria(self, id_categoria: int) -> list[FormaPastel]:
-        formas_disponibles = self.tipo_forma_repo.obtener_por_categoria(id_categoria)
         pedido = self.pedido_repo.obtener()
+        formas = self.indice_disponibilidad().formas(pedido.id_tamano, id_categoria)
+        if formas is not None:
+            return list(formas)
 
-        if pedido.tamano_pastel:
-            try:
-                if pedido.tamano_pastel == "150 a 180":
-                    tamano_personas = 180
-                else:
-                    tamano_personas = int(pedido.tamano_pastel)
-
-                if tamano_personas > 10:
-                    logger.info(f"INFO: Tamaño para {tamano_personas} personas detectado. Ocultando forma de corazón.")
-                    formas_disponibles  = [forma for forma in formas_disponibles if "corazón" not in forma.nombre.lower()]
-
-                tamanos_permitidos_redonda = [5, 10, 15, 18, 20, 60]
-                if tamano_personas not in tamanos_permitidos_redonda:
-                    formas_disponibles = [f for f in formas_disponibles if 'redonda' not in f.nombre.lower()]
-                    logger.info(f"INFO: Tamaño para {tamano_personas}. Se ha ocultado la forma 'Redonda'.")
-
-                tamanos_permitidos_rectangular = [20, 40, 60, 80, 120, 150, 180]
-                if tamano_personas not in tamanos_permitidos_rectangular:
-                    formas_disponibles = [f for f in formas_disponibles if "rectangular" not in f.nombre.lower()]
-                    logger.info(f"INFO: Tamaño para {tamano_personas}. Se oculta la forma rectangular.")
+        # Combinación fuera del índice (p. ej. la categoría no se ofrece en ese tamaño): se aplican las reglas aquí.
+        personas = personas_de_tamano(pedido.tamano_pastel)
+        return [f for f in self.tipo_forma_repo.obtener_por_categoria(id_categoria) if forma_permitida(f.nombre, personas)]
 
-                tamanos_permitidos_altos = [15, 30, 35, 40]
-                if tamano_personas not in tamanos_permitidos_altos:
-                    formas_disponibles = [f for f in formas_disponibles if 'alto (3 o 4 capas)' not in f.nombre.lower()]
-                    logger.info(f"INFO: Tamaño para {tamano_personas}. Se oculta la forma Altos.")
+    def obtener_panes_por_categoria(self, id_categoria: int) -> list[TipoPan]:
+        pedido = self.pedido_repo.obtener()
+        if pedido.tipo_forma:
+            panes = self.indice_disponibilidad().panes(pedido.id_tamano, id_categoria, pedido.id_forma)
+            if panes is not None:
+                return list(panes)
+        return [p for p in self.tipo_pan_repo.obtener_por_categoria(id_categoria)
+                if pan_permitido(p.nombre, pedido.tipo_forma)]
 
-                tamanos_permitidos_pisos = [25, 30, 35, 40, 60, 70, 80, 100, 150,160, 200, 250]
-                if tamano_personas not in tamanos_permitidos_pisos:
-                    formas_disponibles = [f for f in formas_disponibles if 'pisos' not in f.nombre.lower()]
-                    logger.info(f"INFO: Tamanño para {tamano_personas}. Se oculta la forma 'Pisos'.")
+    def categorias_sin_variantes(self) -> frozenset[int]:
+        """Categorías que en el tamaño elegido no llevan a ningún pastel configurado."""
+        return self.indice_disponibilidad().categorias_sin_salida(self.pedido_repo.obtener().id_tamano)
 
-                return formas_disponibles
-            except (ValueError, TypeError):
-                logger.warning(f"ADVERTENCIA: El tamaño '{pedido.tamano_pastel}' no es un número válido.")
-                pass
-        return formas_disponibles
+    def formas_sin_variantes(self, id_categoria: int) -> frozenset[int]:
+        return self.indice_disponibilidad().formas_sin_salida(self.pedido_repo.obtener().id_tamano, id_categoria)
 
+    def panes_sin_variantes(self, id_categoria: int) -> frozenset[int]:
+        pedido = self.pedido_repo.obtener()
+        if not pedido.tipo_forma:
+            return frozenset()
+        return self.indice_disponibilidad().panes_sin_salida(pedido.id_tamano, id_categoria, pedido.id_forma)
 
-    def obtener_panes_por_categoria(self, id_categoria: int) -> list[TipoPan]:
-        panes_disponibles = self.tipo_pan_repo.obtener_por_categoria(id_categoria)
+    def obtener_opciones_decorado(self) -> OpcionesDecorado:
         pedido = self.pedido_repo.obtener()
-        if pedido.tipo_forma and "pisos" in pedido.tipo_forma.lower():
-            panes_filtrados = [
-                pan for pan in panes_disponibles
-                if "chocolate" not in pan.nombre.lower()
-            ]
-            logger.info(f"INFO: Forma 'Pisos' seleccionada. Se ha ocultado el pan de chocolate.")
-            return panes_filtrados
-        return panes_disponibles
+        nombre_categoria = pedido.nombre_categoria
+        if not nombre_categoria and pedido.id_categoria:
+            categoria = self.categoria_repo.obtener_por_id(pedido.id_categoria)
+            nombre_categoria = categoria.nombre if categoria else None
+        return opciones_decorado(nombre_categoria, pedido.tipo_cobertura)
 
     def reiniciar_detalles_decorado(self):
         logger.info("[DEBUG] UC: Ejecutando reiniciar_detalles_decorado...")
@@ -289,6 +319,7 @@ class PedidoUseCases:
         pedido.id_pastel_configurado = None
         self.pedido_repo.guardar(pedido)
         logger.info(f"INFO: Pan '{nombre_pan}' seleccionado. Estado del pedido: {pedido}")
+        self._notificar_seleccion()
 
     def obtener_configuraciones_disponibles(self) -> list[PastelConfigurado]:
         pedido = self.pedido_repo.obtener()
@@ -305,44 +336,22 @@ class PedidoUseCases:
 
     def seleccionar_configuracion_variante(self, id_config: int):
         pedido = self.pedido_repo.obtener()
-        config = self.pastel_config_repo.obtener_configuracion_por_id(id_config)
+        pedido.id_pastel_configurado = id_config
+        cotizacion = self.pricing.cotizar(pedido)
 
-        if not config:
+        if not cotizacion:
             logger.error(f"ERROR: No se pudo seleccionar la configuración con ID {id_config}")
             pedido.id_pastel_configurado = None
             self.pedido_repo.guardar(pedido)
             return
 
-        pedido.id_pastel_configurado = config.id_pastel_configurado
-
-        precio_pastel = config.precio_base or 0.0
-        precio_chocolate = config.precio_chocolate or 0.0
-        monto_deposito = config.monto_deposito or 0.0
-
-        if pedido.tipo_cobertura and "fondant" in pedido.tipo_cobertura.lower():
-            logger.info(f"INFO: Cobertura de Fondant detectada. Duplicando precio base de ${precio_pastel}.")
-            precio_pastel *= 2
-            precio_chocolate *= 2
-
-        extra_costo = pedido.extra_precio or 0.0
-
-        if pedido.id_pan == 2 and precio_chocolate > 0.0:
-            pedido.precio_pastel = precio_chocolate
-        else:
-            pedido.precio_pastel = precio_pastel
-
-        pedido.precio_chocolate = precio_chocolate
-        pedido.monto_deposito = monto_deposito
-        pedido.extra_costo = extra_costo
-        pedido.total = pedido.precio_pastel + extra_costo
-
-        pedido.tamano_peso = config.peso_pastel
-        pedido.tamano_descripcion = config.medidas_pastel
-        pedido.incluye = config.incluye
-
+        self.pricing.aplicar(pedido, cotizacion)
         self.pedido_repo.guardar(pedido)
         logger.info(f"INFO: Variante de configuración ID {id_config} seleccionada. Detalles guardados.")
 
+    def cotizar_pedido_actual(self) -> Cotizacion | None:
+        return self.pricing.cotizar(self.pedido_repo.obtener())
+
     def obtener_categorias(self) -> list[Categoria]:
         pedido = self.pedido_repo.obtener()
         if not pedido.id_tamano:
@@ -362,8 +371,9 @@ class PedidoUseCases:
         pedido.id_pastel_configurado = None
         self.pedido_repo.guardar(pedido)
         logger.info(f"INFO: Categoría {id_categoria} seleccionada. Estado del pedido: {pedido}")
+        self._notificar_seleccion()
 
-    def seleccionar_fecha(self, fecha: datetime.date):
+    def seleccionar_fecha(self, fecha: datetime.date | None):
         pedido = self.pedido_repo.obtener()
         pedido.fecha_entrega = fecha
         self.pedido_repo.guardar(pedido)
@@ -376,6 +386,13 @@ class PedidoUseCases:
     def obtener_pedido_actual(self):
         return self.pedido_repo.obtener()
 
+    def invalidar_cache_catalogo(self):
+        self.tamanos_disponibles = []
+        self._indice_disponibilidad = None
+        self.pricing.invalidar()
+        self.agenda.invalidar()
+        logger.info("INFO: Caché de catálogo de los casos de uso invalidada.")
+
     def obtener_tamanos(self) -> list[TamanoPastel]:
         if not self.tamanos_disponibles:
             self.tamanos_disponibles = self.tamano_repo.obtener_todos()
@@ -436,37 +453,7 @@ class PedidoUseCases:
             logger.warning("ADVERTENCIA: Faltan IDs para calcular el precio.")
             return
 
-        config = self.pastel_config_repo.obtener_configuracion(
-            id_cat=pedido.id_categoria,
-            id_pan=pedido.id_pan,
-            id_forma=pedido.id_forma,
-            id_tam=pedido.id_tamano
-        )
-
-        precio_pastel = (config.precio_base or 0.0) if config else 0.0
-        precio_chocolate = (config.precio_chocolate or 0.0) if config else 0.0
-        monto_deposito = (config.monto_deposito or 0.0) if config else 0.0
-        extra_costo = (pedido.extra_precio or 0.0) if config else 0.0
-
-        if pedido.tipo_cobertura and "fondant" in pedido.tipo_cobertura.lower():
-            logger.info(f"INFO: Cobertura de Fondant detectada. Duplicando precio base de ${precio_pastel}.")
-            precio_pastel *= 2
-            precio_chocolate *= 2
-
-        total = precio_pastel + extra_costo
-
-        if pedido.id_pan == 2 and precio_chocolate > 0.0:
-            pedido.precio_pastel = precio_chocolate
-        else:
-            pedido.precio_pastel = precio_pastel
-        pedido.monto_deposito = monto_deposito
-        pedido.extra_costo = extra_costo
-        pedido.total = total
-
-        if config:
-            pedido.tamano_peso = getattr(config, 'peso_pastel', None)
-            pedido.tamano_descripcion = getattr(config, 'medidas_pastel', None)
-
+        self.pricing.aplicar(pedido, self.pricing.cotizar(pedido))
         self.pedido_repo.guardar(pedido)
 
     def reiniciar_tamano(self):
@@ -616,37 +603,17 @@ class PedidoUseCases:
         self.pedido_repo.guardar(pedido_actual)
 
     def obtener_rangos_de_hora(self, fecha_seleccionada: datetime.date) -> list[str]:
-        logger.info(f"\n[DEBUG] === Iniciando cálculo de rangos para fecha: {fecha_seleccionada} ===")
-
-        horario = self.horario_repo.obtener_horario()
-        if not horario:
-            logger.info("[DEBUG] No se encontró un horario de entrega en la base de datos.")
-            return []
-
-        logger.info(f"[DEBUG] Horario de operación obtenido: {horario.hora_inicio.strftime('%H:%M')} a {horario.hora_fin.strftime('%H:%M')}")
+        """Rangos con cupo para la fecha, desde la agenda precalculada (sin consultar la base de datos)."""
+        return self.agenda.rangos(fecha_seleccionada)
 
-        es_dia_festivo = self.dia_festivo_repo.es_festivo(fecha_seleccionada)
+    def obtener_ventana_entrega(self) -> tuple[datetime.date, datetime.date]:
+        return self.agenda.ventana()
 
-        intervalo_horas = 2 if es_dia_festivo else 1
-        logger.info(f"[DEBUG] Intervalo de horas determinado: {intervalo_horas} hora(s)")
+    def obtener_dias_no_disponibles(self) -> list[datetime.date]:
+        return self.agenda.dias_no_disponibles()
 
-        rangos = []
-        hora_actual = datetime.datetime.combine(fecha_seleccionada, horario.hora_inicio)
-        hora_final = datetime.datetime.combine(fecha_seleccionada, horario.hora_fin)
-
-        logger.info("[DEBUG] --- Generando rangos ---")
-        while hora_actual < hora_final:
-            hora_siguiente = hora_actual + datetime.timedelta(hours=intervalo_horas)
-            if hora_siguiente > hora_final:
-                hora_siguiente = hora_final
-
-            rango_str = f"{hora_actual.strftime('%I:%M %p')} - {hora_siguiente.strftime('%I:%M %p')}"
-            rangos.append(rango_str)
-            logger.info(f"[DEBUG]   - Rango generado: {rango_str}")
-            hora_actual = hora_siguiente
-
-        logger.info(f"[DEBUG] === Cálculo finalizado. Se generaron {len(rangos)} rangos. ===\n")
-        return rangos
+    def obtener_primer_dia_disponible(self) -> datetime.date | None:
+        return self.agenda.primer_dia_disponible()
 
     def seleccionar_tamano(self, id_tamano: int, nombre_tamano: str, descripcion_tamano: str):
         pedido = self.pedido_repo.obtener()
@@ -663,83 +630,19 @@ class PedidoUseCases:
         pedido.id_pastel_configurado = None
         self.pedido_repo.guardar(pedido)
         logger.info(f"INFO: Forma '{nombre_forma}' seleccionada. Estado del pedido: {pedido}")
+        self._notificar_seleccion()
 
-    def obtener_precio_pastel_configurado(self) -> PastelConfigurado:
+    def obtener_precio_pastel_configurado(self) -> Cotizacion | None:
         pedido = self.pedido_repo.obtener()
+        cotizacion = self.pricing.cotizar(pedido)
 
-        logger.info("\n[DEBUG] === Consultando Precio de Pastel Configurado ===")
-
-        if pedido.id_pastel_configurado:
-            logger.info(f"[DEBUG] Obteniendo config por ID único: {pedido.id_pastel_configurado}")
-            config = self.pastel_config_repo.obtener_configuracion_por_id(pedido.id_pastel_configurado)
-
-        # LÓGICA ANTIGUA: Si no, buscamos por los 4 IDs (esto es un fallback)
-        elif all([pedido.id_categoria, pedido.id_pan, pedido.id_forma, pedido.id_tamano]):
-            logger.info("[DEBUG] Obteniendo config por 4 IDs (fallback)...")
-            config = self.pastel_config_repo.obtener_configuracion(
-                id_cat=pedido.id_categoria,
-                id_pan=pedido.id_pan,
-                id_forma=pedido.id_forma,
-                id_tam=pedido.id_tamano
-            )
-        else:
-            logger.info("[DEBUG] Faltan IDs para calcular el precio. Devolviendo None")
-            config = None
-
-        if not config:
-            logger.info("[DEBUG] No se encontró configuración. Precios a 0.0")
-            logger.info("[DEBUG] =============================================\n")
-            pedido.precio_pastel = 0.0
-            pedido.monto_deposito = 0.0
-            pedido.extra_costo = 0.0
-            pedido.precio_chocolate = 0.0
-            pedido.total = 0.0
-            pedido.tamano_peso = None
-            pedido.tamano_descripcion = None
-            pedido.incluye = None
-            self.pedido_repo.guardar(pedido)
-            return None
-
-        precio_pastel = config.precio_base or 0.0
-        precio_chocolate = config.precio_chocolate or 0.0
-        monto_deposito = config.monto_deposito or 0.0
-
-        if pedido.tipo_cobertura and "fondant" in pedido.tipo_cobertura.lower():
-            logger.info(f"INFO: Cobertura de Fondant detectada. Duplicando precio base de ${precio_pastel}.")
-            precio_pastel *= 2
-            precio_chocolate *= 2
-
-        extra_costo = pedido.extra_precio or 0.0
-
-        if pedido.extra_seleccionado == "Flor Artificial" and pedido.extra_flor_cantidad:
-            logger.info(
-                f"INFO [Resumen]: Multiplicando extra Flor Artificial: {extra_costo} x {pedido.extra_flor_cantidad}")
-            extra_costo *= pedido.extra_flor_cantidad
-
-        if pedido.id_pan == 2 and precio_chocolate > 0:
-            pedido.precio_pastel = precio_chocolate
-        else:
-            pedido.precio_pastel = precio_pastel
-
-        total = pedido.precio_pastel + extra_costo
-
-        pedido.precio_chocolate = precio_chocolate
-        pedido.monto_deposito = monto_deposito
-        pedido.extra_costo = extra_costo
-        pedido.total = total
-        pedido.tamano_peso = config.peso_pastel
-        pedido.tamano_descripcion = config.medidas_pastel
-        pedido.incluye = config.incluye
-
-        if not pedido.id_pastel_configurado:
-            pedido.id_pastel_configurado = config.id_pastel_configurado
-
+        if not cotizacion:
+            logger.info("[DEBUG] No se encontró configuración para el pedido. Precios a 0.0")
+        self.pricing.aplicar(pedido, cotizacion)
         self.pedido_repo.guardar(pedido)
-        logger.info(f"[DEBUG] Configuración ID {config.id_pastel_configurado} procesada y guardada.")
-        logger.info("[DEBUG] =============================================\n")
-        return config
-
-
+        if cotizacion:
+            logger.info(f"[DEBUG] Configuración ID {cotizacion.id_pastel_configurado} cotizada: total ${cotizacion.total}.")
+        return cotizacion
 
     def guardar_mensaje_y_edad(self, mensaje: str | None, edad: int | None):
         pedido = self.pedido_repo.obtener()
@@ -776,13 +679,20 @@ class PedidoUseCases:
 
 class FinalizarPedidoUseCases:
     def __init__(self, pedido_repo: PedidoRepository, finalizar_repo: FinalizarPedidoRepository,
-                 pastel_config_repo: PastelConfiguradoRepository, extra_repo: ExtraRepository, categoria_repo: CategoriaRepository):
+                 pricing: PricingEngine, extra_repo: ExtraRepository, categoria_repo: CategoriaRepository,
+                 cola_impresion: "ColaImpresion", agenda: AgendaEntregas):
         self.pedido_repo = pedido_repo
         self.finalizar_repo = finalizar_repo
-        self.pastel_config_repo = pastel_config_repo
+        self.pricing = pricing
         self.extra_repo = extra_repo
         self.categoria_repo = categoria_repo
-        self.printing_service = PrintingService()
+        self.cola_impresion = cola_impresion
+        self.agenda = agenda
+        self._observadores_pedido = []
+
+    def suscribir_pedido_guardado(self, callback):
+        """`callback(ticket)` se llama cada vez que se guarda un pedido."""
+        self._observadores_pedido.append(callback)
 
     def obtener_nombre_categoria(self, id_categoria: int) -> str:
         categoria = self.categoria_repo.obtener_por_id(id_categoria)
@@ -791,48 +701,31 @@ class FinalizarPedidoUseCases:
     def finalizar_y_obtener_ticket(self) -> Ticket | None:
         pedido = self.pedido_repo.obtener()
 
-        config = None
-
-        if pedido.id_pastel_configurado:
-            config = self.pastel_config_repo.obtener_configuracion_por_id(pedido.id_pastel_configurado)
-
-        if not config and all([pedido.id_categoria, pedido.id_pan, pedido.id_forma, pedido.id_tamano]):
-            config = self.pastel_config_repo.obtener_configuracion(
-                id_cat=pedido.id_categoria,
-                id_pan=pedido.id_pan,
-                id_forma=pedido.id_forma,
-                id_tam=pedido.id_tamano
-            )
-
-        precio_pastel = (config.precio_base or 0.0) if config else 0.0
-        precio_chocolate = (config.precio_chocolate or 0.0) if config else 0.0
-        monto_deposito = (config.monto_deposito or 0.0) if config else 0.0
-        peso_pastel = config.peso_pastel if config else ""
-        medidas_pastel = config.medidas_pastel if config else ""
-
-        if pedido.tipo_cobertura and "fondant" in pedido.tipo_cobertura.lower():
-            logger.info(f"INFO: Cobertura de Fondant detectada. Duplicando precio base de ${precio_pastel}.")
-            precio_pastel *= 2
-            precio_chocolate *= 2
+        cotizacion = self.pricing.cotizar(pedido)
+        if not cotizacion:
+            logger.warning("WARN: El pedido no corresponde a ningún pastel configurado; se guarda sin precio.")
+        self.pricing.aplicar(pedido, cotizacion)
 
-        extra_costo = pedido.extra_precio or 0.0
-        if pedido.extra_seleccionado == "Flor Artificial" and pedido.extra_flor_cantidad:
-            extra_costo *= pedido.extra_flor_cantidad
+        id_nuevo_pedido = self.finalizar_repo.guardar(pedido)
+        if id_nuevo_pedido:
+            self.agenda.registrar(pedido.fecha_entrega, pedido.hora_entrega)
+            ticket = self.finalizar_repo.obtener_por_id(id_nuevo_pedido)
+            for callback in self._observadores_pedido:
+                try:
+                    callback(ticket)
+                except Exception as e:
+                    logger.warning(f"WARN: Falló un observador de pedidos guardados: {e}")
+            return ticket
+        return None
 
-        total = precio_pastel + extra_costo
+    def cotizar_ticket(self, ticket: Ticket) -> Cotizacion:
+        return self.pricing.cotizar_ticket(ticket)
 
-        if pedido.id_pan == 2 and precio_chocolate > 0:
-            pedido.precio_pastel = precio_chocolate
-        else:
-            pedido.precio_pastel = precio_pastel
-        pedido.monto_deposito = monto_deposito
-        pedido.extra_costo = extra_costo
-        pedido.total = total
+    def imprimir_ticket(self, ticket: Ticket) -> "TrabajoImpresion":
+        return self.cola_impresion.encolar(ticket)
 
-        pedido.tamano_peso = peso_pastel
-        pedido.tamano_descripcion = medidas_pastel
+    def trabajos_impresion(self) -> list["TrabajoImpresion"]:
+        return self.cola_impresion.trabajos()
 
-        id_nuevo_pedido = self.finalizar_repo.guardar(pedido)
-        if id_nuevo_pedido:
-            return self.finalizar_repo.obtener_por_id(id_nuevo_pedido)
-        return None
+    def reintentar_impresion(self, id_trabajo: int) -> bool:
+        return self.cola_impresion.reintentar(id_trabajo)
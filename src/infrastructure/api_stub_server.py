@@ -0,0 +1,130 @@
+"""Servidor local que imita el web service de pedidos para probar la sincronización sin Azure.
+
+Uso:
+    python -m src.infrastructure.api_stub_server --puerto 8000 [--sin-lotes] [--falla-cada N]
+
+Luego apuntar "api_url_pedidos" de config.json a http://127.0.0.1:8000/api/pedidos.
+"""
+import argparse
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ApiStubServer:
+    def __init__(self, puerto: int = 8000, ruta: str = "/api/pedidos", acepta_lotes: bool = True,
+                 falla_cada: int = 0):
+        self.puerto = puerto
+        self.ruta = ruta.rstrip("/")
+        self.acepta_lotes = acepta_lotes
+        self.falla_cada = falla_cada
+
+        self.pedidos: dict[str, dict] = {}
+        self.peticiones = 0
+        self.lotes_recibidos = 0
+        self._lock = threading.Lock()
+        self._siguiente_id = 1
+        self._server: ThreadingHTTPServer | None = None
+
+    def _registrar(self, pedido: dict, clave: str | None) -> tuple[int, bool]:
+        """Guarda el pedido una sola vez por clave de idempotencia. Devuelve (id, duplicado)."""
+        with self._lock:
+            clave = clave or f"sin-clave-{self._siguiente_id}"
+            if clave in self.pedidos:
+                return self.pedidos[clave]["id_remoto"], True
+            id_remoto = self._siguiente_id
+            self._siguiente_id += 1
+            self.pedidos[clave] = {"id_remoto": id_remoto, "pedido": pedido}
+            return id_remoto, False
+
+    def _crear_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 para mantener la conexión abierta y poder observar el keep-alive del cliente.
+            protocol_version = "HTTP/1.1"
+
+            def _responder(self, status: int, cuerpo: dict | None = None):
+                datos = json.dumps(cuerpo or {}).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(datos)))
+                self.end_headers()
+                self.wfile.write(datos)
+
+            def _leer_json(self, datos: bytes):
+                if self.headers.get("Content-Encoding") == "gzip":
+                    datos = gzip.decompress(datos)
+                return json.loads(datos or b"{}")
+
+            def do_POST(self):
+                # El cuerpo se lee siempre, aunque la respuesta sea un error: si se queda en el socket, la
+                # siguiente petición de la misma conexión keep-alive lo leería como su línea de estado.
+                datos = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with stub._lock:
+                    stub.peticiones += 1
+                    fallar = stub.falla_cada and stub.peticiones % stub.falla_cada == 0
+                if fallar:
+                    self._responder(503, {"error": "falla simulada"})
+                    return
+
+                if self.path.rstrip("/") == stub.ruta:
+                    pedido = self._leer_json(datos)
+                    id_remoto, duplicado = stub._registrar(pedido, self.headers.get("Idempotency-Key"))
+                    self._responder(409 if duplicado else 200, {"id": id_remoto})
+                elif self.path.rstrip("/") == f"{stub.ruta}/lote":
+                    if not stub.acepta_lotes:
+                        self._responder(404, {"error": "lotes no soportados"})
+                        return
+                    cuerpo = self._leer_json(datos)
+                    with stub._lock:
+                        stub.lotes_recibidos += 1
+                    resultados = []
+                    for item in cuerpo.get("pedidos", []):
+                        id_remoto, duplicado = stub._registrar(item.get("pedido"), item.get("clave_idempotencia"))
+                        resultados.append({"clave_idempotencia": item.get("clave_idempotencia"), "id": id_remoto,
+                                           "estado": "duplicado" if duplicado else "ok"})
+                    self._responder(200, {"resultados": resultados})
+                else:
+                    self._responder(404)
+
+            def log_message(self, format, *args):
+                logger.debug("STUB " + format % args)
+
+        return Handler
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.puerto}{self.ruta}"
+
+    def iniciar(self) -> "ApiStubServer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.puerto), self._crear_handler())
+        self.puerto = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logger.info(f"INFO: Servidor de pruebas del web service en {self.url}")
+        return self
+
+    def detener(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Web service de pedidos simulado para pruebas locales.")
+    parser.add_argument("--puerto", type=int, default=8000)
+    parser.add_argument("--sin-lotes", action="store_true", help="Responde 404 al endpoint de lotes.")
+    parser.add_argument("--falla-cada", type=int, default=0, help="Responde 503 cada N peticiones.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    stub = ApiStubServer(args.puerto, acepta_lotes=not args.sin_lotes, falla_cada=args.falla_cada).iniciar()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stub.detener()
@@ -0,0 +1,224 @@
+"""Derivados de las imágenes del kiosco al tamaño exacto en que se muestran.
+
+Uso como paso de preparación (también corre en segundo plano al iniciar la app):
+    python -m src.infrastructure.asset_pipeline --origen C:/KioscoPP/img
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+from typing import Iterable, NamedTuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Ranura(NamedTuple):
+    ancho: int
+    alto: int
+    recortar: bool  # True: llena la caja recortando (ImageFit.COVER); False: cabe completa (CONTAIN)
+
+
+RANURAS = {
+    "fondo": Ranura(1920, 1080, True),
+    "logo": Ranura(424, 254, False),
+    "personaje": Ranura(400, 400, False),
+    "opcion": Ranura(800, 400, False),
+    "tarjeta": Ranura(176, 119, True),
+    "galeria": Ranura(200, 200, True),
+    "icono": Ranura(50, 50, False),
+}
+
+# Carpetas de C:/KioscoPP/img y la ranura en que se muestran sus imágenes.
+CARPETAS_POR_RANURA = {
+    "categorias": "tarjeta",
+    "formas": "tarjeta",
+    "panes": "tarjeta",
+    "rellenos": "tarjeta",
+    "coberturas": "tarjeta",
+    "iconos": "icono",
+    "seleccion": "opcion",
+}
+ARCHIVOS_POR_RANURA = {
+    "fondo_hd.png": "fondo",
+    "logo.png": "logo",
+    "chef.png": "personaje",
+}
+EXTENSIONES = (".png", ".jpg", ".jpeg", ".webp")
+
+
+def _llave(ruta: str) -> str:
+    return os.path.normcase(os.path.normpath(ruta))
+
+
+def _hash_archivo(ruta: str) -> str:
+    h = hashlib.sha1()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+class AssetPipeline:
+    """Genera y resuelve derivados WebP por ranura de visualización.
+
+    El manifiesto guarda, por (imagen original, ranura), el hash del contenido original y el archivo derivado.
+    Un derivado solo se regenera si el hash cambió. `ruta()` nunca genera nada: si aún no hay derivado
+    devuelve la imagen original, así que las vistas funcionan aunque la generación no haya terminado.
+    """
+
+    VERSION_MANIFIESTO = 1
+
+    def __init__(self, origen_dir: str = r"C:/KioscoPP/img", destino_dir: str | None = None, calidad: int = 85):
+        self.origen_dir = origen_dir
+        self.destino_dir = destino_dir or os.path.join(origen_dir, ".derivados")
+        self.ruta_manifiesto = os.path.join(self.destino_dir, "manifest.json")
+        self.calidad = calidad
+
+        self._lock = threading.Lock()
+        self._derivados: dict[str, dict] = self._leer_manifiesto()
+        self._hilo: threading.Thread | None = None
+
+    def _leer_manifiesto(self) -> dict:
+        try:
+            with open(self.ruta_manifiesto, "r", encoding="utf-8") as f:
+                datos = json.load(f)
+            if datos.get("version") == self.VERSION_MANIFIESTO:
+                return datos.get("derivados", {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"WARN: Manifiesto de imágenes ilegible, se regenerará: {e}")
+        return {}
+
+    def _guardar_manifiesto(self):
+        with self._lock:
+            datos = {"version": self.VERSION_MANIFIESTO, "derivados": dict(self._derivados)}
+        temporal = self.ruta_manifiesto + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(datos, f, ensure_ascii=False, indent=1)
+        os.replace(temporal, self.ruta_manifiesto)
+
+    def ruta(self, original: str, ranura: str) -> str:
+        """Ruta del derivado para la ranura, o la original si todavía no existe."""
+        with self._lock:
+            entrada = self._derivados.get(f"{_llave(original)}|{ranura}")
+        if entrada:
+            return os.path.join(self.destino_dir, entrada["archivo"])
+        return original
+
+    def _renderizar(self, original: str, ranura: Ranura, destino: str) -> tuple[int, int]:
+        from PIL import Image, ImageOps
+
+        with Image.open(original) as imagen:
+            imagen = ImageOps.exif_transpose(imagen)
+            imagen = imagen.convert("RGBA") if imagen.mode in ("P", "LA", "RGBA") else imagen.convert("RGB")
+            if ranura.recortar:
+                imagen = ImageOps.fit(imagen, (ranura.ancho, ranura.alto), Image.Resampling.LANCZOS)
+            else:
+                imagen.thumbnail((ranura.ancho, ranura.alto), Image.Resampling.LANCZOS)
+            imagen.save(destino, "WEBP", quality=self.calidad, method=4)
+            return imagen.size
+
+    def generar(self, entradas: Iterable[tuple[str, str]]) -> dict:
+        """Genera los derivados faltantes o desactualizados de las (ruta original, ranura) indicadas."""
+        os.makedirs(self.destino_dir, exist_ok=True)
+        resumen = {"generados": 0, "vigentes": 0, "errores": 0}
+        for original, nombre_ranura in entradas:
+            llave = f"{_llave(original)}|{nombre_ranura}"
+            try:
+                estado = os.stat(original)
+                with self._lock:
+                    entrada = self._derivados.get(llave)
+                vigente = entrada and os.path.exists(os.path.join(self.destino_dir, entrada["archivo"]))
+                # Mismo tamaño y fecha que la última vez: no hace falta leer el archivo para calcular el hash.
+                if vigente and (entrada.get("mtime"), entrada.get("bytes_original")) == (estado.st_mtime, estado.st_size):
+                    resumen["vigentes"] += 1
+                    continue
+                hash_original = _hash_archivo(original)
+                if vigente and entrada["hash"] == hash_original:
+                    with self._lock:
+                        entrada.update(mtime=estado.st_mtime, bytes_original=estado.st_size)
+                    resumen["vigentes"] += 1
+                    continue
+
+                nombre = os.path.splitext(os.path.basename(original))[0]
+                archivo = f"{nombre}_{nombre_ranura}_{hash_original[:10]}.webp"
+                ancho, alto = self._renderizar(original, RANURAS[nombre_ranura], os.path.join(self.destino_dir, archivo))
+                with self._lock:
+                    self._derivados[llave] = {
+                        "original": original,
+                        "ranura": nombre_ranura,
+                        "hash": hash_original,
+                        "archivo": archivo,
+                        "ancho": ancho,
+                        "alto": alto,
+                        "mtime": estado.st_mtime,
+                        "bytes_original": estado.st_size,
+                        "bytes": os.path.getsize(os.path.join(self.destino_dir, archivo)),
+                    }
+                if entrada and entrada["archivo"] != archivo:
+                    try:
+                        os.remove(os.path.join(self.destino_dir, entrada["archivo"]))
+                    except OSError:
+                        pass
+                resumen["generados"] += 1
+            except Exception as e:
+                resumen["errores"] += 1
+                logger.warning(f"WARN: No se pudo generar el derivado '{nombre_ranura}' de {original}: {e}")
+
+        if resumen["generados"]:
+            self._guardar_manifiesto()
+        return resumen
+
+    def entradas_de_carpetas(self) -> list[tuple[str, str]]:
+        entradas = []
+        for archivo, ranura in ARCHIVOS_POR_RANURA.items():
+            ruta = os.path.join(self.origen_dir, archivo)
+            if os.path.exists(ruta):
+                entradas.append((ruta, ranura))
+        for carpeta, ranura in CARPETAS_POR_RANURA.items():
+            directorio = os.path.join(self.origen_dir, carpeta)
+            if not os.path.isdir(directorio):
+                continue
+            for archivo in sorted(os.listdir(directorio)):
+                if archivo.lower().endswith(EXTENSIONES):
+                    entradas.append((os.path.join(directorio, archivo), ranura))
+        return entradas
+
+    def generar_todo(self, rutas_galeria: Iterable[str] = ()) -> dict:
+        entradas = self.entradas_de_carpetas()
+        entradas += [(ruta, "galeria") for ruta in rutas_galeria if ruta and os.path.exists(ruta)]
+        resumen = self.generar(entradas)
+        logger.info(f"INFO: Derivados de imágenes: {resumen}")
+        return resumen
+
+    def iniciar_en_segundo_plano(self, obtener_rutas_galeria=lambda: (), al_terminar=None):
+        """Genera los derivados en un hilo; las vistas usan los originales mientras tanto.
+
+        `al_terminar()` se llama solo si se generó algún derivado nuevo.
+        """
+        if self._hilo and self._hilo.is_alive():
+            return
+
+        def _ejecutar():
+            try:
+                resumen = self.generar_todo(obtener_rutas_galeria())
+                if resumen["generados"] and al_terminar:
+                    al_terminar()
+            except Exception as e:
+                logger.error(f"ERROR: Falló la generación de derivados de imágenes: {e}")
+
+        self._hilo = threading.Thread(target=_ejecutar, name="derivados-imagenes", daemon=True)
+        self._hilo.start()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera los derivados de imágenes del kiosco.")
+    parser.add_argument("--origen", default=r"C:/KioscoPP/img")
+    parser.add_argument("--destino", default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    AssetPipeline(args.origen, args.destino).generar_todo()
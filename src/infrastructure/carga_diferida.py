@@ -0,0 +1,59 @@
+import threading
+from typing import Callable
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SubsistemaDiferido:
+    """Subsistema pesado (con sus imports) que se construye fuera del camino de arranque.
+
+    `precargar()` lo construye en un hilo, normalmente después del primer frame. `obtener()` lo devuelve;
+    si la precarga todavía no termina espera a que termine, y si nunca se pidió lo construye en el hilo que
+    llama. `si_listo()` nunca construye ni espera: sirve para health, métricas y el cierre de la app.
+    """
+
+    def __init__(self, nombre: str, fabrica: Callable[[], object]):
+        self.nombre = nombre
+        self.fabrica = fabrica
+        self._lock = threading.Lock()
+        self._valor = None
+        self._hilo: threading.Thread | None = None
+        self.error: str | None = None
+
+    def _construir(self):
+        with self._lock:
+            if self._valor is not None:
+                return self._valor
+            try:
+                self._valor = self.fabrica()
+                self.error = None
+                logger.info(f"INFO: Subsistema '{self.nombre}' listo.")
+            except Exception as e:
+                self.error = str(e)
+                logger.error(f"ERROR: No se pudo construir el subsistema '{self.nombre}': {e}")
+                raise
+            return self._valor
+
+    def precargar(self, al_terminar: Callable[[], None] | None = None):
+        """`al_terminar()` se llama en el hilo de precarga cuando termina, haya podido construir o no."""
+        if self._valor is not None or (self._hilo and self._hilo.is_alive()):
+            return
+
+        def _ejecutar():
+            try:
+                self._construir()
+            except Exception:
+                pass  # ya se registró; obtener() lo reintentará
+            if al_terminar:
+                al_terminar()
+
+        self._hilo = threading.Thread(target=_ejecutar, name=f"carga-{self.nombre}", daemon=True)
+        self._hilo.start()
+
+    def obtener(self):
+        valor = self._valor
+        return valor if valor is not None else self._construir()
+
+    def si_listo(self):
+        return self._valor
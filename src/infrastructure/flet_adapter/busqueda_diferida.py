@@ -0,0 +1,70 @@
+import threading
+from typing import Callable
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BusquedaDiferida:
+    """Búsqueda mientras se escribe, con debounce y fuera del hilo de la interfaz.
+
+    Cada `solicitar()` reinicia la espera, así una ráfaga de teclas produce una sola búsqueda. La búsqueda
+    corre en el hilo del temporizador; si mientras tanto llegó otra solicitud su resultado se descarta y solo
+    se aplica el de la última.
+    """
+
+    def __init__(self, buscar: Callable[[object], object], aplicar: Callable[[object, object], None],
+                 espera_seg: float = 0.3):
+        self.buscar = buscar
+        self.aplicar = aplicar
+        self.espera_seg = espera_seg
+
+        self._lock = threading.Lock()
+        # Serializa comprobar-vigencia + aplicar para que un resultado viejo no se aplique después de uno nuevo.
+        self._lock_aplicar = threading.Lock()
+        self._generacion = 0
+        self._timer: threading.Timer | None = None
+
+        self.ejecutadas = 0
+        self.descartadas = 0
+
+    def solicitar(self, consulta, inmediata: bool = False):
+        with self._lock:
+            self._generacion += 1
+            generacion = self._generacion
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(0 if inmediata else self.espera_seg, self._ejecutar,
+                                          args=(generacion, consulta))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def cancelar(self):
+        with self._lock:
+            self._generacion += 1
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _vigente(self, generacion: int) -> bool:
+        with self._lock:
+            return generacion == self._generacion
+
+    def _ejecutar(self, generacion: int, consulta):
+        if not self._vigente(generacion):
+            return
+        try:
+            resultado = self.buscar(consulta)
+        except Exception as e:
+            logger.warning(f"WARN: Falló la búsqueda '{consulta}': {e}")
+            return
+        self.ejecutadas += 1
+
+        with self._lock_aplicar:
+            if not self._vigente(generacion):
+                self.descartadas += 1
+                return
+            try:
+                self.aplicar(consulta, resultado)
+            except Exception as e:
+                logger.warning(f"WARN: No se pudieron mostrar los resultados de '{consulta}': {e}")
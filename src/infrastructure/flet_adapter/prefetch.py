@@ -0,0 +1,81 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, NamedTuple
+from .view_cache import CacheVistas
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class VistaCacheable(NamedTuple):
+    clave: Callable[[], object]
+    construir: Callable[[], object]
+
+
+class PrefetchVistas:
+    """Construye en segundo plano la vista del siguiente paso del asistente.
+
+    Se programa al entrar a una ruta y cada vez que el cliente elige algo. Solo hay un trabajo vigente: una
+    selección nueva cancela el pendiente y, si ya estaba construyendo, su resultado se descarta.
+    """
+
+    def __init__(self, cache: CacheVistas, vistas: dict[str, VistaCacheable], siguiente_paso: dict[str, str]):
+        self.cache = cache
+        self.vistas = vistas
+        self.siguiente_paso = siguiente_paso
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch-vistas")
+        self._lock = threading.Lock()
+        self._generacion = 0
+        self._futuro: Future | None = None
+
+        self.precargadas = 0
+        self.descartadas = 0
+
+    def programar(self, ruta_actual: str):
+        ruta = self.siguiente_paso.get(ruta_actual)
+        definicion = self.vistas.get(ruta)
+        if not definicion:
+            return
+        try:
+            clave = definicion.clave()
+        except Exception as e:
+            logger.warning(f"WARN: No se pudo calcular la clave de precarga de {ruta}: {e}")
+            return
+
+        with self._lock:
+            self._generacion += 1
+            generacion = self._generacion
+            if self._futuro:
+                self._futuro.cancel()
+            if self.cache.contiene(ruta, clave):
+                return
+            self._futuro = self._executor.submit(self._precargar, generacion, ruta, clave, definicion.construir)
+
+    def _vigente(self, generacion: int) -> bool:
+        with self._lock:
+            return generacion == self._generacion
+
+    def _precargar(self, generacion: int, ruta: str, clave, construir):
+        if not self._vigente(generacion):
+            return
+        try:
+            vista = construir()
+        except Exception as e:
+            logger.warning(f"WARN: Falló la precarga de la vista {ruta}: {e}")
+            return
+        # La clave se vuelve a calcular: si el pedido cambió mientras se construía, la vista ya no sirve.
+        if not self._vigente(generacion) or self.vistas[ruta].clave() != clave:
+            self.descartadas += 1
+            return
+        if self.cache.contiene(ruta, clave):
+            return
+        self.cache.guardar(ruta, clave, vista)
+        self.precargadas += 1
+        logger.debug(f"Vista {ruta} precargada ({clave}).")
+
+    def estadisticas(self) -> dict:
+        return {"precargadas": self.precargadas, "descartadas": self.descartadas}
+
+    def detener(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
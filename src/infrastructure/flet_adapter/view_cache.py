@@ -0,0 +1,63 @@
+import threading
+from collections import OrderedDict
+import flet as ft
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def asignar_reenlazado(vista: ft.View, reenlazar) -> ft.View:
+    """Registra la función que actualiza las partes de la vista que dependen del pedido en curso."""
+    vista._reenlazar = reenlazar
+    return vista
+
+
+class CacheVistas:
+    """Vistas ya construidas por ruta y por los datos de catálogo que definen su contenido.
+
+    Al volver a una ruta se reutiliza el árbol de controles y solo se ejecuta su función de reenlazado
+    (tarjeta seleccionada, botón Continuar...). Se vacía cuando cambia el catálogo.
+    """
+
+    def __init__(self, max_vistas: int = 32):
+        self.max_vistas = max_vistas
+        self._vistas: OrderedDict[tuple, ft.View] = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.construidas = 0
+
+    def obtener(self, ruta: str, clave, construir) -> ft.View:
+        llave = (ruta, clave)
+        with self._lock:
+            vista = self._vistas.get(llave)
+            if vista is not None:
+                self.aciertos += 1
+                self._vistas.move_to_end(llave)
+        if vista is None:
+            vista = construir()
+            self.guardar(ruta, clave, vista)
+
+        reenlazar = getattr(vista, "_reenlazar", None)
+        if reenlazar:
+            reenlazar()
+        return vista
+
+    def contiene(self, ruta: str, clave) -> bool:
+        with self._lock:
+            return (ruta, clave) in self._vistas
+
+    def guardar(self, ruta: str, clave, vista: ft.View):
+        """Agrega una vista ya construida (por ejemplo, desde la precarga en segundo plano)."""
+        with self._lock:
+            self.construidas += 1
+            self._vistas[(ruta, clave)] = vista
+            while len(self._vistas) > self.max_vistas:
+                self._vistas.popitem(last=False)
+
+    def invalidar(self):
+        with self._lock:
+            self._vistas.clear()
+        logger.info("INFO: Caché de vistas invalidada.")
+
+    def estadisticas(self) -> dict:
+        return {"vistas": len(self._vistas), "aciertos": self.aciertos, "construidas": self.construidas}
@@ -1,10 +1,13 @@
 import flet as ft
-import datetime
-from dateutil.relativedelta import relativedelta
+import math
+import threading
 from src.application.use_cases import PedidoUseCases, FinalizarPedidoUseCases
 from .keyboard import VirtualKeyboard
 from .controles_comunes import crear_boton_navegacion
+from .view_cache import asignar_reenlazado
+from .busqueda_diferida import BusquedaDiferida
 from src.application.use_cases import AuthUseCases
+from src.infrastructure.print_queue import ESTADO_EN_COLA, ESTADO_GENERANDO, ESTADO_ENVIADO, ESTADO_FALLIDO
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,6 +17,18 @@ fondo_hd = 'C:/KioscoPP/img/fondo_hd.png'
 logo_pepe = 'C:/KioscoPP/img/logo.png'
 chef = 'C:/KioscoPP/img/chef.png'
 
+_pipeline_assets = None
+
+
+def configurar_assets(pipeline):
+    global _pipeline_assets
+    _pipeline_assets = pipeline
+
+
+def asset(ruta: str, ranura: str) -> str:
+    """Derivado de la imagen al tamaño de la ranura donde se muestra (ver asset_pipeline.RANURAS)."""
+    return _pipeline_assets.ruta(ruta, ranura) if _pipeline_assets else ruta
+
 
 def crear_tarjeta_seleccion(texto, imagen_src, on_click_handler, data=None):
     return ft.Container(
@@ -28,7 +43,7 @@ def crear_tarjeta_seleccion(texto, imagen_src, on_click_handler, data=None):
                     width=176, height=119, margin=ft.margin.only(top=25),
                     border_radius=ft.border_radius.all(10),
                     clip_behavior=ft.ClipBehavior.ANTI_ALIAS,
-                    content=ft.Image(src=imagen_src, fit=ft.ImageFit.COVER)
+                    content=ft.Image(src=asset(imagen_src, "tarjeta"), fit=ft.ImageFit.COVER)
                 ),
                 ft.Divider(height=2, color=ft.Colors.GREY_300),
                 ft.Text(texto, text_align=ft.TextAlign.CENTER, size=20, font_family="Bebas Neue"),
@@ -37,6 +52,14 @@ def crear_tarjeta_seleccion(texto, imagen_src, on_click_handler, data=None):
     )
 
 
+def deshabilitar_tarjeta(tarjeta: ft.Container) -> ft.Container:
+    """Opción que no lleva a ningún pastel disponible: se ve atenuada y no se puede elegir."""
+    tarjeta.disabled = True
+    tarjeta.opacity = 0.4
+    tarjeta.tooltip = "No disponible para esta combinación"
+    return tarjeta
+
+
 def crear_vista_con_fondo(ruta, titulo, contenido, page, boton_volver_ruta, boton_continuar, boton_restablecer):
     banner_superior = ft.Container(
         height=67,
@@ -78,7 +101,7 @@ def crear_vista_con_fondo(ruta, titulo, contenido, page, boton_volver_ruta, boto
 
     layout_final = ft.Stack(
         controls=[
-            ft.Image(src=fondo_hd, fit=ft.ImageFit.COVER, expand=True),
+            ft.Image(src=asset(fondo_hd, "fondo"), fit=ft.ImageFit.COVER, expand=True),
             ft.Container(bgcolor=ft.Colors.with_opacity(0.3, ft.Colors.BLACK), expand=True),
             contenido_superpuesto,
         ]
@@ -110,7 +133,9 @@ def vista_login(page: ft.Page, auth_use_cases: AuthUseCases):
             imagen_personaje_ref.current.visible = True
         page.update()
         if auth_use_cases.login(campo_usuario.value, campo_password.value):
-            page.go("/")
+            destino = getattr(page, "ruta_tras_login", None) or "/"
+            page.ruta_tras_login = None
+            page.go(destino)
         else:
             page.snack_bar = ft.SnackBar(ft.Text("Usuario o contraseña incorrectos."), bgcolor=ft.Colors.RED_ACCENT_700)
             page.snack_bar.open = True
@@ -178,7 +203,7 @@ def vista_login(page: ft.Page, auth_use_cases: AuthUseCases):
 
     imagen_personaje = ft.Image(
         ref=imagen_personaje_ref,
-        src=chef,
+        src=asset(chef, "personaje"),
         height=400,
         fit=ft.ImageFit.CONTAIN
     )
@@ -254,10 +279,18 @@ def vista_bienvenida(page: ft.Page):
         )
     )
 
-    imagen_pastel = ft.Image(
-        src=logo_pepe,
-        fit=ft.ImageFit.CONTAIN,
-        height=250,
+    def abrir_administracion(e):
+        page.ruta_tras_login = "/admin/impresion"
+        page.go("/login")
+
+    # Una pulsación larga sobre el logo lleva a la administración (previo inicio de sesión).
+    imagen_pastel = ft.GestureDetector(
+        on_long_press_start=abrir_administracion,
+        content=ft.Image(
+            src=asset(logo_pepe, "logo"),
+            fit=ft.ImageFit.CONTAIN,
+            height=250,
+        ),
     )
 
     texto_bienvenida = ft.Text(
@@ -318,7 +351,7 @@ def vista_bienvenida(page: ft.Page):
     layout_final = ft.Stack(
         controls=[
             ft.Image(
-                src=fondo_hd,
+                src=asset(fondo_hd, "fondo"),
                 fit=ft.ImageFit.FILL,
                 expand=True,
             ),
@@ -360,7 +393,7 @@ def vista_seleccion(page: ft.Page):
                         padding=10,
                         alignment=ft.alignment.center,
                         expand=2,
-                        content=ft.Image(src=imagen_src, fit=ft.ImageFit.COVER),
+                        content=ft.Image(src=asset(imagen_src, "opcion"), fit=ft.ImageFit.COVER),
                         border_radius=ft.border_radius.only(top_left=40, top_right=40),
                         clip_behavior=ft.ClipBehavior.ANTI_ALIAS
                     ),
@@ -413,7 +446,7 @@ def vista_seleccion(page: ft.Page):
 
 
     imagen_pastel = ft.Image(
-        src=logo_pepe,
+        src=asset(logo_pepe, "logo"),
         fit=ft.ImageFit.CONTAIN,
         width=424, height=254,  # Altura máxima para la imagen
     )
@@ -444,7 +477,7 @@ def vista_seleccion(page: ft.Page):
 
     layout_final = ft.Stack(
         controls=[
-            ft.Image(src=fondo_hd, fit=ft.ImageFit.COVER, expand=True),
+            ft.Image(src=asset(fondo_hd, "fondo"), fit=ft.ImageFit.COVER, expand=True),
             ft.Container(bgcolor=ft.Colors.with_opacity(0.5, ft.Colors.BLACK), expand=True),
             contenido_superpuesto,
         ]
@@ -472,23 +505,40 @@ def vista_fecha(page: ft.Page, use_cases: PedidoUseCases):
 
     texto_error = ft.Text(value="", color=ft.Colors.RED, visible=False, size=20, weight=ft.FontWeight.BOLD)
 
+    # La agenda ya trae precalculados los días llenos o sin horario; el DatePicker de Flet no permite
+    # deshabilitar días sueltos, así que se listan aquí y se rechazan al elegirlos.
+    fecha_inicial_valida, fecha_final_valida = use_cases.obtener_ventana_entrega()
+    dias_no_disponibles = set(use_cases.obtener_dias_no_disponibles())
+    proximos_no_disponibles = sorted(dias_no_disponibles)[:8]
+    texto_dias_no_disponibles = ft.Text(
+        value="Sin disponibilidad: " + ", ".join(d.strftime('%d/%m') for d in proximos_no_disponibles)
+              + ("..." if len(dias_no_disponibles) > len(proximos_no_disponibles) else ""),
+        visible=bool(dias_no_disponibles), size=16, color=ft.Colors.BLACK54, text_align=ft.TextAlign.CENTER,
+    )
+
     def on_date_change(e):
         fecha = e.control.value.date()
-        use_cases.seleccionar_fecha(fecha)
-        texto_fecha_seleccionada.value = fecha.strftime('%d/%m/%Y')
+        nuevos_rangos = [] if fecha in dias_no_disponibles else use_cases.obtener_rangos_de_hora(fecha)
 
         dropdown_hora.value = None
         dropdown_hora.options.clear()
         use_cases.seleccionar_hora(None)
 
-        nuevos_rangos = use_cases.obtener_rangos_de_hora(fecha)
-
-        if nuevos_rangos:
-            dropdown_hora.options = [ft.dropdown.Option(r) for r in nuevos_rangos]
-            dropdown_hora.disabled = False
-        else:
+        if not nuevos_rangos:
+            use_cases.seleccionar_fecha(None)
+            texto_fecha_seleccionada.value = "Toca para seleccionar"
             dropdown_hora.hint_text = "No hay horarios"
             dropdown_hora.disabled = True
+            texto_error.value = f"El {fecha.strftime('%d/%m/%Y')} ya no tiene horarios disponibles. Elige otro día."
+            texto_error.visible = True
+            page.update()
+            return
+
+        use_cases.seleccionar_fecha(fecha)
+        texto_fecha_seleccionada.value = fecha.strftime('%d/%m/%Y')
+        dropdown_hora.options = [ft.dropdown.Option(r) for r in nuevos_rangos]
+        dropdown_hora.hint_text = "Elige un rango de hora"
+        dropdown_hora.disabled = False
 
         texto_error.visible = False
         page.update()
@@ -500,16 +550,13 @@ def vista_fecha(page: ft.Page, use_cases: PedidoUseCases):
 
     dropdown_hora.on_change = on_time_change
 
-    fecha_hoy = datetime.date.today()
-    fecha_inicial_valida = fecha_hoy + datetime.timedelta(days=2)
-    fecha_final_valida = fecha_hoy + relativedelta(months=+6)
-
     def open_date_picker(e):
         page.open(
             ft.DatePicker(
                 first_date=fecha_inicial_valida, last_date=fecha_final_valida,
                 on_change=on_date_change,
-                value=use_cases.obtener_pedido_actual().fecha_entrega or fecha_inicial_valida
+                value=(use_cases.obtener_pedido_actual().fecha_entrega
+                       or use_cases.obtener_primer_dia_disponible() or fecha_inicial_valida)
             )
         )
 
@@ -556,6 +603,7 @@ def vista_fecha(page: ft.Page, use_cases: PedidoUseCases):
                     texto_fecha_seleccionada
                 ])
             ),
+            texto_dias_no_disponibles,
             dropdown_hora,
             texto_error,
         ]
@@ -581,7 +629,7 @@ def vista_fecha(page: ft.Page, use_cases: PedidoUseCases):
                     horizontal_alignment=ft.CrossAxisAlignment.CENTER,
                     spacing=20,
                     controls=[
-                        ft.Image(src=logo_pepe, width=424, height=254,),
+                        ft.Image(src=asset(logo_pepe, "logo"), width=424, height=254,),
                         panel_principal
                     ]
                 )
@@ -600,7 +648,7 @@ def vista_fecha(page: ft.Page, use_cases: PedidoUseCases):
 
     layout_final = ft.Stack(
         controls=[
-            ft.Image(src=fondo_hd, fit=ft.ImageFit.COVER, expand=True),
+            ft.Image(src=asset(fondo_hd, "fondo"), fit=ft.ImageFit.COVER, expand=True),
             ft.Container(bgcolor=ft.Colors.with_opacity(0.5, ft.Colors.BLACK), expand=True),
             contenido_superpuesto,
         ]
@@ -614,15 +662,15 @@ def vista_fecha(page: ft.Page, use_cases: PedidoUseCases):
 
 
 def vista_tamano(page: ft.Page, use_cases: PedidoUseCases):
-    use_cases.obtener_tamanos()
-    pedido_actual = use_cases.obtener_pedido_actual()
-
-
     texto_tamano = ft.Text(
-        value=pedido_actual.tamano_pastel or "N/A",
+        value="N/A",
         size=48, font_family="Bebas Neue", color="#623F19", text_align=ft.TextAlign.CENTER
     )
 
+    def reenlazar():
+        use_cases.obtener_tamanos()
+        texto_tamano.value = use_cases.obtener_pedido_actual().tamano_pastel or "N/A"
+
     def anterior(e):
         use_cases.seleccionar_anterior_tamano()
         texto_tamano.value = use_cases.obtener_pedido_actual().tamano_pastel
@@ -731,7 +779,7 @@ def vista_tamano(page: ft.Page, use_cases: PedidoUseCases):
                              alignment=ft.MainAxisAlignment.CENTER,
                              horizontal_alignment=ft.CrossAxisAlignment.CENTER,
                              controls=[
-                                 ft.Image(src=logo_pepe, width=424, height=254),
+                                 ft.Image(src=asset(logo_pepe, "logo"), width=424, height=254),
                                  ft.Container(height=20),
                                  ft.Text("Paso 2: Elige El Tamaño del Pastel", size=40, weight=ft.FontWeight.BOLD,
                                          color=ft.Colors.WHITE),
@@ -745,39 +793,43 @@ def vista_tamano(page: ft.Page, use_cases: PedidoUseCases):
 
     layout_final = ft.Stack(
         controls=[
-            ft.Image(src=fondo_hd, fit=ft.ImageFit.COVER, expand=True),
+            ft.Image(src=asset(fondo_hd, "fondo"), fit=ft.ImageFit.COVER, expand=True),
             contenido_superpuesto,
         ]
     )
 
-    return ft.View(
+    return asignar_reenlazado(ft.View(
         route="/tamano",
         controls=[layout_final],
         padding=0
-    )
+    ), reenlazar)
 
 
 def vista_categorias(page: ft.Page, use_cases: PedidoUseCases):
     ref_boton_continuar = ft.Ref[ft.Container]()
 
     imagen_logo = ft.Image(
-        src=logo_pepe,
+        src=asset(logo_pepe, "logo"),
         fit=ft.ImageFit.CONTAIN,
         width=424, height=254,
     )
 
-    def on_categoria_selected(e):
-        id_categoria = e.control.data
-        use_cases.seleccionar_categoria(id_categoria)
-
+    def marcar_seleccion(id_categoria):
         for card in carrusel.controls:
-            card.border = ft.border.all(3, ft.Colors.GREEN_500) if card == e.control else None
+            card.border = ft.border.all(3, ft.Colors.GREEN_500) if card.data == id_categoria else None
 
         if ref_boton_continuar.current:
-            ref_boton_continuar.current.disabled = False
+            ref_boton_continuar.current.disabled = id_categoria is None or id_categoria in categorias_sin_variantes
 
+    def on_categoria_selected(e):
+        id_categoria = e.control.data
+        use_cases.seleccionar_categoria(id_categoria)
+        marcar_seleccion(id_categoria)
         page.update()
 
+    def reenlazar():
+        marcar_seleccion(use_cases.obtener_pedido_actual().id_categoria)
+
     def crear_tarjeta_categoria(categoria):
         return ft.Container(
             width=226,
@@ -800,7 +852,8 @@ def vista_categorias(page: ft.Page, use_cases: PedidoUseCases):
                         margin=ft.margin.only(top=25),
                         border_radius=ft.border_radius.all(10),
                         clip_behavior=ft.ClipBehavior.ANTI_ALIAS,
-                        content=ft.Image(src=f"C:/KioscoPP/img/categorias/{categoria.imagen_url}", fit=ft.ImageFit.COVER)
+                        content=ft.Image(src=asset(f"C:/KioscoPP/img/categorias/{categoria.imagen_url}", "tarjeta"),
+                                         fit=ft.ImageFit.COVER)
                     ),
                     ft.Divider(height=1, color=ft.Colors.GREY_300),
                     ft.Text(
@@ -814,8 +867,13 @@ def vista_categorias(page: ft.Page, use_cases: PedidoUseCases):
         )
 
     lista_categorias = use_cases.obtener_categorias()
+    categorias_sin_variantes = use_cases.categorias_sin_variantes()
     carrusel = ft.Row(
-        controls=[crear_tarjeta_categoria(cat) for cat in lista_categorias],
+        controls=[
+            deshabilitar_tarjeta(crear_tarjeta_categoria(cat)) if cat.id in categorias_sin_variantes
+            else crear_tarjeta_categoria(cat)
+            for cat in lista_categorias
+        ],
         spacing=30,
         scroll=ft.ScrollMode.ALWAYS
     )
@@ -878,34 +936,40 @@ def vista_categorias(page: ft.Page, use_cases: PedidoUseCases):
 
     layout_final = ft.Stack(
         controls=[
-            ft.Image(src=fondo_hd, fit=ft.ImageFit.COVER, expand=True),
+            ft.Image(src=asset(fondo_hd, "fondo"), fit=ft.ImageFit.COVER, expand=True),
             ft.Container(bgcolor=ft.Colors.with_opacity(0.3, ft.Colors.BLACK), expand=True),
             contenido_superpuesto,
         ]
     )
 
-    return ft.View(
+    return asignar_reenlazado(ft.View(
         route="/categorias",
         controls=[layout_final],
         padding=0
-    )
+    ), reenlazar)
 
 
 def vista_forma(page: ft.Page, use_cases: PedidoUseCases):
     ref_boton_continuar = ft.Ref[ft.Container]()
 
-    def on_forma_selected(e):
-        forma_seleccionada = e.control.data
-        use_cases.seleccionar_tipo_forma(forma_seleccionada.id, forma_seleccionada.nombre)
-
+    def marcar_seleccion(id_forma):
         for card in carrusel_formas.controls:
-            card.border = ft.border.all(3, ft.Colors.GREEN_500) if card == e.control else None
+            card.border = ft.border.all(3, ft.Colors.GREEN_500) if card.data.id == id_forma else None
 
         if ref_boton_continuar.current:
-            ref_boton_continuar.current.disabled = False
+            ref_boton_continuar.current.disabled = id_forma is None or id_forma in formas_sin_variantes
 
+    def on_forma_selected(e):
+        forma_seleccionada = e.control.data
+        use_cases.seleccionar_tipo_forma(forma_seleccionada.id, forma_seleccionada.nombre)
+        marcar_seleccion(forma_seleccionada.id)
         page.update()
 
+    def reenlazar():
+        # Cambiar de categoría limpia tipo_forma pero conserva id_forma.
+        pedido = use_cases.obtener_pedido_actual()
+        marcar_seleccion(pedido.id_forma if pedido.tipo_forma else None)
+
     def restablecer(e):
         use_cases.iniciar_nuevo_pedido()
         page.go("/")
@@ -913,10 +977,13 @@ def vista_forma(page: ft.Page, use_cases: PedidoUseCases):
 
     carrusel_formas = ft.Row(scroll=ft.ScrollMode.ALWAYS, spacing=30)
     id_categoria_actual = use_cases.obtener_pedido_actual().id_categoria
+    formas_sin_variantes = use_cases.formas_sin_variantes(id_categoria_actual)
 
     for forma in use_cases.obtener_formas_por_categoria(id_categoria_actual):
         tarjeta = crear_tarjeta_seleccion(forma.nombre, f"C:/KioscoPP/img/formas/{forma.imagen_url}", on_forma_selected)
         tarjeta.data = forma
+        if forma.id in formas_sin_variantes:
+            deshabilitar_tarjeta(tarjeta)
         carrusel_formas.controls.append(tarjeta)
 
     contenido_superpuesto = ft.Column(
@@ -934,7 +1001,7 @@ def vista_forma(page: ft.Page, use_cases: PedidoUseCases):
                     spacing=30,
                     horizontal_alignment=ft.CrossAxisAlignment.CENTER,
                     controls=[
-                        ft.Image(src=logo_pepe, width=250),
+                        ft.Image(src=asset(logo_pepe, "logo"), width=250),
                         ft.Text("Paso 4: Elige la Forma", size=40, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE,
                                 text_align=ft.TextAlign.CENTER),
                         carrusel_formas
@@ -981,17 +1048,17 @@ def vista_forma(page: ft.Page, use_cases: PedidoUseCases):
 
     layout_final = ft.Stack(
         controls=[
-            ft.Image(src=fondo_hd, fit=ft.ImageFit.COVER, expand=True),
+            ft.Image(src=asset(fondo_hd, "fondo"), fit=ft.ImageFit.COVER, expand=True),
             ft.Container(bgcolor=ft.Colors.with_opacity(0.4, ft.Colors.BLACK), expand=True),
             contenido_superpuesto,
         ]
     )
 
-    return ft.View(
+    return asignar_reenlazado(ft.View(
         route="/forma",
         controls=[layout_final],
         padding=0
-    )
+    ), reenlazar)
 
 
 def vista_variante(page: ft.Page, use_cases: PedidoUseCases):
@@ -1055,7 +1122,7 @@ def vista_variante(page: ft.Page, use_cases: PedidoUseCases):
                     spacing=30,
                     horizontal_alignment=ft.CrossAxisAlignment.CENTER,
                     controls=[
-                        ft.Image(src=logo_pepe, width=250),
+                        ft.Image(src=asset(logo_pepe, "logo"), width=250),
                         ft.Text("Paso 5.1: Elige la Variante", size=40, weight=ft.FontWeight.BOLD,
                                 color=ft.Colors.WHITE,
                                 text_align=ft.TextAlign.CENTER),
@@ -1094,7 +1161,7 @@ def vista_variante(page: ft.Page, use_cases: PedidoUseCases):
 
     layout_final = ft.Stack(
         controls=[
-            ft.Image(src=fondo_hd, fit=ft.ImageFit.COVER, expand=True),
+            ft.Image(src=asset(fondo_hd, "fondo"), fit=ft.ImageFit.COVER, expand=True),
             ft.Container(bgcolor=ft.Colors.with_opacity(0.4, ft.Colors.BLACK), expand=True),
             contenido_superpuesto,
         ]
@@ -1128,29 +1195,38 @@ def vista_pan(page: ft.Page, use_cases: PedidoUseCases):
             logger.info(f"INFO: Se encontraron {len(configs)} configuraciones ambiguas. Navegando a /variante.")
             page.go("/variante")
 
-    def on_pan_selected(e):
-        id_pan, nombre_pan = e.control.data
-        use_cases.seleccionar_tipo_pan(id_pan, nombre_pan)
-
+    def marcar_seleccion(id_pan):
         for card in carrusel_panes.controls:
-            card.border = ft.border.all(3, ft.Colors.GREEN_500) if card == e.control else None
+            card.border = ft.border.all(3, ft.Colors.GREEN_500) if card.data[0] == id_pan else None
 
         if ref_boton_continuar.current:
-            ref_boton_continuar.current.disabled = False
+            ref_boton_continuar.current.disabled = id_pan is None or id_pan in panes_sin_variantes
 
+    def on_pan_selected(e):
+        id_pan, nombre_pan = e.control.data
+        use_cases.seleccionar_tipo_pan(id_pan, nombre_pan)
+        marcar_seleccion(id_pan)
         page.update()
 
+    def reenlazar():
+        # Cambiar de categoría limpia tipo_pan pero conserva id_pan.
+        pedido = use_cases.obtener_pedido_actual()
+        marcar_seleccion(pedido.id_pan if pedido.tipo_pan else None)
+
     def restablecer(e):
         use_cases.iniciar_nuevo_pedido()
         page.go("/")
 
     carrusel_panes = ft.Row(scroll=ft.ScrollMode.ALWAYS, spacing=30)
     id_categoria_actual = use_cases.obtener_pedido_actual().id_categoria
+    panes_sin_variantes = use_cases.panes_sin_variantes(id_categoria_actual)
 
     for pan in use_cases.obtener_panes_por_categoria(id_categoria_actual):
         tarjeta_pan = crear_tarjeta_seleccion(pan.nombre, "C:/KioscoPP/img/panes/{}".format(pan.imagen_url),
                                               on_pan_selected)
         tarjeta_pan.data = (pan.id, pan.nombre)
+        if pan.id in panes_sin_variantes:
+            deshabilitar_tarjeta(tarjeta_pan)
         carrusel_panes.controls.append(tarjeta_pan)
 
 
@@ -1169,7 +1245,7 @@ def vista_pan(page: ft.Page, use_cases: PedidoUseCases):
                     spacing=30,
                     horizontal_alignment=ft.CrossAxisAlignment.CENTER,
                     controls=[
-                        ft.Image(src=logo_pepe, width=250),
+                        ft.Image(src=asset(logo_pepe, "logo"), width=250),
                         ft.Text("Paso 5: Elige el Pan", size=40, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE,
                                 text_align=ft.TextAlign.CENTER),
                         carrusel_panes
@@ -1216,31 +1292,38 @@ def vista_pan(page: ft.Page, use_cases: PedidoUseCases):
 
     layout_final = ft.Stack(
         controls=[
-            ft.Image(src=fondo_hd, fit=ft.ImageFit.COVER, expand=True),
+            ft.Image(src=asset(fondo_hd, "fondo"), fit=ft.ImageFit.COVER, expand=True),
             ft.Container(bgcolor=ft.Colors.with_opacity(0.4, ft.Colors.BLACK), expand=True),
             contenido_superpuesto,
         ]
     )
 
-    return ft.View(
+    return asignar_reenlazado(ft.View(
         route="/pan",
         controls=[layout_final],
         padding=0
-    )
+    ), reenlazar)
 
 
 def vista_relleno(page: ft.Page, use_cases: PedidoUseCases):
     ref_boton_continuar = ft.Ref[ft.Container]()
 
-    def on_relleno_selected(e):
-        use_cases.seleccionar_tipo_relleno(e.control.data)
+    def marcar_seleccion(nombre_relleno):
         for card in carrusel_rellenos.controls:
-            card.border = ft.border.all(3, ft.Colors.GREEN_500) if card == e.control else None
+            if isinstance(card, ft.Container):
+                card.border = ft.border.all(3, ft.Colors.GREEN_500) if card.data == nombre_relleno else None
 
         if ref_boton_continuar.current:
-            ref_boton_continuar.current.disabled = False
+            ref_boton_continuar.current.disabled = nombre_relleno is None
+
+    def on_relleno_selected(e):
+        use_cases.seleccionar_tipo_relleno(e.control.data)
+        marcar_seleccion(e.control.data)
         page.update()
 
+    def reenlazar():
+        marcar_seleccion(use_cases.obtener_pedido_actual().tipo_relleno)
+
     def restablecer(e):
         use_cases.iniciar_nuevo_pedido()
         page.go("/")
@@ -1273,7 +1356,7 @@ def vista_relleno(page: ft.Page, use_cases: PedidoUseCases):
                     spacing=30,
                     horizontal_alignment=ft.CrossAxisAlignment.CENTER,
                     controls=[
-                        ft.Image(src=logo_pepe, width=250),
+                        ft.Image(src=asset(logo_pepe, "logo"), width=250),
                         ft.Text("Paso 6: Elige el Relleno", size=40, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE,
                                 text_align=ft.TextAlign.CENTER),
                         carrusel_rellenos
@@ -1320,32 +1403,39 @@ def vista_relleno(page: ft.Page, use_cases: PedidoUseCases):
 
     layout_final = ft.Stack(
         controls=[
-            ft.Image(src=fondo_hd, fit=ft.ImageFit.COVER, expand=True),
+            ft.Image(src=asset(fondo_hd, "fondo"), fit=ft.ImageFit.COVER, expand=True),
             ft.Container(bgcolor=ft.Colors.with_opacity(0.4, ft.Colors.BLACK), expand=True),
             contenido_superpuesto,
         ]
     )
 
-    return ft.View(
+    return asignar_reenlazado(ft.View(
         route="/relleno",
         controls=[layout_final],
         padding=0
-    )
+    ), reenlazar)
 
 
 def vista_cobertura(page: ft.Page, use_cases: PedidoUseCases):
     ref_boton_continuar = ft.Ref[ft.Container]()
 
-    def on_cobertura_selected(e):
-        use_cases.seleccionar_tipo_cobertura(e.control.data)
-        use_cases.obtener_precio_pastel_configurado()
+    def marcar_seleccion(nombre_cobertura):
         for card in carrusel_coberturas.controls:
-            card.border = ft.border.all(3, ft.Colors.GREEN_500) if card == e.control else None
+            if isinstance(card, ft.Container):
+                card.border = ft.border.all(3, ft.Colors.GREEN_500) if card.data == nombre_cobertura else None
 
         if ref_boton_continuar.current:
-            ref_boton_continuar.current.disabled = False
+            ref_boton_continuar.current.disabled = nombre_cobertura is None
+
+    def on_cobertura_selected(e):
+        use_cases.seleccionar_tipo_cobertura(e.control.data)
+        use_cases.obtener_precio_pastel_configurado()
+        marcar_seleccion(e.control.data)
         page.update()
 
+    def reenlazar():
+        marcar_seleccion(use_cases.obtener_pedido_actual().tipo_cobertura)
+
     def restablecer(e):
         use_cases.iniciar_nuevo_pedido()
         page.go("/")
@@ -1378,7 +1468,7 @@ def vista_cobertura(page: ft.Page, use_cases: PedidoUseCases):
                     spacing=30,
                     horizontal_alignment=ft.CrossAxisAlignment.CENTER,
                     controls=[
-                        ft.Image(src=logo_pepe, width=250),
+                        ft.Image(src=asset(logo_pepe, "logo"), width=250),
                         ft.Text("Paso 7: Elige la Cobertura", size=40, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE,
                                 text_align=ft.TextAlign.CENTER),
                         carrusel_coberturas
@@ -1425,17 +1515,17 @@ def vista_cobertura(page: ft.Page, use_cases: PedidoUseCases):
 
     layout_final = ft.Stack(
         controls=[
-            ft.Image(src=fondo_hd, fit=ft.ImageFit.COVER, expand=True),
+            ft.Image(src=asset(fondo_hd, "fondo"), fit=ft.ImageFit.COVER, expand=True),
             ft.Container(bgcolor=ft.Colors.with_opacity(0.4, ft.Colors.BLACK), expand=True),
             contenido_superpuesto,
         ]
     )
 
-    return ft.View(
+    return asignar_reenlazado(ft.View(
         route="/cobertura",
         controls=[layout_final],
         padding=0
-    )
+    ), reenlazar)
 
 
 def vista_decorado1(page: ft.Page, use_cases: PedidoUseCases):
@@ -1448,55 +1538,17 @@ def vista_decorado1(page: ft.Page, use_cases: PedidoUseCases):
         {"nombre": "Temática o Personaje", "imagen": "C:/KioscoPP/img/decorado/tematica.png", "ruta_destino": "/mensaje"}
     ]
 
-    opciones_a_mostrar = []
-
-    nombre_categoria = pedido_actual.nombre_categoria
-    if not nombre_categoria and pedido_actual.id_categoria:
-        categoria_obj = use_cases.categoria_repo.obtener_por_id(pedido_actual.id_categoria)
-        if categoria_obj:
-            nombre_categoria = categoria_obj.nombre
-
-    if nombre_categoria == "CASERO" and pedido_actual.tipo_cobertura == "CHORREADO":
-        logger.info("INFO: Condición Casero + Chorreado cumplida. Navegando directo a /decorado2.")
-        use_cases.seleccionar_tipo_decorado("Liso c/s Conchas de Betún")
-        use_cases.guardar_detalle_decorado("Liso c/s Conchas de Betún", "Chorreado")
+    opciones = use_cases.obtener_opciones_decorado()
+    if opciones.detalle_directo:
+        tipo_decorado = opciones.decorados[0]
+        logger.info(f"INFO: Decorado único '{tipo_decorado}' ({opciones.detalle_directo}). Navegando directo a /decorado2.")
+        use_cases.seleccionar_tipo_decorado(tipo_decorado)
+        use_cases.guardar_detalle_decorado(tipo_decorado, opciones.detalle_directo)
         page.go("/decorado2")
         return ft.View(route="/decorado1", controls=[], padding=0)
 
-
-    if nombre_categoria == "TRES LECHES" and pedido_actual.tipo_cobertura in ["CHANTILLY", "ESCENARIO DE ACETATOS"]:
-        opciones_a_mostrar = [
-            opcion for opcion in opciones_decorado_base
-            if opcion["nombre"] in ["Imágenes Prediseñadas", "Temática o Personaje"]
-        ]
-        logger.info(f"INFO: Condición Tres Leches + {pedido_actual.tipo_cobertura} cumplida. Mostrando decorados filtrados.")
-    elif nombre_categoria == "TRES LECHES" and pedido_actual.tipo_cobertura == "CHORREADO":
-        opciones_a_mostrar = [
-            opcion for opcion in opciones_decorado_base
-            if opcion["nombre"] == "Liso c/s Conchas de Betún"
-        ]
-        logger.info("INFO: Condición Tres Leches + Chorreado cumplida. Mostrando solo 'Liso'.")
-    elif nombre_categoria == "ESPECIALIDAD" and pedido_actual.tipo_cobertura in ["BETUN CON MERENGUE", "ESCENARIO DE ACETATOS", "GANACHE DE CHOCOLATE"]:
-        opciones_a_mostrar = [
-            opcion for opcion in opciones_decorado_base
-            if opcion["nombre"] in ["Imágenes Prediseñadas", "Temática o Personaje"]
-        ]
-        logger.info(
-            f"INFO: Condición Especialidad + {pedido_actual.tipo_cobertura} cumplida. Mostrando 'Imágenes' y 'Temática'.")
-    elif nombre_categoria == "CASERO" and pedido_actual.tipo_cobertura in ["FONDANT", "ESCENARIO DE ACETATOS"]:
-        opciones_a_mostrar = [
-            opcion for opcion in opciones_decorado_base
-            if opcion["nombre"] in ["Imágenes Prediseñadas", "Temática o Personaje"]
-        ]
-        logger.info(
-            f"INFO: Condición Casero + {pedido_actual.tipo_cobertura} cumplida. Mostrando 'Imágenes' y 'Temática'.")
-    else:
-        opciones_a_mostrar = [
-            opcion for opcion in opciones_decorado_base
-            if opcion["nombre"] in ["Liso c/s Conchas de Betún", "Imágenes Prediseñadas"]
-        ]
-        logger.info(
-            f"INFO: Ninguna condición especial cumplida (Cat: {nombre_categoria}, Cob: {pedido_actual.tipo_cobertura}). Mostrando 'Liso' e 'Imágenes'.")
+    opciones_a_mostrar = [opcion for opcion in opciones_decorado_base if opcion["nombre"] in opciones.decorados]
+    logger.info(f"INFO: Decorados disponibles (Cob: {pedido_actual.tipo_cobertura}): {list(opciones.decorados)}")
 
     def on_decorado_principal_click(e):
         opcion_seleccionada = e.control.data
@@ -1564,7 +1616,7 @@ def vista_decorado1(page: ft.Page, use_cases: PedidoUseCases):
                     spacing=30,
                     horizontal_alignment=ft.CrossAxisAlignment.CENTER,
                     controls=[
-                        ft.Image(src=logo_pepe, width=250),
+                        ft.Image(src=asset(logo_pepe, "logo"), width=250),
                         ft.Text("Paso 8: Elige el Estilo", size=40, weight=ft.FontWeight.BOLD, color=ft.Colors.WHITE,
                                 text_align=ft.TextAlign.CENTER),
                         carrusel_decorado
@@ -1600,7 +1652,7 @@ def vista_decorado1(page: ft.Page, use_cases: PedidoUseCases):
 
     layout_final = ft.Stack(
         controls=[
-            ft.Image(src=fondo_hd, fit=ft.ImageFit.COVER, expand=True),
+            ft.Image(src=asset(fondo_hd, "fondo"), fit=ft.ImageFit.COVER, expand=True),
             ft.Container(bgcolor=ft.Colors.with_opacity(0.4, ft.Colors.BLACK), expand=True),
             contenido_superpuesto,
         ]
@@ -1755,7 +1807,7 @@ def vista_decorado2(page: ft.Page, use_cases: PedidoUseCases):
                     horizontal_alignment=ft.CrossAxisAlignment.CENTER,
                     scroll=ft.ScrollMode.ADAPTIVE,
                     controls=[
-                        ft.Image(src=logo_pepe, width=250),
+                        ft.Image(src=asset(logo_pepe, "logo"), width=250),
                         ft.Text("Paso 8.1: Detalla tu Decorado", size=40, weight=ft.FontWeight.BOLD,
                                 color=ft.Colors.WHITE, text_align=ft.TextAlign.CENTER),
                         panel_principal,
@@ -1777,7 +1829,7 @@ def vista_decorado2(page: ft.Page, use_cases: PedidoUseCases):
     )
     layout_final = ft.Stack(
         controls=[
-            ft.Image(src=fondo_hd, fit=ft.ImageFit.COVER, expand=True),
+            ft.Image(src=asset(fondo_hd, "fondo"), fit=ft.ImageFit.COVER, expand=True),
             ft.Container(bgcolor=ft.Colors.with_opacity(0.4, ft.Colors.BLACK), expand=True),
             contenido_superpuesto,
         ]
@@ -1802,8 +1854,8 @@ def vista_galeria(page: ft.Page, use_cases: PedidoUseCases):
             target.value = target.value[:-1] if target.value else ""
         else:
             target.value += key
-        actualizar_galeria()
-        page.update()
+        target.update()
+        busqueda.solicitar(consulta_actual())
 
     def on_textfield_focus(e):
         campo_enfocado.current = e.control
@@ -1822,13 +1874,74 @@ def vista_galeria(page: ft.Page, use_cases: PedidoUseCases):
     )
     teclado_virtual.keyboard_control.visible = False
 
+    # La galería se carga por páginas: al acercarse al final del scroll se pide la siguiente, y se piden
+    # tantas como hagan falta para que la cuadrícula desborde la pantalla (si no, nunca habría scroll).
+    # `consulta` es la búsqueda que produjo lo mostrado; las páginas siguientes la usan aunque el texto ya cambió.
+    # Solo las filas cercanas a la visible llevan su mosaico con imagen; las demás son contenedores vacíos del
+    # mismo tamaño, así la memoria no crece con cada página vista y el scroll no salta.
+    tamano_pagina = 30
+    extension_mosaico, espaciado = 200, 10
+    estado_paginacion = {"consulta": (None, ""), "cursor": None, "hay_mas": False}
+    imagenes = []
+    ventana = {"filas": (0, 0)}
+    lock_grid = threading.Lock()
+
+    def geometria() -> tuple[int, float, int]:
+        """(columnas, alto de fila, filas visibles) según el tamaño de la ventana, como los calcula GridView."""
+        ancho = (page.width or 1920) - 40
+        alto_visible = (page.height or 1080) - 67 - 40 - 150  # franja superior, márgenes, título y filtros
+        columnas = max(1, math.ceil(ancho / (extension_mosaico + espaciado)))
+        alto_fila = (ancho - espaciado * (columnas - 1)) / columnas + espaciado
+        return columnas, alto_fila, max(1, math.ceil(alto_visible / alto_fila))
+
+    def filas_ventana(pixeles: float) -> tuple[int, int]:
+        _, alto_fila, filas_visibles = geometria()
+        primera = int(pixeles // alto_fila)
+        return max(0, primera - filas_visibles), primera + 2 * filas_visibles
+
+    def aplicar_ventana():
+        """Pone mosaico a las imágenes dentro de la ventana y contenedor vacío al resto; no toca los que ya están bien."""
+        columnas = geometria()[0]
+        desde, hasta = ventana["filas"]
+        controles = grid.controls
+        for i, img in enumerate(imagenes):
+            en_ventana = desde * columnas <= i < hasta * columnas
+            if i < len(controles) and (controles[i].content is not None) == en_ventana:
+                continue
+            control = crear_mosaico(img) if en_ventana else ft.Container(data=img.id)
+            if i < len(controles):
+                controles[i] = control
+            else:
+                controles.append(control)
+
+    def minimo_para_llenar() -> int:
+        columnas, _, filas_visibles = geometria()
+        return columnas * (filas_visibles + 1)
+
+    def on_grid_scroll(e: ft.OnScrollEvent):
+        if not lock_grid.acquire(blocking=False):
+            return
+        try:
+            filas = filas_ventana(e.pixels)
+            cambio = filas != ventana["filas"]
+            if cambio:
+                ventana["filas"] = filas
+                aplicar_ventana()
+        finally:
+            lock_grid.release()
+        cerca_del_final = e.max_scroll_extent and e.pixels >= e.max_scroll_extent - 400
+        if not (cerca_del_final and cargar_siguiente_pagina()) and cambio:
+            grid.update()
+
     grid = ft.GridView(
         expand=True,
         runs_count=5,
-        max_extent=200,
+        max_extent=extension_mosaico,
         child_aspect_ratio=1.0,
-        spacing=10,
-        run_spacing=10
+        spacing=espaciado,
+        run_spacing=espaciado,
+        on_scroll=on_grid_scroll,
+        on_scroll_interval=100,
     )
 
     def on_image_click(e):
@@ -1836,44 +1949,85 @@ def vista_galeria(page: ft.Page, use_cases: PedidoUseCases):
         use_cases.seleccionar_imagen_decorado(id_imagen_seleccionada)
         page.go("/mensaje")
 
-    def actualizar_galeria(e=None):
+    def crear_mosaico(img):
+        return ft.Container(
+            data=img.id,
+            on_click=on_image_click,
+            tooltip=f"Seleccionar {img.descripcion}",
+            border_radius=ft.border_radius.all(10),
+            clip_behavior=ft.ClipBehavior.ANTI_ALIAS,
+            content=ft.Stack(
+                [
+                    ft.Image(
+                        src=asset(img.ruta, "galeria"),
+                        fit=ft.ImageFit.COVER,
+                    ),
+                    ft.Container(
+                        content=ft.Text(img.categoria, color="white", weight=ft.FontWeight.BOLD),
+                        # Asumo que es 'nombre' y no 'descripcion'
+                        bgcolor=ft.Colors.with_opacity(0.4, ft.Colors.BLACK),
+                        padding=8,
+                        alignment=ft.alignment.bottom_center,
+                        gradient=ft.LinearGradient(
+                            begin=ft.alignment.top_center,
+                            end=ft.alignment.bottom_center,
+                            colors=[ft.Colors.TRANSPARENT, ft.Colors.BLACK],
+                        )
+                    )
+                ]
+            )
+        )
+
+    def consulta_actual() -> tuple[str | None, str]:
         categoria_filtro = filtro_categoria.value if filtro_categoria.value != "Todas" else None
-        termino_busqueda = campo_busqueda.value
+        return categoria_filtro, (campo_busqueda.value or "").strip()
+
+    def buscar_primera_pagina(consulta):
+        categoria_filtro, termino = consulta
+        pagina = use_cases.buscar_pagina_galeria(categoria_filtro, termino, None, tamano_pagina)
+        resultado, minimo = list(pagina.imagenes), minimo_para_llenar()
+        while pagina.cursor_siguiente is not None and len(resultado) < minimo:
+            pagina = use_cases.buscar_pagina_galeria(categoria_filtro, termino, pagina.cursor_siguiente, tamano_pagina)
+            resultado.extend(pagina.imagenes)
+        return pagina._replace(imagenes=resultado)
+
+    def mostrar_resultados(consulta, pagina, actualizar: bool = True):
+        with lock_grid:
+            imagenes[:] = pagina.imagenes
+            ventana["filas"] = filas_ventana(0)
+            grid.controls = []
+            aplicar_ventana()
+            estado_paginacion.update(consulta=consulta, cursor=pagina.cursor_siguiente,
+                                     hay_mas=pagina.cursor_siguiente is not None)
+        if actualizar:
+            grid.update()
+            grid.scroll_to(offset=0)
+
+    def cargar_siguiente_pagina() -> bool:
+        # Si ya hay una carga (o se están poniendo resultados nuevos) este evento de scroll se ignora.
+        if not estado_paginacion["hay_mas"] or not lock_grid.acquire(blocking=False):
+            return False
+        try:
+            categoria_filtro, termino = estado_paginacion["consulta"]
+            pagina = use_cases.buscar_pagina_galeria(
+                categoria_filtro, termino, estado_paginacion["cursor"], tamano_pagina
+            )
+            imagenes.extend(pagina.imagenes)
+            aplicar_ventana()
+            estado_paginacion["cursor"] = pagina.cursor_siguiente
+            estado_paginacion["hay_mas"] = pagina.cursor_siguiente is not None
+        finally:
+            lock_grid.release()
+        grid.update()
+        return True
 
-        grid.controls.clear()
+    busqueda = BusquedaDiferida(buscar_primera_pagina, mostrar_resultados)
 
-        imagenes = use_cases.buscar_imagenes_galeria(categoria_filtro, termino_busqueda)
-        for img in imagenes:
-            grid.controls.append(
-                ft.Container(
-                    data=img.id,
-                    on_click=on_image_click,
-                    tooltip=f"Seleccionar {img.descripcion}",
-                    border_radius=ft.border_radius.all(10),
-                    clip_behavior=ft.ClipBehavior.ANTI_ALIAS,
-                    content=ft.Stack(
-                        [
-                            ft.Image(
-                                src=img.ruta,
-                                fit=ft.ImageFit.COVER,
-                            ),
-                            ft.Container(
-                                content=ft.Text(img.categoria, color="white", weight=ft.FontWeight.BOLD),
-                                # Asumo que es 'nombre' y no 'descripcion'
-                                bgcolor=ft.Colors.with_opacity(0.4, ft.Colors.BLACK),
-                                padding=8,
-                                alignment=ft.alignment.bottom_center,
-                                gradient=ft.LinearGradient(
-                                    begin=ft.alignment.top_center,
-                                    end=ft.alignment.bottom_center,
-                                    colors=[ft.Colors.TRANSPARENT, ft.Colors.BLACK],
-                                )
-                            )
-                        ]
-                    )
-                )
-            )
-        page.update()
+    def on_busqueda_change(e):
+        busqueda.solicitar(consulta_actual())
+
+    def on_categoria_change(e):
+        busqueda.solicitar(consulta_actual(), inmediata=True)
 
     filtro_categoria = ft.Dropdown(
         label="Filtrar por categoría",
@@ -1890,12 +2044,12 @@ def vista_galeria(page: ft.Page, use_cases: PedidoUseCases):
             ft.dropdown.Option("Cumpleaños"),
         ],
         value="Todas",
-        on_change=actualizar_galeria,
+        on_change=on_categoria_change,
         expand=True
     )
     campo_busqueda = ft.TextField(
         label="Buscar...",
-        on_change=actualizar_galeria,
+        on_change=on_busqueda_change,
         #on_focus=on_textfield_focus,
         expand=True
     )
@@ -1936,13 +2090,14 @@ def vista_galeria(page: ft.Page, use_cases: PedidoUseCases):
 
     layout_final = ft.Stack(
         controls=[
-            ft.Image(src=fondo_hd, fit=ft.ImageFit.COVER, expand=True),
+            ft.Image(src=asset(fondo_hd, "fondo"), fit=ft.ImageFit.COVER, expand=True),
             ft.Container(bgcolor=ft.Colors.with_opacity(0.4, ft.Colors.BLACK), expand=True),
             contenido_superpuesto
         ]
     )
 
-    actualizar_galeria()
+    consulta_inicial = consulta_actual()
+    mostrar_resultados(consulta_inicial, buscar_primera_pagina(consulta_inicial), actualizar=False)
 
     return ft.View(
         route="/galeria",
@@ -2009,7 +2164,7 @@ def vista_mensaje(page: ft.Page, use_cases: PedidoUseCases):
                     spacing=30,
                     horizontal_alignment=ft.CrossAxisAlignment.CENTER,
                     controls=[
-                        ft.Image(src=logo_pepe, width=250),
+                        ft.Image(src=asset(logo_pepe, "logo"), width=250),
                         ft.Text("Paso 9: Mensaje y Edad", size=40, weight=ft.FontWeight.BOLD,
                                 color=ft.Colors.WHITE, text_align=ft.TextAlign.CENTER),
                         panel_principal
@@ -2031,7 +2186,7 @@ def vista_mensaje(page: ft.Page, use_cases: PedidoUseCases):
 
     layout_final = ft.Stack(
         controls=[
-            ft.Image(src=fondo_hd, fit=ft.ImageFit.COVER, expand=True),
+            ft.Image(src=asset(fondo_hd, "fondo"), fit=ft.ImageFit.COVER, expand=True),
             contenido_superpuesto,
         ]
     )
@@ -2207,7 +2362,7 @@ def vista_extras(page: ft.Page, use_cases: PedidoUseCases):
             ),
             ft.Container(expand=True),
 
-            ft.Image(src=logo_pepe, width=424, height=254),
+            ft.Image(src=asset(logo_pepe, "logo"), width=424, height=254),
 
             panel_interactivo,
 
@@ -2229,7 +2384,7 @@ def vista_extras(page: ft.Page, use_cases: PedidoUseCases):
 
     layout_final = ft.Stack(
         controls=[
-            ft.Image(src=fondo_hd, fit=ft.ImageFit.COVER, expand=True),
+            ft.Image(src=asset(fondo_hd, "fondo"), fit=ft.ImageFit.COVER, expand=True),
             contenido_superpuesto,
         ]
     )
@@ -2344,7 +2499,7 @@ def vista_datos_cliente(page: ft.Page, use_cases: PedidoUseCases, finalizar_use_
     estado = crear_campo_texto("Estado")
     referencias = crear_campo_texto("Referencias del domicilio", multiline=True, min_lines=3)
 
-    logo = ft.Image(ref=logo_ref, src=logo_pepe, width=250)
+    logo = ft.Image(ref=logo_ref, src=asset(logo_pepe, "logo"), width=250)
     titulo = ft.Text(ref=titulo_ref, value="Datos de entrega", size=40, color=ft.Colors.WHITE, font_family="Cabin",
                      weight=ft.FontWeight.W_700)
 
@@ -2419,7 +2574,7 @@ def vista_datos_cliente(page: ft.Page, use_cases: PedidoUseCases, finalizar_use_
 
     layout_final = ft.Stack(
         controls=[
-            ft.Image(src=fondo_hd, fit=ft.ImageFit.COVER, expand=True),
+            ft.Image(src=asset(fondo_hd, "fondo"), fit=ft.ImageFit.COVER, expand=True),
             contenido_superpuesto,
         ]
     )
@@ -2441,8 +2596,6 @@ def vista_datos_cliente(page: ft.Page, use_cases: PedidoUseCases, finalizar_use_
 
 
 def vista_confirmacion(page: ft.Page, use_cases: FinalizarPedidoUseCases, pedido_use_cases: PedidoUseCases):
-    from src.infrastructure.printing_service import PrintingService
-
     ticket_finalizado = use_cases.finalizar_y_obtener_ticket()
     pedido = pedido_use_cases.obtener_pedido_actual()
 
@@ -2452,12 +2605,8 @@ def vista_confirmacion(page: ft.Page, use_cases: FinalizarPedidoUseCases, pedido
         page.go("/")
         page.update()
         return
-    try:
-        ps = PrintingService()
-        pdf_path = ps.generar_ticket_pdf(ticket_finalizado)
-        ps.enviar_a_impresora(pdf_path)
-    except Exception as e:
-        logger.error(f"ERROR impresión: {e}")
+    # El PDF y el envío a la impresora se hacen en la cola de impresión; la vista se muestra de inmediato.
+    use_cases.imprimir_ticket(ticket_finalizado)
 
     def animar_entrada():
         import time
@@ -2488,7 +2637,7 @@ def vista_confirmacion(page: ft.Page, use_cases: FinalizarPedidoUseCases, pedido
             return ft.Row(
                 spacing=15,
                 controls=[
-                    ft.Image(src=f"c:/KioscoPP/img/iconos/{icono}", width=40, height=40),
+                    ft.Image(src=asset(f"c:/KioscoPP/img/iconos/{icono}", "icono"), width=40, height=40),
                     ft.Column(
                         spacing=0,
                         controls=[
@@ -2506,24 +2655,12 @@ def vista_confirmacion(page: ft.Page, use_cases: FinalizarPedidoUseCases, pedido
             except Exception:
                 return f"${v}"
 
-        # Detalle del extra (por si es Flor Artificial multiplicada)
-        extra_detalle = ""
-        unit = (getattr(t, 'extra_precio', None) if getattr(t, 'extra_precio', None) is not None else (getattr(t, 'extra_costo', 0.0) or 0.0))
-        qty = getattr(t, 'extra_flor_cantidad', 0) or 0
-        if getattr(t, 'extra_seleccionado', None):
-            if t.extra_seleccionado == "Flor Artificial" and qty > 0:
-                extra_monto = unit * qty
-                extra_detalle = f"{t.extra_seleccionado} ({qty} x {mxn(unit)})"
-            else:
-                extra_monto = unit
-                extra_detalle = t.extra_seleccionado
+        # Mismos montos que el ticket impreso: la cotización se arma con lo guardado del pedido.
+        cotizacion = use_cases.cotizar_ticket(t)
+        if cotizacion.extra_cantidad > 1:
+            extra_detalle = f"{cotizacion.extra_seleccionado} ({cotizacion.extra_cantidad} x {mxn(cotizacion.extra_unitario)})"
         else:
-            extra_monto = 0.0
-        costo_pastel = (getattr(t, 'precio_pastel', 0.0) or 0.0)
-        monto_deposito = (getattr(t, 'monto_deposito', 0.0) or 0.0)
-        subtotal = (costo_pastel or 0.0) + (extra_monto or 0.0)
-        costo_envio = 50.0 if subtotal < 500 else 0.0
-        total_mostrar = subtotal + costo_envio + monto_deposito
+            extra_detalle = cotizacion.extra_seleccionado or ""
 
         # 'incluye' puede no existir en Ticket; usar vacío como fallback
         incluye_texto = p.incluye #getattr(t, 'incluye', '') or ''
@@ -2574,33 +2711,33 @@ def vista_confirmacion(page: ft.Page, use_cases: FinalizarPedidoUseCases, pedido
                                 controls=[
                                     ft.Row(
                                         alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                                        controls=[ft.Text("Precio del pastel"), ft.Text(mxn(costo_pastel))]
+                                        controls=[ft.Text("Precio del pastel"), ft.Text(mxn(cotizacion.precio_pastel))]
                                     ),
                                     ft.Row(
                                         alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
                                         controls=[
                                             ft.Text("Extra" + (f" – {extra_detalle}" if extra_detalle else "")),
-                                            ft.Text(mxn(extra_monto))
+                                            ft.Text(mxn(cotizacion.extra_costo))
                                         ]
                                     ),
                                     ft.Row(
                                         alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
                                         controls=[
                                             ft.Text("Depósito (base)"),
-                                            ft.Text(mxn(monto_deposito))
+                                            ft.Text(mxn(cotizacion.monto_deposito))
                                         ]
                                     ),
                                     ft.Row(
                                         alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
                                         controls=[
                                             ft.Text("Costo de envío"),
-                                            ft.Text(mxn(costo_envio))
+                                            ft.Text(mxn(cotizacion.costo_envio))
                                         ]
                                     ),
                                     ft.Divider(height=10),
                                     ft.Row(
                                         alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                                        controls=[ft.Text("Total", weight=ft.FontWeight.W_700), ft.Text(mxn(total_mostrar), weight=ft.FontWeight.W_700)]
+                                        controls=[ft.Text("Total", weight=ft.FontWeight.W_700), ft.Text(mxn(cotizacion.total), weight=ft.FontWeight.W_700)]
                                     ),
                                 ]
                             )
@@ -2636,7 +2773,7 @@ def vista_confirmacion(page: ft.Page, use_cases: FinalizarPedidoUseCases, pedido
         )
         return vista_error, lambda: None
 
-    logo = ft.Image(src=logo_pepe, width=424, height=254, opacity=0, animate_opacity=300)
+    logo = ft.Image(src=asset(logo_pepe, "logo"), width=424, height=254, opacity=0, animate_opacity=300)
 
     titulo = ft.Text("¡Pedido confirmado!", size=45, font_family="Outfit", weight=ft.FontWeight.W_700,
                      text_align=ft.TextAlign.CENTER, color=ft.Colors.WHITE, opacity=0, animate_opacity=500)
@@ -2686,7 +2823,7 @@ def vista_confirmacion(page: ft.Page, use_cases: FinalizarPedidoUseCases, pedido
 
     layout_final = ft.Stack(
         controls=[
-            ft.Image(src=fondo_hd, fit=ft.ImageFit.COVER, expand=True),
+            ft.Image(src=asset(fondo_hd, "fondo"), fit=ft.ImageFit.COVER, expand=True),
 
             ft.Column(
                 expand=True,
@@ -2718,3 +2855,84 @@ def vista_confirmacion(page: ft.Page, use_cases: FinalizarPedidoUseCases, pedido
     )
 
     return vista, animar_entrada
+
+
+def vista_admin_impresion(page: ft.Page, use_cases: FinalizarPedidoUseCases):
+    etiquetas_estado = {
+        ESTADO_EN_COLA: ("En cola", ft.Colors.GREY_600),
+        ESTADO_GENERANDO: ("Generando", ft.Colors.BLUE_600),
+        ESTADO_ENVIADO: ("Enviado a la impresora", ft.Colors.GREEN_700),
+        ESTADO_FALLIDO: ("Falló", ft.Colors.RED_700),
+    }
+
+    lista_trabajos = ft.ListView(expand=True, spacing=10, padding=20)
+
+    def reintentar(e):
+        if use_cases.reintentar_impresion(e.control.data):
+            page.snack_bar = ft.SnackBar(ft.Text("Ticket enviado de nuevo a la cola de impresión."))
+        else:
+            page.snack_bar = ft.SnackBar(ft.Text("El trabajo ya no está disponible para reintentar."))
+        page.snack_bar.open = True
+        refrescar()
+
+    def crear_fila_trabajo(trabajo):
+        texto_estado, color_estado = etiquetas_estado.get(trabajo.estado, (trabajo.estado, ft.Colors.GREY_600))
+        detalle = f"Intentos: {trabajo.intentos} · {trabajo.actualizado_en.strftime('%d/%m/%Y %H:%M:%S')}"
+        if trabajo.error:
+            detalle += f"\n{trabajo.error}"
+        return ft.Container(
+            padding=15,
+            bgcolor=ft.Colors.WHITE,
+            border_radius=15,
+            content=ft.Row(
+                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+                controls=[
+                    ft.Column(
+                        spacing=2,
+                        expand=True,
+                        controls=[
+                            ft.Text(f"Pedido #{trabajo.id_pedido} – {trabajo.ticket.nombre_cliente}", size=18,
+                                    weight=ft.FontWeight.BOLD),
+                            ft.Text(texto_estado, color=color_estado, weight=ft.FontWeight.W_600),
+                            ft.Text(detalle, size=12, color=ft.Colors.GREY_600),
+                        ]
+                    ),
+                    ft.ElevatedButton(
+                        "Reintentar", icon=ft.Icons.PRINT, data=trabajo.id, on_click=reintentar,
+                        visible=trabajo.estado == ESTADO_FALLIDO,
+                    ),
+                ]
+            )
+        )
+
+    def cargar_trabajos():
+        trabajos = use_cases.trabajos_impresion()
+        lista_trabajos.controls = [crear_fila_trabajo(t) for t in trabajos] or [
+            ft.Text("No hay tickets en la cola de impresión.", size=18, color=ft.Colors.GREY_600)
+        ]
+
+    def refrescar(e=None):
+        cargar_trabajos()
+        page.update()
+
+    cargar_trabajos()
+
+    encabezado = ft.Row(
+        alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+        controls=[
+            ft.Text("Cola de impresión", size=40, font_family="Bebas Neue", color="#6D6D6D"),
+            ft.Row(
+                controls=[
+                    ft.IconButton(icon=ft.Icons.REFRESH, tooltip="Actualizar", on_click=refrescar),
+                    ft.IconButton(icon=ft.Icons.HOME, tooltip="Salir", on_click=lambda _: page.go("/")),
+                ]
+            ),
+        ]
+    )
+
+    return ft.View(
+        route="/admin/impresion",
+        bgcolor="#F8F2ED",
+        padding=30,
+        controls=[encabezado, lista_trabajos],
+    )
@@ -0,0 +1,48 @@
+import threading
+from src.application.repositories import SucursalRepository, Sucursal
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class IdentidadKiosco:
+    """Datos de la sucursal del kiosco, leídos una vez y recargados solo cuando cambia config.db."""
+
+    SUCURSAL_POR_DEFECTO = Sucursal(n_sucursal_pk=1, c_identificador="")
+
+    def __init__(self, sucursal_repo: SucursalRepository):
+        self.sucursal_repo = sucursal_repo
+        self._lock = threading.Lock()
+        sucursal = self._cargar()
+        if sucursal is None:
+            logger.warning("WARN: No se encontró la sucursal en config.db. Se usan valores por defecto.")
+            sucursal = self.SUCURSAL_POR_DEFECTO
+        self._sucursal = sucursal
+
+    def _cargar(self) -> Sucursal | None:
+        sucursal = self.sucursal_repo.obtener()
+        if sucursal is not None:
+            logger.info(f"INFO: Identidad del kiosco cargada: sucursal {sucursal.n_sucursal_pk} ({sucursal.c_identificador}).")
+        return sucursal
+
+    def recargar(self):
+        sucursal = self._cargar()
+        if sucursal is None:
+            # Una falla pasajera (config.db bloqueada o a medio copiar) no debe cambiar la sucursal de los
+            # pedidos hasta el siguiente cambio de config.db: se conserva la que ya estaba cargada.
+            logger.warning(f"WARN: No se pudo releer la sucursal de config.db. Se conserva la sucursal {self.id_sucursal}.")
+            return
+        with self._lock:
+            self._sucursal = sucursal
+
+    @property
+    def sucursal(self) -> Sucursal:
+        return self._sucursal
+
+    @property
+    def id_sucursal(self) -> int:
+        return self._sucursal.n_sucursal_pk
+
+    @property
+    def identificador(self) -> str:
+        return self._sucursal.c_identificador
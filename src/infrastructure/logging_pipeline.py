@@ -0,0 +1,205 @@
+"""Logging asíncrono: los hilos de la app solo encolan; un hilo escritor vacía la cola a disco por lotes.
+
+config.json (todas las claves son opcionales):
+    "log_nivel": "INFO",
+    "log_niveles": {"src.infrastructure.persistence": "WARNING", "src.application.use_cases": "DEBUG"},
+    "log_max_bytes": 10485760, "log_copias": 5, "log_dias_retencion": 30,
+    "log_lote_max": 500, "log_intervalo_flush_seg": 1.0
+"""
+import atexit
+import datetime
+import glob
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+FORMATO = '%(asctime)s | %(levelname)s | %(name)s | %(message)s'
+FORMATO_FECHA = '%Y-%m-%d %H:%M:%S'
+
+
+class ArchivoLogRotativo:
+    """Archivo `<prefijo>-AAAA-MM-DD.log` que cambia cada día y, dentro del día, al pasar de `max_bytes`
+    (el actual pasa a `.1.log`, el `.1` a `.2`, ...). Al cambiar de día borra los de más de `dias_retencion`.
+
+    Solo lo usa el hilo escritor, así que no lleva lock.
+    """
+
+    def __init__(self, directorio: str, prefijo: str = "app", max_bytes: int = 10 * 1024 * 1024,
+                 copias: int = 5, dias_retencion: int = 30, formatter: logging.Formatter | None = None):
+        self.directorio = directorio
+        self.prefijo = prefijo
+        self.max_bytes = max_bytes
+        self.copias = copias
+        self.dias_retencion = dias_retencion
+        self.formatter = formatter or logging.Formatter(FORMATO, FORMATO_FECHA)
+        self._dia: datetime.date | None = None
+        self._archivo = None
+        self._bytes = 0
+        os.makedirs(directorio, exist_ok=True)
+
+    def ruta(self, dia: datetime.date, copia: int = 0) -> str:
+        sufijo = f".{copia}" if copia else ""
+        return os.path.join(self.directorio, f"{self.prefijo}-{dia.isoformat()}{sufijo}.log")
+
+    def _abrir(self, dia: datetime.date):
+        self.cerrar()
+        self._dia = dia
+        self._archivo = open(self.ruta(dia), "a", encoding="utf-8")
+        self._bytes = self._archivo.tell()
+
+    def _rotar_por_tamano(self):
+        self.cerrar()
+        for copia in range(self.copias - 1, 0, -1):
+            origen = self.ruta(self._dia, copia)
+            if os.path.exists(origen):
+                os.replace(origen, self.ruta(self._dia, copia + 1))
+        if self.copias:
+            os.replace(self.ruta(self._dia), self.ruta(self._dia, 1))
+        else:
+            os.remove(self.ruta(self._dia))
+        self._abrir(self._dia)
+
+    def _purgar(self, hoy: datetime.date):
+        limite = (hoy - datetime.timedelta(days=self.dias_retencion)).isoformat()
+        for ruta in glob.glob(os.path.join(self.directorio, f"{self.prefijo}-*.log")):
+            fecha = os.path.basename(ruta)[len(self.prefijo) + 1:][:10]
+            if fecha < limite:
+                try:
+                    os.remove(ruta)
+                except OSError:
+                    pass
+
+    def escribir(self, record: logging.LogRecord):
+        dia = datetime.date.fromtimestamp(record.created)
+        if self._archivo is None or dia > self._dia:
+            self._abrir(dia)
+            self._purgar(dia)
+        linea = self.formatter.format(record) + "\n"
+        tamano = len(linea.encode("utf-8"))
+        if self.max_bytes and self._bytes and self._bytes + tamano > self.max_bytes:
+            self._rotar_por_tamano()
+        self._archivo.write(linea)
+        self._bytes += tamano
+
+    def flush(self):
+        if self._archivo:
+            self._archivo.flush()
+
+    def cerrar(self):
+        if self._archivo:
+            self._archivo.close()
+            self._archivo = None
+
+
+class EscritorLogs:
+    """Hilo que saca los registros de la cola y los escribe en lotes de hasta `lote_max`, con un solo flush
+    por lote. Un registro espera en memoria a lo más `intervalo_flush_seg` antes de llegar al archivo; los
+    ERROR y CRITICAL se escriben en cuanto llegan.
+    """
+
+    _FIN = object()
+
+    def __init__(self, sumidero: ArchivoLogRotativo, lote_max: int = 500, intervalo_flush_seg: float = 1.0):
+        self.sumidero = sumidero
+        self.lote_max = lote_max
+        self.intervalo_flush_seg = intervalo_flush_seg
+        self.cola: queue.SimpleQueue = queue.SimpleQueue()
+        self._hilo: threading.Thread | None = None
+        self.escritos = 0
+        self.lotes = 0
+        self.errores = 0
+
+    def iniciar(self):
+        if self._hilo and self._hilo.is_alive():
+            return
+        self._hilo = threading.Thread(target=self._ejecutar, name="escritor-logs", daemon=True)
+        self._hilo.start()
+
+    def detener(self, timeout: float = 5.0):
+        if not self._hilo:
+            return
+        self.cola.put(self._FIN)
+        self._hilo.join(timeout)
+        self._hilo = None
+
+    def _ejecutar(self):
+        terminar = False
+        while not terminar:
+            try:
+                primero = self.cola.get(timeout=self.intervalo_flush_seg)
+            except queue.Empty:
+                continue
+            lote = [primero]
+            limite = time.monotonic() + self.intervalo_flush_seg
+            # Junta lo que llegue durante el intervalo (o hasta un ERROR) para escribirlo con un solo flush.
+            while len(lote) < self.lote_max and lote[-1] is not self._FIN and lote[-1].levelno < logging.ERROR:
+                espera = limite - time.monotonic()
+                try:
+                    lote.append(self.cola.get(timeout=espera) if espera > 0 else self.cola.get_nowait())
+                except queue.Empty:
+                    break
+            terminar = self._escribir(lote)
+        self.sumidero.cerrar()
+
+    def _escribir(self, lote: list) -> bool:
+        terminar = False
+        for record in lote:
+            if record is self._FIN:
+                terminar = True
+                continue
+            try:
+                self.sumidero.escribir(record)
+                self.escritos += 1
+            except Exception:
+                self.errores += 1
+        try:
+            self.sumidero.flush()
+        except Exception:
+            self.errores += 1
+        self.lotes += 1
+        return terminar
+
+    def profundidad(self) -> int:
+        return self.cola.qsize()
+
+    def estadisticas(self) -> dict:
+        return {"escritos": self.escritos, "lotes": self.lotes, "errores": self.errores,
+                "en_cola": self.profundidad()}
+
+
+def configurar_logging(directorio: str, config: dict | None = None) -> EscritorLogs:
+    """Deja en el logger raíz solo un QueueHandler y arranca el escritor. Los niveles por módulo salen
+    de `config["log_niveles"]`."""
+    config = config or {}
+    sumidero = ArchivoLogRotativo(
+        directorio,
+        max_bytes=int(config.get("log_max_bytes", 10 * 1024 * 1024)),
+        copias=int(config.get("log_copias", 5)),
+        dias_retencion=int(config.get("log_dias_retencion", 30)),
+    )
+    escritor = EscritorLogs(
+        sumidero,
+        lote_max=int(config.get("log_lote_max", 500)),
+        intervalo_flush_seg=float(config.get("log_intervalo_flush_seg", 1.0)),
+    )
+
+    raiz = logging.getLogger()
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+    raiz.addHandler(logging.handlers.QueueHandler(escritor.cola))
+    escritor.iniciar()
+    atexit.register(escritor.detener)
+
+    niveles = {"": config.get("log_nivel", "INFO"), **config.get("log_niveles", {})}
+    for nombre, nivel in niveles.items():
+        try:
+            logging.getLogger(nombre or None).setLevel(str(nivel).upper())
+        except ValueError:
+            logger.warning(f"WARN: Nivel de log inválido para '{nombre or 'raíz'}': {nivel}")
+    return escritor
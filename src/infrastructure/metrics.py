@@ -0,0 +1,214 @@
+"""Métricas del kiosco en formato de texto de Prometheus, servidas en /metrics por el servidor de health.
+
+Los tiempos de render por ruta, de consultas a la base de datos y de sincronización con el web service salen
+de los spans del trazador (`observar_trazas`), así que requieren "trazas_activas". Los contadores y medidores
+que no dependen de un evento (profundidad de colas, memoria, hilos) se leen al momento de cada consulta.
+"""
+import ctypes
+import os
+import sys
+import threading
+import time
+from collections import deque
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+BUCKETS_SEG = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_LE_INF = 'le="+Inf"'
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _etiquetas(nombres: tuple[str, ...], valores: tuple, extra: str = "") -> str:
+    partes = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    def __init__(self, nombre: str, ayuda: str, etiquetas: tuple[str, ...] = ()):
+        self.nombre, self.ayuda, self.etiquetas = nombre, ayuda, etiquetas
+        # Sin etiquetas la serie existe desde el inicio, en 0.
+        self._valores: dict[tuple, float] = {} if etiquetas else {(): 0}
+        self._lock = threading.Lock()
+
+    def incrementar(self, cantidad: float = 1, **etiquetas):
+        llave = tuple(etiquetas.get(n, "") for n in self.etiquetas)
+        with self._lock:
+            self._valores[llave] = self._valores.get(llave, 0) + cantidad
+
+    def exponer(self) -> list[str]:
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} counter"]
+        with self._lock:
+            for llave, valor in sorted(self._valores.items()):
+                lineas.append(f"{self.nombre}{_etiquetas(self.etiquetas, llave)} {_numero(valor)}")
+        return lineas
+
+
+class Histograma:
+    def __init__(self, nombre: str, ayuda: str, etiquetas: tuple[str, ...] = (), buckets=BUCKETS_SEG):
+        self.nombre, self.ayuda, self.etiquetas = nombre, ayuda, etiquetas
+        self.buckets = tuple(buckets)
+        # llave -> [conteos por bucket..., suma, total]
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, **etiquetas):
+        llave = tuple(etiquetas.get(n, "") for n in self.etiquetas)
+        with self._lock:
+            serie = self._series.get(llave)
+            if serie is None:
+                serie = self._series[llave] = [0] * len(self.buckets) + [0.0, 0]
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie[i] += 1
+            serie[-2] += valor
+            serie[-1] += 1
+
+    def exponer(self) -> list[str]:
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} histogram"]
+        with self._lock:
+            series = sorted((llave, list(serie)) for llave, serie in self._series.items())
+        for llave, serie in series:
+            for limite, conteo in zip(self.buckets, serie):
+                extra = f'le="{_numero(float(limite))}"'
+                lineas.append(f"{self.nombre}_bucket{_etiquetas(self.etiquetas, llave, extra)} {conteo}")
+            lineas.append(f"{self.nombre}_bucket{_etiquetas(self.etiquetas, llave, _LE_INF)} {serie[-1]}")
+            lineas.append(f"{self.nombre}_sum{_etiquetas(self.etiquetas, llave)} {_numero(serie[-2])}")
+            lineas.append(f"{self.nombre}_count{_etiquetas(self.etiquetas, llave)} {serie[-1]}")
+        return lineas
+
+
+class Medidor:
+    """Valor leído al exponer: `leer()` devuelve un número, o un dict {valores de etiquetas: número}."""
+
+    def __init__(self, nombre: str, ayuda: str, leer, etiquetas: tuple[str, ...] = (), tipo: str = "gauge"):
+        self.nombre, self.ayuda, self.leer, self.etiquetas, self.tipo = nombre, ayuda, leer, etiquetas, tipo
+
+    def exponer(self) -> list[str]:
+        try:
+            valor = self.leer()
+        except Exception as e:
+            logger.warning(f"WARN: No se pudo leer la métrica {self.nombre}: {e}")
+            return []
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"]
+        if isinstance(valor, dict):
+            for llave, v in sorted(valor.items()):
+                llave = llave if isinstance(llave, tuple) else (llave,)
+                lineas.append(f"{self.nombre}{_etiquetas(self.etiquetas, llave)} {_numero(v)}")
+        elif valor is not None:
+            lineas.append(f"{self.nombre} {_numero(valor)}")
+        return lineas
+
+
+class RegistroMetricas:
+    def __init__(self):
+        self._metricas = []
+
+    def registrar(self, metrica):
+        self._metricas.append(metrica)
+        return metrica
+
+    def contador(self, nombre: str, ayuda: str, etiquetas: tuple[str, ...] = ()) -> Contador:
+        return self.registrar(Contador(nombre, ayuda, etiquetas))
+
+    def histograma(self, nombre: str, ayuda: str, etiquetas: tuple[str, ...] = (), buckets=BUCKETS_SEG) -> Histograma:
+        return self.registrar(Histograma(nombre, ayuda, etiquetas, buckets))
+
+    def medidor(self, nombre: str, ayuda: str, leer, etiquetas: tuple[str, ...] = (), tipo: str = "gauge") -> Medidor:
+        return self.registrar(Medidor(nombre, ayuda, leer, etiquetas, tipo))
+
+    def exponer(self) -> str:
+        lineas = []
+        for metrica in self._metricas:
+            lineas.extend(metrica.exponer())
+        return "\n".join(lineas) + "\n"
+
+
+class VentanaEventos:
+    """Cuenta eventos de la última `ventana_seg` (p. ej. pedidos en la última hora)."""
+
+    def __init__(self, ventana_seg: float = 3600.0):
+        self.ventana_seg = ventana_seg
+        self._eventos: deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def registrar(self):
+        with self._lock:
+            self._eventos.append(time.monotonic())
+
+    def cantidad(self) -> int:
+        limite = time.monotonic() - self.ventana_seg
+        with self._lock:
+            while self._eventos and self._eventos[0] < limite:
+                self._eventos.popleft()
+            return len(self._eventos)
+
+
+class _ContadoresMemoria(ctypes.Structure):
+    _fields_ = [
+        ("cb", ctypes.c_ulong), ("PageFaultCount", ctypes.c_ulong),
+        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),
+    ]
+
+
+def memoria_proceso_bytes() -> int | None:
+    """Memoria residente del proceso (working set en Windows), o None si no se puede leer."""
+    try:
+        if sys.platform == "win32":
+            contadores = _ContadoresMemoria()
+            contadores.cb = ctypes.sizeof(contadores)
+            proceso = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(proceso, ctypes.byref(contadores), contadores.cb):
+                return contadores.WorkingSetSize
+            return None
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+# Tipo de span del trazador -> (histograma, etiqueta con el nombre del span).
+HISTOGRAMAS_POR_SPAN = {
+    "ruta": ("kiosco_ruta_render_segundos", "Tiempo de render por ruta.", "ruta"),
+    "repo": ("kiosco_db_consulta_segundos", "Tiempo de las consultas a repositorios.", "consulta"),
+    "api": ("kiosco_api_sync_segundos", "Latencia de las llamadas de sincronización al web service.", "operacion"),
+}
+
+
+def observar_trazas(registro: RegistroMetricas, trazador) -> dict[str, Histograma]:
+    """Alimenta un histograma por tipo de span con la duración de cada span terminado."""
+    histogramas = {
+        tipo: registro.histograma(nombre, ayuda, (etiqueta,))
+        for tipo, (nombre, ayuda, etiqueta) in HISTOGRAMAS_POR_SPAN.items()
+    }
+    etiquetas = {tipo: etiqueta for tipo, (_, _, etiqueta) in HISTOGRAMAS_POR_SPAN.items()}
+
+    def _observar(span: dict):
+        histograma = histogramas.get(span["tipo"])
+        if histograma is not None:
+            histograma.observar(span["ms"] / 1000, **{etiquetas[span["tipo"]]: span["nombre"]})
+
+    trazador.suscribir(_observar)
+    return histogramas
+
+
+def metricas_de_proceso(registro: RegistroMetricas):
+    registro.medidor("kiosco_proceso_memoria_bytes", "Memoria residente del proceso.", memoria_proceso_bytes)
+    registro.medidor("kiosco_proceso_hilos", "Hilos vivos del proceso.", threading.active_count)
+    inicio = time.time()
+    registro.medidor("kiosco_proceso_inicio_segundos", "Hora de inicio del proceso (epoch).", lambda: inicio)
@@ -0,0 +1,137 @@
+"""Tiempos de arranque del kiosco y presupuesto de arranque en frío.
+
+En cada arranque la app registra hitos (imports, catálogo, primer frame, subsistema de cobro listo) y los
+agrega como una línea JSON a C:/KioscoPP/logs/arranque.jsonl.
+
+Revisión del presupuesto (termina con código 1 si se excede; pensado para correr antes de publicar):
+    python -m src.infrastructure.perfil_arranque --presupuesto-import-ms 2500 --presupuesto-primer-frame-ms 6000
+
+Mide `import main` en un proceso nuevo con `-X importtime`, muestra los módulos más caros y falla si el
+import supera el presupuesto, si al importar se cargó alguno de MODULOS_DIFERIDOS (deben cargarse hasta el
+cobro) o si el último primer frame registrado en el historial superó su presupuesto. Las dos primeras
+revisiones también corren con pytest (tests/test_perfil_arranque.py).
+"""
+import argparse
+import datetime
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import NamedTuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Paquetes que solo se usan al cobrar (ticket, impresión, sincronización HTTP) y no deben cargarse al arrancar.
+MODULOS_DIFERIDOS = ("reportlab", "requests", "urllib3", "barcode")
+
+
+class PerfilArranque:
+    def __init__(self, inicio: float | None = None):
+        # `inicio` es un time.perf_counter() tomado lo antes posible (primera línea de main.py).
+        self.inicio = inicio if inicio is not None else time.perf_counter()
+        self.marcas: dict[str, float] = {}
+
+    def marcar(self, hito: str) -> float:
+        segundos = time.perf_counter() - self.inicio
+        self.marcas.setdefault(hito, segundos)
+        return segundos
+
+    def segundos(self, hito: str) -> float | None:
+        return self.marcas.get(hito)
+
+    def registrar(self, ruta_historial: str):
+        resumen = ", ".join(f"{hito} {seg * 1000:.0f} ms" for hito, seg in self.marcas.items())
+        logger.info(f"INFO: Arranque: {resumen}")
+        registro = {
+            "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+            "marcas_ms": {hito: round(seg * 1000, 1) for hito, seg in self.marcas.items()},
+        }
+        try:
+            with open(ruta_historial, "a", encoding="utf-8") as f:
+                f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning(f"WARN: No se pudo guardar el perfil de arranque en {ruta_historial}: {e}")
+
+
+class CostoImport(NamedTuple):
+    modulo: str
+    propio_us: int
+    acumulado_us: int
+
+
+def medir_imports(modulo: str = "main", directorio: str = ".") -> list[CostoImport]:
+    """Importa `modulo` en un intérprete nuevo con `-X importtime` y devuelve el costo de cada módulo."""
+    entorno = dict(os.environ, KIOSCO_LOG_DIR=tempfile.mkdtemp(prefix="kiosco-perfil-"))
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=directorio, env=entorno, capture_output=True, text=True,
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(f"falló `import {modulo}`:\n{proceso.stderr[-2000:]}")
+
+    costos = []
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:"):
+            continue
+        partes = linea[len("import time:"):].split("|")
+        try:
+            costos.append(CostoImport(partes[2].strip(), int(partes[0]), int(partes[1])))
+        except (IndexError, ValueError):
+            continue  # encabezado
+    return costos
+
+
+def tiempo_import_ms(costos: list[CostoImport], modulo: str = "main") -> float:
+    raiz = next((c for c in costos if c.modulo.strip() == modulo), None)
+    return (raiz.acumulado_us if raiz else sum(c.propio_us for c in costos)) / 1000
+
+
+def modulos_diferidos_cargados(costos: list[CostoImport]) -> list[str]:
+    return sorted({c.modulo.strip().split(".")[0] for c in costos} & set(MODULOS_DIFERIDOS))
+
+
+def ultimo_primer_frame_ms(ruta_historial: str) -> float | None:
+    try:
+        with open(ruta_historial, "r", encoding="utf-8") as f:
+            lineas = [linea for linea in f if linea.strip()]
+        return json.loads(lineas[-1])["marcas_ms"].get("primer_frame") if lineas else None
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Revisa el presupuesto de arranque del kiosco.")
+    parser.add_argument("--modulo", default="main")
+    parser.add_argument("--presupuesto-import-ms", type=float, default=2500)
+    parser.add_argument("--presupuesto-primer-frame-ms", type=float, default=6000)
+    parser.add_argument("--historial", default=r"C:/KioscoPP/logs/arranque.jsonl")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    costos = medir_imports(args.modulo)
+    total_ms = tiempo_import_ms(costos, args.modulo)
+
+    print(f"{'módulo':<60} {'propio ms':>10} {'acumulado ms':>13}")
+    for costo in sorted(costos, key=lambda c: c.propio_us, reverse=True)[:args.top]:
+        print(f"{costo.modulo.strip()[:60]:<60} {costo.propio_us / 1000:>10.1f} {costo.acumulado_us / 1000:>13.1f}")
+    print(f"\nimport {args.modulo}: {total_ms:.0f} ms (presupuesto {args.presupuesto_import_ms:.0f} ms)")
+
+    fallas = []
+    if total_ms > args.presupuesto_import_ms:
+        fallas.append(f"el import tarda {total_ms:.0f} ms, más que el presupuesto de {args.presupuesto_import_ms:.0f} ms")
+    cargados = modulos_diferidos_cargados(costos)
+    if cargados:
+        fallas.append(f"se cargan al arrancar módulos que deben diferirse: {', '.join(cargados)}")
+    primer_frame = ultimo_primer_frame_ms(args.historial)
+    if primer_frame is not None:
+        print(f"último primer frame: {primer_frame:.0f} ms (presupuesto {args.presupuesto_primer_frame_ms:.0f} ms)")
+        if primer_frame > args.presupuesto_primer_frame_ms:
+            fallas.append(f"el último primer frame tardó {primer_frame:.0f} ms")
+
+    for falla in fallas:
+        print(f"FALLA: {falla}")
+    sys.exit(1 if fallas else 0)
@@ -1,32 +1,44 @@
+import gzip
+import json
+import time
 import requests
-import sqlite3
+from typing import NamedTuple
 from src.application.repositories import FinalizarPedidoRepository, Ticket
+from src.infrastructure.identidad_kiosco import IdentidadKiosco
+from src.infrastructure.persistence.http_session import SesionHttp
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+class ResultadoEnvio(NamedTuple):
+    exito: bool
+    id_remoto: int
+    reintentable: bool
+    error: str | None
+
+
 class FinalizarPedidoRepositoryAPI(FinalizarPedidoRepository):
-    def __init__(self, api_url: str, db_path: str):
+    # Códigos con los que el servidor indica que no soporta el endpoint de lote.
+    STATUS_LOTE_NO_SOPORTADO = (404, 405, 415, 501)
+
+    def __init__(self, api_url: str, identidad: IdentidadKiosco, sesion: SesionHttp | None = None,
+                 api_url_lote: str | None = None, pausa_lote_no_soportado_seg: float = 3600.0):
         self.api_url = api_url
-        self.db_path = db_path
+        self.api_url_lote = api_url_lote or f"{api_url.rstrip('/')}/lote"
+        self.identidad = identidad
+        self.sesion = sesion or SesionHttp()
+        self.pausa_lote_no_soportado_seg = pausa_lote_no_soportado_seg
+        self._lote_deshabilitado_hasta = 0.0
 
-    def _obtener_id_sucursal(self) -> int:
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT nSucursalPK FROM Sucursales LIMIT 1")
-                result = cursor.fetchone()
-                return int(result[0]) if result and result[0] is not None else 1
-        except sqlite3.Error as e:
-            print(f"Error obteniendo ID de sucursal: {e}")
-            return 1
+    def lote_disponible(self) -> bool:
+        return time.time() >= self._lote_deshabilitado_hasta
 
-    def guardar(self, pedido: Ticket) -> int:
+    def construir_payload(self, pedido: Ticket) -> dict:
 
-        id_sucursal = self._obtener_id_sucursal()
+        id_sucursal = self.identidad.id_sucursal
 
-        payload = {
+        return {
             "id": pedido.id_pedido,
             "nSucursalPK": id_sucursal,
             "fecha_creacion": pedido.fecha_creacion or "",
@@ -68,18 +80,85 @@ class FinalizarPedidoRepositoryAPI(FinalizarPedidoRepository):
             "imagen_pastel": pedido.imagen_pastel or "",
         }
 
+    def enviar_payload(self, payload: dict, clave_idempotencia: str | None = None) -> ResultadoEnvio:
+        headers = {"Idempotency-Key": clave_idempotencia} if clave_idempotencia else None
         try:
-            response = requests.post(self.api_url, json=payload)
+            response = self.sesion.post(self.api_url, json=payload, headers=headers)
+            if response.status_code == 409:
+                logger.info(f"INFO: El web service ya tenía el pedido {payload.get('id')} (409). Se da por sincronizado.")
+                return ResultadoEnvio(exito=True, id_remoto=0, reintentable=False, error=None)
             response.raise_for_status()
 
-            response_data = response.json()
-            nuevo_id = response_data.get("id", 0)
+            try:
+                nuevo_id = response.json().get("id", 0)
+            except ValueError:
+                nuevo_id = 0
             logger.info(f"INFO: Pedido enviado al web service. Nuevo ID: {nuevo_id}")
-            return nuevo_id
+            return ResultadoEnvio(exito=True, id_remoto=nuevo_id, reintentable=False, error=None)
 
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code if e.response is not None else 0
+            reintentable = status >= 500 or status in (408, 429)
+            logger.error(f"ERROR: El web service rechazó el pedido ({status}): {e}")
+            return ResultadoEnvio(exito=False, id_remoto=0, reintentable=reintentable, error=str(e))
         except requests.exceptions.RequestException as e:
             logger.error(f"ERROR: No se pudo enviar el pedido al web service: {e}")
-            return 0
+            return ResultadoEnvio(exito=False, id_remoto=0, reintentable=True, error=str(e))
+
+    def enviar_lote(self, mensajes: list[tuple[dict, str]]) -> list[ResultadoEnvio] | None:
+        """Envía varios pedidos en una sola petición JSON comprimida con gzip.
+
+        `mensajes` son pares (payload, clave_idempotencia). Devuelve un resultado por mensaje, en el mismo orden,
+        o None si el servidor rechazó el lote completo y conviene reintentar pedido por pedido.
+        Un error de red o un 5xx (también 408 y 429) devuelve todos los mensajes como reintentables.
+        """
+        cuerpo = {"pedidos": [{"clave_idempotencia": clave, "pedido": payload} for payload, clave in mensajes]}
+        datos = gzip.compress(json.dumps(cuerpo, ensure_ascii=False, default=str).encode("utf-8"))
+        headers = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+        try:
+            response = self.sesion.post(self.api_url_lote, data=datos, headers=headers)
+            if response.status_code in self.STATUS_LOTE_NO_SOPORTADO:
+                self._lote_deshabilitado_hasta = time.time() + self.pausa_lote_no_soportado_seg
+                logger.warning(f"WARN: El web service no acepta lotes ({response.status_code}). "
+                               f"Se usará envío individual durante {self.pausa_lote_no_soportado_seg:.0f}s.")
+                return None
+            response.raise_for_status()
+            resultados_servidor = {
+                r.get("clave_idempotencia"): r for r in response.json().get("resultados", [])
+            }
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code if e.response is not None else 0
+            if status >= 500 or status in (408, 429):
+                # Servidor saturado o caído: mandar los pedidos uno por uno solo lo cargaría más.
+                logger.error(f"ERROR: El web service no pudo procesar el lote de {len(mensajes)} pedidos ({status}): {e}")
+                return [ResultadoEnvio(exito=False, id_remoto=0, reintentable=True, error=str(e)) for _ in mensajes]
+            logger.error(f"ERROR: El web service rechazó el lote de {len(mensajes)} pedidos: {e}")
+            return None
+        except (ValueError, AttributeError) as e:
+            logger.error(f"ERROR: Respuesta de lote no válida: {e}")
+            return None
+        except requests.exceptions.RequestException as e:
+            # Sin red no tiene sentido reintentar uno por uno: todo el lote espera al siguiente backoff.
+            logger.error(f"ERROR: No se pudo enviar el lote de {len(mensajes)} pedidos: {e}")
+            return [ResultadoEnvio(exito=False, id_remoto=0, reintentable=True, error=str(e)) for _ in mensajes]
+
+        resultados = []
+        for payload, clave in mensajes:
+            r = resultados_servidor.get(clave)
+            if r is None:
+                resultados.append(ResultadoEnvio(exito=False, id_remoto=0, reintentable=True,
+                                                 error="Sin resultado en la respuesta del lote"))
+            elif r.get("estado") in ("ok", "duplicado"):
+                resultados.append(ResultadoEnvio(exito=True, id_remoto=r.get("id") or 0, reintentable=False, error=None))
+            else:
+                resultados.append(ResultadoEnvio(exito=False, id_remoto=0, reintentable=bool(r.get("reintentable", True)),
+                                                 error=r.get("error") or "Rechazado en lote"))
+        logger.info(f"INFO: Lote de {len(mensajes)} pedidos enviado ({len(datos)} bytes comprimidos).")
+        return resultados
+
+    def guardar(self, pedido: Ticket) -> int:
+        resultado = self.enviar_payload(self.construir_payload(pedido))
+        return resultado.id_remoto if resultado.exito else 0
 
     def obtener_por_id(self, id_pedido: int) -> Ticket | None:
         return None
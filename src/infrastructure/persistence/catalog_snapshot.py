@@ -0,0 +1,323 @@
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from types import MappingProxyType
+from src.application.repositories import (
+    TamanoRepository, CategoriaRepository, TipoPanRepository,
+    TipoFormaRepository, TipoRellenoRepository, TipoCoberturaRepository,
+    TipoColorRepository, PastelConfiguradoRepository, ExtraRepository,
+    ExtraChorreadoRepository, TamanoRectangularRepository,
+    Categoria, TipoPan, FormaPastel, TipoRelleno, TipoCobertura, TamanoPastel,
+    Extra, PastelConfigurado
+)
+from src.infrastructure.persistence.sqlite_pool import SQLiteConnectionPool
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def _lower_sqlite(texto: str) -> str:
+    """Equivalente a LOWER() de SQLite sin ICU: solo convierte letras ASCII."""
+    return texto.translate(_ASCII_LOWER) if texto is not None else ""
+
+
+def _congelar(indice: dict) -> MappingProxyType:
+    return MappingProxyType({k: tuple(v) for k, v in indice.items()})
+
+
+class CatalogSnapshot:
+    """Copia inmutable e indexada de las tablas de catálogo de config.db.
+
+    Se construye completa antes de publicarse, por lo que quien la lee nunca ve una carga a medias.
+    """
+
+    def __init__(self, version: int, cargado_en: float, categorias, categorias_por_tamano, panes_por_categoria,
+                 formas_por_categoria, rellenos_por_categoria_pan, coberturas_por_categoria_pan, tamanos, colores,
+                 configuraciones, configuraciones_por_clave, extras, chorreado_por_tamano, rectangular_por_peso,
+                 errores=()):
+        self.version = version
+        self.cargado_en = cargado_en
+        self.categorias: MappingProxyType = categorias
+        self.categorias_por_tamano: MappingProxyType = categorias_por_tamano
+        self.panes_por_categoria: MappingProxyType = panes_por_categoria
+        self.formas_por_categoria: MappingProxyType = formas_por_categoria
+        self.rellenos_por_categoria_pan: MappingProxyType = rellenos_por_categoria_pan
+        self.coberturas_por_categoria_pan: MappingProxyType = coberturas_por_categoria_pan
+        self.tamanos: tuple[TamanoPastel, ...] = tamanos
+        self.colores: tuple[str, ...] = colores
+        self.configuraciones: MappingProxyType = configuraciones
+        self.configuraciones_por_clave: MappingProxyType = configuraciones_por_clave
+        self.extras: MappingProxyType = extras
+        self.chorreado_por_tamano: MappingProxyType = chorreado_por_tamano
+        self.rectangular_por_peso: MappingProxyType = rectangular_por_peso
+        self.errores: tuple[str, ...] = errores
+
+    @staticmethod
+    def _leer(conn: sqlite3.Connection, tabla: str, query: str, errores: list[str]) -> list:
+        try:
+            return conn.execute(query).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Error al cargar '{tabla}' en el snapshot del catálogo: {e}")
+            errores.append(tabla)
+            return []
+
+    @classmethod
+    def cargar(cls, pool: SQLiteConnectionPool, version: int = 1) -> "CatalogSnapshot":
+        inicio = time.perf_counter()
+        errores: list[str] = []
+        with pool.obtener_conexion() as conn:
+            filas_categorias = cls._leer(conn, "categorias", """
+                SELECT id_categoria, nombre_categoria, imagen_url FROM categorias ORDER BY id_categoria
+            """, errores)
+            filas_cat_tamano = cls._leer(conn, "pasteles_configurados", """
+                SELECT DISTINCT id_tipo_tamano_seleccionado, id_categoria
+                FROM pasteles_configurados ORDER BY id_tipo_tamano_seleccionado, id_categoria
+            """, errores)
+            filas_panes = cls._leer(conn, "categoria_tipos_pan_disponibles", """
+                SELECT ctd.id_categoria, tp.id_tipo_pan, tp.nombre_tipo_pan, ctd.imagen_quiosco
+                FROM categoria_tipos_pan_disponibles ctd, tipos_pan tp
+                WHERE ctd.id_tipo_pan = tp.id_tipo_pan
+                ORDER BY ctd.id_categoria, tp.nombre_tipo_pan
+            """, errores)
+            filas_formas = cls._leer(conn, "categoria_tipos_forma_disponibles", """
+                SELECT ctfd.id_categoria, tf.id_tipo_forma, tf.nombre_tipo_forma, ctfd.imagen_quiosco
+                FROM categoria_tipos_forma_disponibles ctfd, tipos_forma tf
+                WHERE ctfd.id_tipo_forma = tf.id_tipo_forma
+                ORDER BY ctfd.id_categoria, tf.nombre_tipo_forma
+            """, errores)
+            filas_rellenos = cls._leer(conn, "categoria_tipos_relleno_disponibles", """
+                SELECT ctrd.id_categoria, ctrd.id_tipo_pan, tr.nombre_tipo_relleno, ctrd.imagen_quiosco
+                FROM categoria_tipos_relleno_disponibles ctrd, tipos_relleno tr
+                WHERE ctrd.id_tipo_relleno = tr.id_tipo_relleno
+                ORDER BY ctrd.id_categoria, ctrd.id_tipo_pan, tr.nombre_tipo_relleno
+            """, errores)
+            filas_coberturas = cls._leer(conn, "categoria_tipos_cobertura_disponibles", """
+                SELECT ctcd.id_categoria, ctcd.id_tipo_pan, tc.nombre_tipo_cobertura, ctcd.imagen_quiosco
+                FROM categoria_tipos_cobertura_disponibles ctcd, tipos_cobertura tc
+                WHERE ctcd.id_tipo_cobertura = tc.id_tipo_cobertura
+                ORDER BY ctcd.id_categoria, ctcd.id_tipo_pan, tc.nombre_tipo_cobertura
+            """, errores)
+            filas_tamanos = cls._leer(conn, "tipos_tamano", """
+                SELECT id_tipo_tamano, nombre_tamano
+                FROM tipos_tamano
+                ORDER BY
+                    CASE
+                        WHEN INSTR(nombre_tamano, '-') > 0
+                        THEN CAST(TRIM(SUBSTR(nombre_tamano, 1, INSTR(nombre_tamano, '-') - 1)) AS INTEGER)
+                        ELSE CAST(nombre_tamano AS INTEGER)
+                        END ASC
+            """, errores)
+            filas_colores = cls._leer(conn, "tipos_colores", """
+                SELECT nombre_tipo_color FROM tipos_colores ORDER BY nombre_tipo_color
+            """, errores)
+            filas_configuraciones = cls._leer(conn, "pasteles_configurados", """
+                SELECT id_pastel_configurado, id_categoria, id_tipo_pan_seleccionado, id_tipo_forma_seleccionada,
+                       id_tipo_tamano_seleccionado, precio_base, precio_chocolate, monto_deposito, peso_pastel,
+                       medidas_pastel, incluye
+                FROM pasteles_configurados
+                ORDER BY id_pastel_configurado
+            """, errores)
+            filas_extras = cls._leer(conn, "extras", "SELECT id, descripcion, costo FROM extras ORDER BY id", errores)
+            filas_chorreado = cls._leer(conn, "extra_chorreado", "SELECT tamano, costo FROM extra_chorreado", errores)
+            filas_rectangular = cls._leer(conn, "tamano_rectangular", "SELECT tamano, costo FROM tamano_rectangular", errores)
+
+        categorias = {row[0]: Categoria(id=row[0], nombre=row[1], imagen_url=row[2]) for row in filas_categorias}
+
+        categorias_por_tamano = defaultdict(list)
+        for id_tamano, id_categoria in filas_cat_tamano:
+            if id_categoria in categorias:
+                categorias_por_tamano[id_tamano].append(categorias[id_categoria])
+
+        panes_por_categoria = defaultdict(list)
+        for id_cat, id_pan, nombre, imagen in filas_panes:
+            panes_por_categoria[id_cat].append(TipoPan(id=id_pan, nombre=nombre, imagen_url=imagen))
+
+        formas_por_categoria = defaultdict(list)
+        for id_cat, id_forma, nombre, imagen in filas_formas:
+            formas_por_categoria[id_cat].append(FormaPastel(id=id_forma, nombre=nombre, imagen_url=imagen))
+
+        rellenos = defaultdict(list)
+        for id_cat, id_pan, nombre, imagen in filas_rellenos:
+            rellenos[(id_cat, id_pan)].append(TipoRelleno(nombre=nombre, imagen_url=imagen))
+
+        coberturas = defaultdict(list)
+        for id_cat, id_pan, nombre, imagen in filas_coberturas:
+            coberturas[(id_cat, id_pan)].append(TipoCobertura(nombre=nombre, imagen_url=imagen))
+
+        configuraciones = {}
+        configuraciones_por_clave = defaultdict(list)
+        for row in filas_configuraciones:
+            config = PastelConfigurado(*row)
+            configuraciones[config.id_pastel_configurado] = config
+            clave = (config.id_categoria, config.id_tipo_forma_seleccionada, config.id_tipo_tamano_seleccionado)
+            configuraciones_por_clave[clave].append(config)
+
+        extras = {}
+        for row in filas_extras:
+            extras.setdefault(row[1], Extra(id=row[0], descripcion=row[1], costo=float(row[2])))
+
+        chorreado = {}
+        for tamano, costo in filas_chorreado:
+            chorreado.setdefault(_lower_sqlite(tamano), costo)
+
+        rectangular = {}
+        for tamano, costo in filas_rectangular:
+            rectangular.setdefault(_lower_sqlite(tamano), costo)
+
+        snapshot = cls(
+            version=version,
+            cargado_en=time.time(),
+            categorias=MappingProxyType(categorias),
+            categorias_por_tamano=_congelar(categorias_por_tamano),
+            panes_por_categoria=_congelar(panes_por_categoria),
+            formas_por_categoria=_congelar(formas_por_categoria),
+            rellenos_por_categoria_pan=_congelar(rellenos),
+            coberturas_por_categoria_pan=_congelar(coberturas),
+            tamanos=tuple(TamanoPastel(id=row[0], nombre=row[1]) for row in filas_tamanos),
+            colores=tuple(row[0] for row in filas_colores),
+            configuraciones=MappingProxyType(configuraciones),
+            configuraciones_por_clave=_congelar(configuraciones_por_clave),
+            extras=MappingProxyType(extras),
+            chorreado_por_tamano=MappingProxyType(chorreado),
+            rectangular_por_peso=MappingProxyType(rectangular),
+            errores=tuple(errores),
+        )
+        logger.info(f"INFO: Snapshot del catálogo v{version} cargado en {(time.perf_counter() - inicio) * 1000:.1f} ms "
+                    f"({len(categorias)} categorías, {len(configuraciones)} configuraciones).")
+        return snapshot
+
+
+class CatalogSnapshotStore:
+    """Mantiene el snapshot vigente y lo reemplaza atómicamente al recargar."""
+
+    def __init__(self, pool: SQLiteConnectionPool):
+        self.pool = pool
+        self._lock_recarga = threading.Lock()
+        self._snapshot = CatalogSnapshot.cargar(pool, version=1)
+
+    @property
+    def actual(self) -> CatalogSnapshot:
+        return self._snapshot
+
+    def recargar(self) -> CatalogSnapshot:
+        with self._lock_recarga:
+            anterior = self._snapshot
+            nuevo = CatalogSnapshot.cargar(self.pool, version=anterior.version + 1)
+            if len(nuevo.errores) > len(anterior.errores):
+                logger.error(f"ERROR: La recarga del catálogo falló en {list(nuevo.errores)}. "
+                             f"Se conserva el snapshot v{anterior.version}.")
+                return anterior
+            self._snapshot = nuevo
+        return nuevo
+
+
+class CategoriaRepositorySnapshot(CategoriaRepository):
+    def __init__(self, store: CatalogSnapshotStore):
+        self.store = store
+
+    def obtener_todas(self, id_tamano: int) -> list[Categoria]:
+        return list(self.store.actual.categorias_por_tamano.get(id_tamano, ()))
+
+    def obtener_por_id(self, id_categoria: int) -> Categoria | None:
+        return self.store.actual.categorias.get(id_categoria)
+
+
+class TipoPanRepositorySnapshot(TipoPanRepository):
+    def __init__(self, store: CatalogSnapshotStore):
+        self.store = store
+
+    def obtener_por_categoria(self, id_categoria: int) -> list[TipoPan]:
+        return list(self.store.actual.panes_por_categoria.get(id_categoria, ()))
+
+
+class TipoFormaRepositorySnapshot(TipoFormaRepository):
+    def __init__(self, store: CatalogSnapshotStore):
+        self.store = store
+
+    def obtener_por_categoria(self, id_categoria: int) -> list[FormaPastel]:
+        return list(self.store.actual.formas_por_categoria.get(id_categoria, ()))
+
+
+class TamanoRepositorySnapshot(TamanoRepository):
+    def __init__(self, store: CatalogSnapshotStore):
+        self.store = store
+
+    def obtener_todos(self) -> list[TamanoPastel]:
+        return list(self.store.actual.tamanos)
+
+
+class TipoRellenoRepositorySnapshot(TipoRellenoRepository):
+    def __init__(self, store: CatalogSnapshotStore):
+        self.store = store
+
+    def obtener_por_categoria_y_pan(self, id_categoria: int, id_tipo_pan: int) -> list[TipoRelleno]:
+        return list(self.store.actual.rellenos_por_categoria_pan.get((id_categoria, id_tipo_pan), ()))
+
+
+class TipoCoberturaRepositorySnapshot(TipoCoberturaRepository):
+    def __init__(self, store: CatalogSnapshotStore):
+        self.store = store
+
+    def obtener_por_categoria_y_pan(self, id_categoria: int, id_tipo_pan: int) -> list[TipoCobertura]:
+        return list(self.store.actual.coberturas_por_categoria_pan.get((id_categoria, id_tipo_pan), ()))
+
+
+class TipoColorRepositorySnapshot(TipoColorRepository):
+    def __init__(self, store: CatalogSnapshotStore):
+        self.store = store
+
+    def obtener_todos(self) -> list[str]:
+        return list(self.store.actual.colores)
+
+
+class PastelConfiguradoRepositorySnapshot(PastelConfiguradoRepository):
+    def __init__(self, store: CatalogSnapshotStore):
+        self.store = store
+
+    def obtener_configuracion(self, id_cat: int, id_pan: int, id_forma: int, id_tam: int) -> PastelConfigurado | None:
+        configuraciones = self.store.actual.configuraciones_por_clave.get((id_cat, id_forma, id_tam), ())
+        return configuraciones[0] if configuraciones else None
+
+    def obtener_configuraciones(self, id_cat: int, id_pan: int, id_forma: int, id_tam: int) -> list[PastelConfigurado]:
+        return list(self.store.actual.configuraciones_por_clave.get((id_cat, id_forma, id_tam), ()))
+
+    def obtener_configuracion_por_id(self, id_config: int) -> PastelConfigurado | None:
+        return self.store.actual.configuraciones.get(id_config)
+
+
+class ExtraRepositorySnapshot(ExtraRepository):
+    def __init__(self, store: CatalogSnapshotStore):
+        self.store = store
+
+    def obtener_por_descripcion(self, descripcion: str) -> Extra | None:
+        return self.store.actual.extras.get(descripcion)
+
+
+class ExtraChorreadoRepositorySnapshot(ExtraChorreadoRepository):
+    def __init__(self, store: CatalogSnapshotStore):
+        self.store = store
+
+    def obtener_precio_por_tamano(self, tamano: str) -> float | None:
+        costo = self.store.actual.chorreado_por_tamano.get(_lower_sqlite(tamano))
+        if costo is not None:
+            logger.info(f"INFO: Precio encontrado para chorreado tamaño '{tamano}': ${float(costo)}")
+            return float(costo)
+        logger.warning(f"WARN: No se encontró precio en extra_chorreado para tamaño '{tamano}'.")
+        return 0.0
+
+
+class TamanoRectangularRepositorySnapshot(TamanoRectangularRepository):
+    def __init__(self, store: CatalogSnapshotStore):
+        self.store = store
+
+    def obtener_precio_por_peso(self, peso: str) -> float | None:
+        costo = self.store.actual.rectangular_por_peso.get(_lower_sqlite(peso))
+        if costo is not None:
+            logger.info(f"INFO: Precio encontrado en tamano_rectangular para peso '{peso}': ${float(costo)}")
+            return float(costo)
+        logger.warning(f"WARN: No se encontró precio en tamano_rectangular para peso '{peso}'.")
+        return 0.0
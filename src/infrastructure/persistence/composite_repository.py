@@ -1,35 +1,43 @@
 from src.application.repositories import FinalizarPedidoRepository, Ticket
 from src.domain.pedido import Pedido
+from src.infrastructure.persistence.outbox_repository import OutboxRepositorySQLite
+from src.infrastructure.persistence.api_repository import FinalizarPedidoRepositoryAPI
 import logging
 
 logger = logging.getLogger(__name__)
 
 class FinalizarPedidoRepositoryComposite(FinalizarPedidoRepository):
-    def __init__(self, sqlite_repo: FinalizarPedidoRepository, api_repo: FinalizarPedidoRepository):
+    """Guarda el pedido localmente y lo deja en la bandeja de salida en la misma transacción.
+
+    El envío al web service lo hace el worker de sincronización, fuera del hilo de la interfaz.
+    """
+
+    def __init__(self, sqlite_repo: FinalizarPedidoRepository, api_repo: FinalizarPedidoRepositoryAPI,
+                 outbox: OutboxRepositorySQLite, sync_worker=None):
         self.sqlite_repo = sqlite_repo
         self.api_repo = api_repo
+        self.outbox = outbox
+        self.sync_worker = sync_worker
 
     def guardar(self, pedido: Pedido) -> int:
-        id_pedido_local = self.sqlite_repo.guardar(pedido)
-
-        if id_pedido_local == 0:
-            return 0
-
-        ticket_completo = self.sqlite_repo.obtener_por_id(id_pedido_local)
+        try:
+            with self.outbox.transaccion():
+                id_pedido_local = self.sqlite_repo.guardar(pedido)
+                if id_pedido_local == 0:
+                    return 0
 
-        if not ticket_completo:
-            logger.error("ERROR: No se pudo recuperar el pedido local para enviarlo a la API.")
-            return id_pedido_local
+                ticket_completo = self.sqlite_repo.obtener_por_id(id_pedido_local)
+                if not ticket_completo:
+                    # Sin mensaje en la bandeja el pedido nunca llegaría a la API: se deshace el guardado.
+                    raise RuntimeError(f"no se pudo recuperar el pedido local {id_pedido_local} para encolarlo")
 
-        try:
-            id_api = self.api_repo.guardar(ticket_completo)
-            if id_api > 0:
-                logger.error(f"INFO: Pedido {id_pedido_local} sincronizado con el web service.")
-            else:
-                logger.warning("ADVERTENCIA: Pedido no se pudo sincronizar con el web service.")
+                self.outbox.encolar(id_pedido_local, self.api_repo.construir_payload(ticket_completo))
         except Exception as e:
-            logger.warning(f"ADVERTENCIA: Error al sincronizar con la API: {e}")
+            logger.error(f"ERROR: No se pudo guardar el pedido y su mensaje de sincronización: {e}")
+            return 0
 
+        if self.sync_worker:
+            self.sync_worker.despertar()
         return id_pedido_local
 
     def obtener_por_id(self, id_pedido: int) -> Ticket | None:
@@ -0,0 +1,193 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Callable, NamedTuple
+from src.infrastructure.persistence.sqlite_pool import SQLiteConnectionPool
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+TABLAS_CATALOGO = (
+    "categorias", "tipos_pan", "tipos_forma", "tipos_relleno", "tipos_cobertura", "tipos_tamano",
+    "categoria_tipos_pan_disponibles", "categoria_tipos_forma_disponibles",
+    "categoria_tipos_relleno_disponibles", "categoria_tipos_cobertura_disponibles",
+    "pasteles_configurados", "extras", "extra_chorreado", "tamano_rectangular", "tipos_colores",
+    "horario_entrega", "dias_festivos", "imagenes_galeria", "Sucursales",
+)
+
+SUFIJOS_VIGILADOS = ("", "-wal", "-journal")
+
+
+class HuellaArchivo(NamedTuple):
+    mtime_ns: int
+    tamano: int
+    ino: int
+
+
+class ConfigDbWatcher:
+    """Detecta cambios reales de catálogo en config.db y notifica a los suscriptores.
+
+    Las ráfagas de eventos se agrupan con un debounce. Tras el debounce se compara, de más barato a más caro:
+    mtime/tamaño de config.db y su WAL, PRAGMA data_version y por último un hash del contenido de las tablas
+    de catálogo, para no recargar cuando el único cambio son los pedidos que escribe el propio kiosco.
+    """
+
+    def __init__(self, pool: SQLiteConnectionPool, debounce_seg: float = 2.0, intervalo_sondeo_seg: float = 30.0,
+                 tablas: tuple[str, ...] = TABLAS_CATALOGO):
+        self.pool = pool
+        self.db_path = pool.db_path
+        self.debounce_seg = debounce_seg
+        self.intervalo_sondeo_seg = intervalo_sondeo_seg
+        self.tablas = tablas
+
+        self._suscriptores: list[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self._detener = threading.Event()
+        self._observer = None
+        self._hilo_sondeo: threading.Thread | None = None
+
+        self._conn_version: sqlite3.Connection | None = None
+        self._archivos = self._huella_archivos()
+        self._data_version = self._leer_data_version()
+        self._hash_catalogo = self._calcular_hash_catalogo()
+        self.recargas = 0
+
+    def suscribir(self, callback: Callable[[], None]):
+        self._suscriptores.append(callback)
+
+    def _huella_archivos(self) -> dict[str, HuellaArchivo | None]:
+        huellas = {}
+        for sufijo in SUFIJOS_VIGILADOS:
+            ruta = self.db_path + sufijo
+            try:
+                st = os.stat(ruta)
+                huellas[sufijo] = HuellaArchivo(st.st_mtime_ns, st.st_size, st.st_ino)
+            except OSError:
+                huellas[sufijo] = None
+        return huellas
+
+    def _leer_data_version(self) -> int | None:
+        try:
+            if self._conn_version is None:
+                self._conn_version = sqlite3.connect(self.db_path, check_same_thread=False)
+            return self._conn_version.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error as e:
+            logger.warning(f"WARN: No se pudo leer PRAGMA data_version: {e}")
+            return None
+
+    def _calcular_hash_catalogo(self) -> str:
+        digest = hashlib.sha1()
+        with self.pool.obtener_conexion() as conn:
+            for tabla in self.tablas:
+                digest.update(tabla.encode("utf-8"))
+                try:
+                    for row in conn.execute(f'SELECT * FROM "{tabla}" ORDER BY rowid'):
+                        digest.update(repr(row).encode("utf-8"))
+                except sqlite3.Error:
+                    digest.update(b"<sin tabla>")
+        return digest.hexdigest()
+
+    def notificar_evento(self, ruta: str | None = None):
+        """Punto de entrada para eventos del sistema de archivos; reinicia el debounce."""
+        if ruta is not None:
+            nombre = os.path.basename(ruta).lower()
+            base = os.path.basename(self.db_path).lower()
+            if nombre not in {base + sufijo for sufijo in SUFIJOS_VIGILADOS}:
+                return
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce_seg, self.verificar)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def verificar(self) -> bool:
+        """Compara la huella actual con la última conocida y notifica si cambió el catálogo."""
+        with self._lock:
+            self._timer = None
+            archivos = self._huella_archivos()
+            if archivos == self._archivos:
+                return False
+
+            archivo_reemplazado = (
+                archivos[""] is None or self._archivos[""] is None or archivos[""].ino != self._archivos[""].ino
+            )
+            self._archivos = archivos
+            if archivo_reemplazado:
+                logger.info("INFO: config.db fue reemplazado; se reciclan las conexiones SQLite.")
+                self.pool.reciclar()
+                if self._conn_version is not None:
+                    self._conn_version.close()
+                    self._conn_version = None
+
+            data_version = self._leer_data_version()
+            if not archivo_reemplazado and data_version is not None and data_version == self._data_version:
+                return False
+            self._data_version = data_version
+
+            hash_catalogo = self._calcular_hash_catalogo()
+            if hash_catalogo == self._hash_catalogo:
+                logger.info("INFO: config.db cambió pero el catálogo es idéntico; no se recarga.")
+                return False
+            self._hash_catalogo = hash_catalogo
+            self.recargas += 1
+
+        logger.info(f"INFO: Cambio de catálogo detectado en {self.db_path}. Notificando a {len(self._suscriptores)} suscriptores.")
+        for callback in list(self._suscriptores):
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"ERROR: Falló un suscriptor de cambios de config.db: {e}")
+        return True
+
+    def _sondear(self):
+        while not self._detener.wait(self.intervalo_sondeo_seg):
+            try:
+                self.verificar()
+            except Exception as e:
+                logger.error(f"ERROR: Falló el sondeo de config.db: {e}")
+
+    def iniciar(self, usar_watchdog: bool = True):
+        if usar_watchdog:
+            try:
+                from watchdog.observers import Observer
+                from watchdog.events import FileSystemEventHandler
+
+                watcher = self
+
+                class _Handler(FileSystemEventHandler):
+                    def on_any_event(self, event):
+                        watcher.notificar_evento(getattr(event, "dest_path", None) or event.src_path)
+                        if getattr(event, "dest_path", None):
+                            watcher.notificar_evento(event.src_path)
+
+                self._observer = Observer()
+                self._observer.schedule(_Handler(), os.path.dirname(os.path.abspath(self.db_path)), recursive=False)
+                self._observer.start()
+                logger.info(f"INFO: Observando cambios de {self.db_path} con watchdog.")
+            except Exception as e:
+                logger.warning(f"WARN: watchdog no disponible ({e}); solo se usará sondeo periódico.")
+                self._observer = None
+
+        # El sondeo cubre eventos perdidos por watchdog y funciona sin él.
+        self._hilo_sondeo = threading.Thread(target=self._sondear, daemon=True)
+        self._hilo_sondeo.start()
+
+    def detener(self):
+        self._detener.set()
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if self._observer is not None:
+            try:
+                self._observer.stop()
+                self._observer.join(timeout=3)
+            except Exception:
+                pass
+        if self._conn_version is not None:
+            self._conn_version.close()
+            self._conn_version = None
@@ -0,0 +1,140 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+_medicion_local = threading.local()
+
+
+class _ConexionMedidaMixin:
+    """Registra conexión (resolución DNS + TCP, tal como la hace urllib3) y TLS de cada conexión nueva en la
+    medición del hilo actual."""
+
+    def _new_conn(self):
+        medicion = getattr(_medicion_local, "actual", None)
+        inicio = time.perf_counter()
+        sock = super()._new_conn()
+        if medicion is not None:
+            medicion["conexion_ms"] = (time.perf_counter() - inicio) * 1000
+        return sock
+
+    def connect(self):
+        medicion = getattr(_medicion_local, "actual", None)
+        inicio = time.perf_counter()
+        super().connect()
+        if medicion is not None:
+            total_ms = (time.perf_counter() - inicio) * 1000
+            medicion["conexion_nueva"] = True
+            medicion["tls_ms"] = max(0.0, total_ms - medicion.get("conexion_ms", 0.0))
+
+
+class _HTTPConnectionMedida(_ConexionMedidaMixin, HTTPConnection):
+    pass
+
+
+class _HTTPSConnectionMedida(_ConexionMedidaMixin, HTTPSConnection):
+    pass
+
+
+class _HTTPConnectionPoolMedido(HTTPConnectionPool):
+    ConnectionCls = _HTTPConnectionMedida
+
+
+class _HTTPSConnectionPoolMedido(HTTPSConnectionPool):
+    ConnectionCls = _HTTPSConnectionMedida
+
+
+class HTTPAdapterMedido(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _HTTPConnectionPoolMedido,
+            "https": _HTTPSConnectionPoolMedido,
+        }
+
+
+class EstadisticasHttp:
+    """Acumula los tiempos por fase de las peticiones hechas con la sesión."""
+
+    FASES = ("conexion_ms", "tls_ms", "servidor_ms", "total_ms")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.peticiones = 0
+        self.conexiones_nuevas = 0
+        self.errores = 0
+        self.sumas = {fase: 0.0 for fase in self.FASES}
+        self.ultima: dict | None = None
+
+    def registrar(self, medicion: dict):
+        with self._lock:
+            self.peticiones += 1
+            if medicion.get("conexion_nueva"):
+                self.conexiones_nuevas += 1
+            if medicion.get("error"):
+                self.errores += 1
+            for fase in self.FASES:
+                self.sumas[fase] += medicion.get(fase, 0.0)
+            self.ultima = dict(medicion)
+
+    def resumen(self) -> dict:
+        with self._lock:
+            n = self.peticiones or 1
+            return {
+                "peticiones": self.peticiones,
+                "conexiones_nuevas": self.conexiones_nuevas,
+                "conexiones_reutilizadas": self.peticiones - self.conexiones_nuevas,
+                "errores": self.errores,
+                "promedios_ms": {fase: round(total / n, 1) for fase, total in self.sumas.items()},
+                "ultima": self.ultima,
+            }
+
+
+class SesionHttp:
+    """Sesión HTTP de larga vida con keep-alive, pool de conexiones y timeouts separados de conexión y lectura."""
+
+    def __init__(self, timeout_conexion_seg: float = 3.05, timeout_lectura_seg: float = 15.0,
+                 tamano_pool: int = 4):
+        self.timeout = (timeout_conexion_seg, timeout_lectura_seg)
+        self.estadisticas = EstadisticasHttp()
+        self.session = requests.Session()
+        # Solo se reintenta si no se pudo conectar: un POST ya enviado nunca se repite aquí.
+        reintentos = Retry(total=1, connect=1, read=0, redirect=0, status=0)
+        adapter = HTTPAdapterMedido(pool_connections=2, pool_maxsize=tamano_pool, max_retries=reintentos)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Connection": "keep-alive"})
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        medicion = {"conexion_ms": 0.0, "tls_ms": 0.0, "conexion_nueva": False}
+        _medicion_local.actual = medicion
+        inicio = time.perf_counter()
+        try:
+            response = self.session.post(url, timeout=kwargs.pop("timeout", self.timeout), **kwargs)
+            establecimiento_ms = medicion["conexion_ms"] + medicion["tls_ms"]
+            medicion["servidor_ms"] = max(0.0, response.elapsed.total_seconds() * 1000 - establecimiento_ms)
+            medicion["status"] = response.status_code
+            return response
+        except requests.exceptions.RequestException as e:
+            medicion["error"] = type(e).__name__
+            raise
+        finally:
+            _medicion_local.actual = None
+            medicion["total_ms"] = (time.perf_counter() - inicio) * 1000
+            self.estadisticas.registrar(medicion)
+            logger.info(
+                f"INFO: POST {url} total {medicion['total_ms']:.0f} ms "
+                f"(conexión {medicion['conexion_ms']:.0f}, TLS {medicion['tls_ms']:.0f}, "
+                f"servidor {medicion.get('servidor_ms', 0.0):.0f}; "
+                f"{'conexión nueva' if medicion['conexion_nueva'] else 'conexión reutilizada'})"
+            )
+
+    def cerrar(self):
+        self.session.close()
@@ -0,0 +1,128 @@
+import datetime
+import json
+import sqlite3
+import time
+import uuid
+from typing import NamedTuple
+from src.infrastructure.persistence.sqlite_pool import SQLiteConnectionPool
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+ESTADO_PENDIENTE = "pendiente"
+ESTADO_ENVIADO = "enviado"
+ESTADO_RECHAZADO = "rechazado"
+
+
+class MensajeOutbox(NamedTuple):
+    id: int
+    id_pedido: int
+    clave_idempotencia: str
+    payload: dict
+    intentos: int
+
+
+class OutboxRepositorySQLite:
+    """Bandeja de salida persistente de pedidos pendientes de sincronizar con el web service.
+
+    Vive en la base adjunta `esquema` del pool para que pedidos y outbox se confirmen en la misma transacción.
+    """
+
+    def __init__(self, pool: SQLiteConnectionPool, esquema: str = "main"):
+        self.pool = pool
+        self.esquema = esquema
+        self.tabla = f"{esquema}.pedidos_por_sincronizar"
+        self._crear_tabla()
+
+    def _crear_tabla(self):
+        with self.pool.obtener_conexion() as conn:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.tabla} (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id_pedido INTEGER NOT NULL,
+                    clave_idempotencia TEXT NOT NULL UNIQUE,
+                    payload TEXT NOT NULL,
+                    estado TEXT NOT NULL DEFAULT '{ESTADO_PENDIENTE}',
+                    intentos INTEGER NOT NULL DEFAULT 0,
+                    proximo_intento REAL NOT NULL,
+                    ultimo_error TEXT,
+                    id_remoto INTEGER,
+                    creado_en TEXT NOT NULL,
+                    enviado_en TEXT
+                )
+            """)
+            conn.execute(f"""
+                CREATE INDEX IF NOT EXISTS {self.esquema}.idx_pedidos_por_sincronizar_estado
+                ON pedidos_por_sincronizar (estado, proximo_intento)
+            """)
+
+    def transaccion(self):
+        """Conexión compartida con los repositorios del pool; lo escrito dentro se confirma junto."""
+        return self.pool.obtener_conexion()
+
+    def encolar(self, id_pedido: int, payload: dict) -> str:
+        clave = str(uuid.uuid4())
+        with self.pool.obtener_conexion() as conn:
+            conn.execute(
+                f"""INSERT INTO {self.tabla} (id_pedido, clave_idempotencia, payload, proximo_intento, creado_en)
+                    VALUES (?, ?, ?, ?, ?)""",
+                (id_pedido, clave, json.dumps(payload, ensure_ascii=False, default=str), time.time(),
+                 datetime.datetime.now().isoformat()),
+            )
+        logger.info(f"INFO: Pedido {id_pedido} encolado para sincronización (clave {clave}).")
+        return clave
+
+    def obtener_vencidos(self, limite: int = 20) -> list[MensajeOutbox]:
+        query = f"""
+            SELECT id, id_pedido, clave_idempotencia, payload, intentos
+            FROM {self.tabla}
+            WHERE estado = ? AND proximo_intento <= ?
+            ORDER BY id
+            LIMIT ?
+        """
+        try:
+            with self.pool.obtener_conexion() as conn:
+                rows = conn.execute(query, (ESTADO_PENDIENTE, time.time(), limite)).fetchall()
+                return [MensajeOutbox(id=row[0], id_pedido=row[1], clave_idempotencia=row[2],
+                                      payload=json.loads(row[3]), intentos=row[4]) for row in rows]
+        except sqlite3.Error as e:
+            logger.error(f"Error al leer la bandeja de salida: {e}")
+            return []
+
+    def marcar_enviado(self, id_mensaje: int, id_remoto: int):
+        with self.pool.obtener_conexion() as conn:
+            conn.execute(
+                f"UPDATE {self.tabla} SET estado = ?, id_remoto = ?, enviado_en = ?, ultimo_error = NULL WHERE id = ?",
+                (ESTADO_ENVIADO, id_remoto, datetime.datetime.now().isoformat(), id_mensaje),
+            )
+
+    def marcar_fallo(self, id_mensaje: int, error: str | None, proximo_intento: float | None):
+        """Registra un intento fallido. Sin `proximo_intento` el mensaje queda rechazado y no se reintenta."""
+        estado = ESTADO_PENDIENTE if proximo_intento is not None else ESTADO_RECHAZADO
+        with self.pool.obtener_conexion() as conn:
+            conn.execute(
+                f"""UPDATE {self.tabla}
+                    SET intentos = intentos + 1, ultimo_error = ?, estado = ?, proximo_intento = ?
+                    WHERE id = ?""",
+                (error, estado, proximo_intento if proximo_intento is not None else 0, id_mensaje),
+            )
+
+    def profundidad(self) -> int:
+        try:
+            with self.pool.obtener_conexion() as conn:
+                row = conn.execute(f"SELECT COUNT(*) FROM {self.tabla} WHERE estado = ?", (ESTADO_PENDIENTE,)).fetchone()
+                return row[0] if row else 0
+        except sqlite3.Error as e:
+            logger.error(f"Error al contar la bandeja de salida: {e}")
+            return 0
+
+    def proximo_vencimiento(self) -> float | None:
+        try:
+            with self.pool.obtener_conexion() as conn:
+                row = conn.execute(f"SELECT MIN(proximo_intento) FROM {self.tabla} WHERE estado = ?",
+                                   (ESTADO_PENDIENTE,)).fetchone()
+                return row[0] if row else None
+        except sqlite3.Error as e:
+            logger.error(f"Error al consultar la bandeja de salida: {e}")
+            return None
@@ -0,0 +1,188 @@
+import os
+import sqlite3
+import threading
+import queue
+from contextlib import contextmanager
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# config.db se reemplaza completo desde oficina central: con WAL, un -wal huérfano se aplicaría
+# sobre el archivo nuevo, por eso se mantiene el journal de rollback.
+PRAGMAS_POR_DEFECTO = {
+    "journal_mode": "DELETE",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "temp_store": "MEMORY",
+    "cache_size": -8000,
+}
+
+
+class SQLiteConnectionPool:
+    """Pool de conexiones SQLite compartido por todos los repositorios.
+
+    Las bases en `adjuntos` se montan con ATTACH en cada conexión, de modo que una misma transacción
+    puede escribir de forma atómica en config.db y en ellas.
+
+    Las conexiones se crean con check_same_thread=False y solo las usa un hilo a la vez:
+    mientras un hilo tiene una conexión prestada, las llamadas anidadas de ese mismo hilo
+    reutilizan la misma conexión en lugar de pedir otra al pool.
+    """
+
+    def __init__(self, db_path: str, max_conexiones: int = 4, pragmas: dict | None = None,
+                 timeout_espera: float = 10.0, adjuntos: dict[str, str] | None = None):
+        self.db_path = db_path
+        self.adjuntos = dict(adjuntos or {})
+        self.max_conexiones = max_conexiones
+        self.pragmas = dict(PRAGMAS_POR_DEFECTO if pragmas is None else pragmas)
+        self.timeout_espera = timeout_espera
+
+        self._libres: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._todas: list[sqlite3.Connection] = []
+        self._generacion: dict[int, int] = {}
+        self._generacion_actual = 0
+        self._incompletas: set[int] = set()  # conexiones a las que les falta algún adjunto
+        self._cerrado = False
+
+        self._creadas = 0
+        self._prestamos = 0
+        self._reutilizadas = 0
+        self._esperas = 0
+        self._en_uso = 0
+
+    def _crear_conexion(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=self.timeout_espera)
+        for nombre, valor in self.pragmas.items():
+            try:
+                conn.execute(f"PRAGMA {nombre} = {valor}")
+            except sqlite3.Error as e:
+                logger.warning(f"WARN: No se pudo aplicar PRAGMA {nombre}={valor}: {e}")
+        for alias, ruta in self.adjuntos.items():
+            # Si un adjunto no se puede abrir la conexión sigue sirviendo para config.db (catálogo, health);
+            # solo fallan las consultas al adjunto, y al devolverse se descarta para reintentar el ATTACH.
+            try:
+                directorio = os.path.dirname(ruta)
+                if directorio:
+                    os.makedirs(directorio, exist_ok=True)
+                conn.execute(f"ATTACH DATABASE ? AS {alias}", (ruta,))
+            except (sqlite3.Error, OSError) as e:
+                logger.error(f"ERROR: No se pudo adjuntar {ruta} como '{alias}': {e}")
+                self._incompletas.add(id(conn))
+        self._creadas += 1
+        self._todas.append(conn)
+        self._generacion[id(conn)] = self._generacion_actual
+        logger.info(f"INFO: Nueva conexión SQLite creada ({self._creadas}/{self.max_conexiones}) para {self.db_path}")
+        return conn
+
+    def _tomar(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._cerrado:
+                raise sqlite3.ProgrammingError("El pool de conexiones está cerrado.")
+            try:
+                conn = self._libres.get_nowait()
+                self._reutilizadas += 1
+            except queue.Empty:
+                conn = self._crear_conexion() if len(self._todas) < self.max_conexiones else None
+            if conn is not None:
+                self._en_uso += 1
+                return conn
+            self._esperas += 1
+
+        try:
+            conn = self._libres.get(timeout=self.timeout_espera)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"Tiempo de espera agotado ({self.timeout_espera}s) esperando una conexión libre.")
+        with self._lock:
+            self._reutilizadas += 1
+            self._en_uso += 1
+        return conn
+
+    def _descartar(self, conn: sqlite3.Connection):
+        self._generacion.pop(id(conn), None)
+        self._incompletas.discard(id(conn))
+        if conn in self._todas:
+            self._todas.remove(conn)
+        conn.close()
+
+    def _devolver(self, conn: sqlite3.Connection):
+        with self._lock:
+            self._en_uso -= 1
+            if (self._cerrado or self._generacion.get(id(conn)) != self._generacion_actual
+                    or id(conn) in self._incompletas):
+                self._descartar(conn)
+                return
+        self._libres.put(conn)
+
+    @contextmanager
+    def obtener_conexion(self):
+        """Presta una conexión con la misma semántica que `with sqlite3.connect(...)`:
+        commit al salir sin error, rollback si hubo excepción."""
+        prestada = getattr(self._local, "conexion", None)
+        if prestada is not None:
+            yield prestada
+            return
+
+        conn = self._tomar()
+        with self._lock:
+            self._prestamos += 1
+        self._local.conexion = conn
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._local.conexion = None
+            self._devolver(conn)
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            return {
+                "db_path": self.db_path,
+                "max_conexiones": self.max_conexiones,
+                "creadas": self._creadas,
+                "abiertas": len(self._todas),
+                "en_uso": self._en_uso,
+                "libres": self._libres.qsize(),
+                "prestamos": self._prestamos,
+                "reutilizadas": self._reutilizadas,
+                "esperas": self._esperas,
+            }
+
+    def verificar(self) -> bool:
+        """True si la base responde: lee el esquema, así que falla si el archivo no se puede abrir o leer."""
+        try:
+            with self.obtener_conexion() as conn:
+                conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"ERROR: La base de datos {self.db_path} no responde: {e}")
+            return False
+
+    def reciclar(self):
+        """Cierra las conexiones libres y marca las prestadas para cerrarse al devolverse.
+
+        Se usa cuando config.db se reemplaza en disco: las conexiones nuevas abren el archivo actual.
+        """
+        with self._lock:
+            self._generacion_actual += 1
+            while True:
+                try:
+                    self._descartar(self._libres.get_nowait())
+                except queue.Empty:
+                    break
+        logger.info(f"INFO: Conexiones SQLite recicladas para {self.db_path}")
+
+    def cerrar(self):
+        with self._lock:
+            self._cerrado = True
+            while True:
+                try:
+                    self._libres.get_nowait().close()
+                except queue.Empty:
+                    break
+            self._todas.clear()
+            self._generacion.clear()
+        logger.info(f"INFO: Pool de conexiones SQLite cerrado para {self.db_path}")
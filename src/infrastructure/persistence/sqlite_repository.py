@@ -1,3 +1,4 @@
+import re
 import sqlite3
 import datetime
 from src.domain.pedido import Pedido
@@ -5,19 +6,20 @@ from src.application.repositories import (
     TamanoRepository, CategoriaRepository, TipoPanRepository,
     TipoFormaRepository, TipoRellenoRepository, TipoCoberturaRepository,
     FinalizarPedidoRepository, FormaPastel, TipoRelleno, TipoCobertura,
-    Categoria, TipoPan, ImagenGaleriaRepository, ImagenGaleria, TipoColorRepository,
-    Ticket, HorarioEntregaRepository, Horario, DiaFestivoRepository, TamanoPastel,
+    Categoria, TipoPan, ImagenGaleriaRepository, ImagenGaleria, PaginaGaleria, TipoColorRepository,
+    Ticket, HorarioEntregaRepository, Horario, DiaFestivoRepository, OcupacionEntregaRepository, TamanoPastel,
     PastelConfiguradoRepository, ExtraRepository, Extra, PastelConfigurado,
-    ExtraChorreadoRepository, TamanoRectangularRepository
+    ExtraChorreadoRepository, TamanoRectangularRepository, SucursalRepository, Sucursal
 )
+from src.infrastructure.persistence.sqlite_pool import SQLiteConnectionPool
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 class CategoriaRepositorySQLite(CategoriaRepository):
-    def __init__(self, db_path: str):
-        self.db_path = db_path
+    def __init__(self, pool: SQLiteConnectionPool):
+        self.pool = pool
 
     def obtener_todas(self, id_tamano: int) -> list[Categoria]:
         query = """
@@ -31,7 +33,7 @@ class CategoriaRepositorySQLite(CategoriaRepository):
                 """
         categorias = []
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.obtener_conexion() as conn:
                 cursor = conn.cursor()
                 cursor.execute(query, (id_tamano,))
                 for row in cursor.fetchall():
@@ -43,7 +45,7 @@ class CategoriaRepositorySQLite(CategoriaRepository):
     def obtener_por_id(self, id_categoria: int) -> Categoria | None:
         query = "SELECT id_categoria, nombre_categoria, imagen_url FROM categorias WHERE id_categoria = ?"
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.obtener_conexion() as conn:
                 cursor = conn.cursor()
                 cursor.execute(query, (id_categoria,))
                 row = cursor.fetchone()
@@ -55,8 +57,8 @@ class CategoriaRepositorySQLite(CategoriaRepository):
 
 
 class TipoPanRepositorySQLite(TipoPanRepository):
-    def __init__(self, db_path: str):
-        self.db_path = db_path
+    def __init__(self, pool: SQLiteConnectionPool):
+        self.pool = pool
 
     def obtener_por_categoria(self, id_categoria: int) -> list[TipoPan]:
         query = """
@@ -66,7 +68,7 @@ class TipoPanRepositorySQLite(TipoPanRepository):
             ORDER BY tp.nombre_tipo_pan
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.obtener_conexion() as conn:
                 cursor = conn.cursor()
                 cursor.execute(query, (id_categoria,))
                 return [TipoPan(id=row[0], nombre=row[1], imagen_url=row[2]) for row in cursor.fetchall()]
@@ -76,8 +78,8 @@ class TipoPanRepositorySQLite(TipoPanRepository):
 
 
 class TipoFormaRepositorySQLite(TipoFormaRepository):
-    def __init__(self, db_path: str):
-        self.db_path = db_path
+    def __init__(self, pool: SQLiteConnectionPool):
+        self.pool = pool
 
     def obtener_por_categoria(self, id_categoria: int) -> list[FormaPastel]:
         query = """
@@ -87,7 +89,7 @@ class TipoFormaRepositorySQLite(TipoFormaRepository):
             ORDER BY tf.nombre_tipo_forma
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.obtener_conexion() as conn:
                 cursor = conn.cursor()
                 cursor.execute(query, (id_categoria,))
                 return [FormaPastel(id=row[0], nombre=row[1], imagen_url=row[2]) for row in cursor.fetchall()]
@@ -96,12 +98,12 @@ class TipoFormaRepositorySQLite(TipoFormaRepository):
             return []
 
 class TamanoRepositorySQLite(TamanoRepository):
-    def __init__(self, db_path: str):
-        self.db_path = db_path
+    def __init__(self, pool: SQLiteConnectionPool):
+        self.pool = pool
 
     def obtener_todos(self) -> list[TamanoPastel]:
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.obtener_conexion() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                 SELECT id_tipo_tamano, nombre_tamano
@@ -120,8 +122,8 @@ class TamanoRepositorySQLite(TamanoRepository):
 
 
 class TipoRellenoRepositorySQLite(TipoRellenoRepository):
-    def __init__(self, db_path: str):
-        self.db_path = db_path
+    def __init__(self, pool: SQLiteConnectionPool):
+        self.pool = pool
 
     def obtener_por_categoria_y_pan(self, id_categoria: int, id_tipo_pan: int) -> list[TipoRelleno]:
         query = """
@@ -132,7 +134,7 @@ class TipoRellenoRepositorySQLite(TipoRellenoRepository):
             ORDER BY tr.nombre_tipo_relleno
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.obtener_conexion() as conn:
                 cursor = conn.cursor()
                 cursor.execute(query, (id_categoria, id_tipo_pan))
                 return [TipoRelleno(nombre=row[0], imagen_url=row[1]) for row in cursor.fetchall()]
@@ -142,8 +144,8 @@ class TipoRellenoRepositorySQLite(TipoRellenoRepository):
 
 
 class TipoCoberturaRepositorySQLite(TipoCoberturaRepository):
-    def __init__(self, db_path: str):
-        self.db_path = db_path
+    def __init__(self, pool: SQLiteConnectionPool):
+        self.pool = pool
 
     def obtener_por_categoria_y_pan(self, id_categoria: int, id_tipo_pan: int) -> list[TipoCobertura]:
         query = """
@@ -153,7 +155,7 @@ class TipoCoberturaRepositorySQLite(TipoCoberturaRepository):
             ORDER BY tc.nombre_tipo_cobertura
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.obtener_conexion() as conn:
                 cursor = conn.cursor()
                 cursor.execute(query, (id_categoria, id_tipo_pan))
                 return [TipoCobertura(nombre=row[0], imagen_url=row[1]) for row in cursor.fetchall()]
@@ -163,8 +165,8 @@ class TipoCoberturaRepositorySQLite(TipoCoberturaRepository):
 
 
 class FinalizarPedidoRepositorySQLite(FinalizarPedidoRepository):
-    def __init__(self, db_path: str):
-        self.db_path = db_path
+    def __init__(self, pool: SQLiteConnectionPool):
+        self.pool = pool
 
     def guardar(self, pedido: Pedido) -> int:
 
@@ -224,10 +226,9 @@ class FinalizarPedidoRepositorySQLite(FinalizarPedidoRepository):
         )
 
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.obtener_conexion() as conn:
                 cursor = conn.cursor()
                 cursor.execute(query, datos)
-                conn.commit()
                 return cursor.lastrowid
         except sqlite3.Error as e:
             logger.error(f"Error al guardar el pedido final en la base de datos: {e}")
@@ -246,7 +247,7 @@ class FinalizarPedidoRepositorySQLite(FinalizarPedidoRepository):
                    JOIN categorias c ON p.id_categoria = c.id_categoria
                    WHERE p.id_pedido = ?"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.obtener_conexion() as conn:
                 cursor = conn.cursor()
                 cursor.execute(query, (id_pedido,))
                 row = cursor.fetchone()
@@ -298,41 +299,173 @@ class FinalizarPedidoRepositorySQLite(FinalizarPedidoRepository):
 
 
 class ImagenGaleriaRepositorySQLite(ImagenGaleriaRepository):
-    def __init__(self, db_path: str):
-        self.db_path = db_path
+    """Galería de diseños con búsqueda de texto completo.
+
+    La búsqueda usa una tabla FTS5 de contenido externo sobre imagenes_galeria, mantenida al día con triggers.
+    El tokenizador quita acentos ("pastel" encuentra "pastél") y cada palabra se busca como prefijo para que
+    funcione mientras se escribe. Los resultados se ordenan por relevancia (bm25). Si el SQLite del equipo no
+    trae FTS5 se vuelve a la búsqueda con LIKE.
+    """
+
+    TABLA_FTS = "imagenes_galeria_fts"
+    # Peso de cada columna en bm25: descripcion, tags, categoria_imagen.
+    PESOS_FTS = (10.0, 5.0, 1.0)
+    COLUMNAS = "g.id_imagen, g.url_imagen, g.descripcion, g.categoria_imagen, g.tags"
+
+    def __init__(self, pool: SQLiteConnectionPool):
+        self.pool = pool
+        self.busqueda_fts = False
+        self.asegurar_indice()
+
+    def asegurar_indice(self):
+        """Crea el índice de búsqueda y sus triggers si faltan, por ejemplo después de reemplazar config.db."""
+        fts = self.TABLA_FTS
+        try:
+            with self.pool.obtener_conexion() as conn:
+                existe = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,)
+                ).fetchone()
+                conn.execute(f"""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                        descripcion, tags, categoria_imagen,
+                        content='imagenes_galeria', content_rowid='id_imagen',
+                        tokenize='unicode61 remove_diacritics 2', prefix='2 3 4'
+                    )
+                """)
+                conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON imagenes_galeria BEGIN
+                        INSERT INTO {fts} (rowid, descripcion, tags, categoria_imagen)
+                        VALUES (new.id_imagen, new.descripcion, new.tags, new.categoria_imagen);
+                    END
+                """)
+                conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON imagenes_galeria BEGIN
+                        INSERT INTO {fts} ({fts}, rowid, descripcion, tags, categoria_imagen)
+                        VALUES ('delete', old.id_imagen, old.descripcion, old.tags, old.categoria_imagen);
+                    END
+                """)
+                conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON imagenes_galeria BEGIN
+                        INSERT INTO {fts} ({fts}, rowid, descripcion, tags, categoria_imagen)
+                        VALUES ('delete', old.id_imagen, old.descripcion, old.tags, old.categoria_imagen);
+                        INSERT INTO {fts} (rowid, descripcion, tags, categoria_imagen)
+                        VALUES (new.id_imagen, new.descripcion, new.tags, new.categoria_imagen);
+                    END
+                """)
+                if not existe:
+                    conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+                    logger.info("INFO: Índice de búsqueda de la galería creado.")
+            self.busqueda_fts = True
+        except sqlite3.Error as e:
+            self.busqueda_fts = False
+            logger.warning(f"WARN: Búsqueda de texto completo no disponible, se usará LIKE: {e}")
+
+    @staticmethod
+    def _consulta_fts(termino: str | None) -> str | None:
+        """Convierte lo escrito en una consulta FTS5: cada palabra como prefijo, todas requeridas."""
+        palabras = re.findall(r"\w+", termino or "")
+        if not palabras:
+            return None
+        return " ".join(f'"{palabra}"*' for palabra in palabras)
 
-    def buscar(self, categoria: str | None = None, termino: str | None = None) -> list[ImagenGaleria]:
-        base_query = "SELECT id_imagen, url_imagen, descripcion, categoria_imagen, tags FROM imagenes_galeria"
+    def _consulta(self, categoria: str | None, termino: str | None) -> tuple[str, list[str], list, bool]:
+        """Devuelve el FROM, las condiciones, sus parámetros y si los resultados se ordenan por relevancia."""
         conditions = []
         params = []
+        consulta_fts = self._consulta_fts(termino) if self.busqueda_fts else None
+
+        if consulta_fts:
+            origen = f"{self.TABLA_FTS} JOIN imagenes_galeria g ON g.id_imagen = {self.TABLA_FTS}.rowid"
+            conditions.append(f"{self.TABLA_FTS} MATCH ?")
+            params.append(consulta_fts)
+        else:
+            origen = "imagenes_galeria g"
+            if termino and termino.strip():
+                conditions.append("(g.descripcion LIKE ? OR g.tags LIKE ?)")
+                params.extend([f"%{termino.strip()}%", f"%{termino.strip()}%"])
 
         if categoria:
-            conditions.append("categoria_imagen = ?")
+            conditions.append("g.categoria_imagen = ?")
             params.append(categoria)
 
-        if termino:
-            conditions.append("(descripcion LIKE ? OR tags LIKE ?)")
-            params.extend([f"%{termino}%", f"%{termino}%"])
+        return f"FROM {origen}", conditions, params, consulta_fts is not None
 
-        if conditions:
-            query = f"{base_query} WHERE {' AND '.join(conditions)}"
-        else:
-            query = base_query
+    @staticmethod
+    def _where(conditions: list[str]) -> str:
+        return f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    def _orden_relevancia(self) -> str:
+        pesos = ", ".join(str(peso) for peso in self.PESOS_FTS)
+        return f"ORDER BY bm25({self.TABLA_FTS}, {pesos}), g.id_imagen"
+
+    def _ejecutar(self, armar_query) -> tuple[list[ImagenGaleria], bool]:
+        """Corre la consulta que arma `armar_query()` -> (query, params, por_relevancia).
+
+        Si config.db se reemplazó por una copia sin el índice FTS (el watcher no avisa cuando el catálogo no
+        cambió), lo vuelve a crear y repite la consulta una vez; si no se puede crear, la repite con LIKE.
+        """
+        for reintento in (False, True):
+            query, params, por_relevancia = armar_query()
+            try:
+                with self.pool.obtener_conexion() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute(query, params)
+                    return [ImagenGaleria(id=row[0], ruta=row[1], descripcion=row[2], categoria=row[3], tags=row[4])
+                            for row in cursor.fetchall()], por_relevancia
+            except sqlite3.OperationalError as e:
+                if reintento or self.TABLA_FTS not in str(e):
+                    raise
+                logger.warning(f"WARN: Falta el índice de búsqueda de la galería ({e}). Se vuelve a crear.")
+                self.asegurar_indice()
+
+    def buscar(self, categoria: str | None = None, termino: str | None = None) -> list[ImagenGaleria]:
+        def armar_query():
+            origen, conditions, params, por_relevancia = self._consulta(categoria, termino)
+            query = f"SELECT {self.COLUMNAS} {origen}{self._where(conditions)}"
+            if por_relevancia:
+                query += f" {self._orden_relevancia()}"
+            return query, params, por_relevancia
 
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-                return [ImagenGaleria(id=row[0], ruta=row[1], descripcion=row[2], categoria=row[3], tags=row[4]) for row
-                        in cursor.fetchall()]
+            return self._ejecutar(armar_query)[0]
         except sqlite3.Error as e:
             logger.error(f"Error al buscar en la galería de imágenes: {e}")
             return []
 
+    def buscar_pagina(self, categoria: str | None = None, termino: str | None = None,
+                      despues_de: int | None = None, limite: int = 30) -> PaginaGaleria:
+        def armar_query():
+            origen, conditions, params, por_relevancia = self._consulta(categoria, termino)
+            if por_relevancia:
+                # Ordenado por relevancia el cursor es la posición; las búsquedas devuelven pocos resultados.
+                query = f"SELECT {self.COLUMNAS} {origen}{self._where(conditions)} {self._orden_relevancia()} LIMIT ? OFFSET ?"
+                params.extend([limite + 1, despues_de or 0])
+            else:
+                # Paginación por cursor sobre la llave primaria: cada página cuesta lo mismo sin importar qué tan
+                # adentro de la galería esté, a diferencia de OFFSET.
+                if despues_de is not None:
+                    conditions.append("g.id_imagen > ?")
+                    params.append(despues_de)
+                query = f"SELECT {self.COLUMNAS} {origen}{self._where(conditions)} ORDER BY g.id_imagen LIMIT ?"
+                params.append(limite + 1)
+            return query, params, por_relevancia
+
+        try:
+            imagenes, por_relevancia = self._ejecutar(armar_query)
+        except sqlite3.Error as e:
+            logger.error(f"Error al buscar en la galería de imágenes: {e}")
+            return PaginaGaleria(imagenes=[], cursor_siguiente=None)
+
+        if len(imagenes) <= limite:
+            return PaginaGaleria(imagenes=imagenes, cursor_siguiente=None)
+        imagenes = imagenes[:limite]
+        cursor_siguiente = (despues_de or 0) + limite if por_relevancia else imagenes[-1].id
+        return PaginaGaleria(imagenes=imagenes, cursor_siguiente=cursor_siguiente)
+
     def obtener_por_id(self, id_imagen: int) -> ImagenGaleria | None:
         query = "SELECT id_imagen, url_imagen, descripcion, categoria_imagen, tags FROM imagenes_galeria WHERE id_imagen = ?"
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.obtener_conexion() as conn:
                 cursor = conn.cursor()
                 cursor.execute(query, (id_imagen,))
                 row = cursor.fetchone()
@@ -345,13 +478,13 @@ class ImagenGaleriaRepositorySQLite(ImagenGaleriaRepository):
 
 
 class TipoColorRepositorySQLite(TipoColorRepository):
-    def __init__(self, db_path: str):
-        self.db_path = db_path
+    def __init__(self, pool: SQLiteConnectionPool):
+        self.pool = pool
 
     def obtener_todos(self) -> list[str]:
         query = "SELECT nombre_tipo_color FROM tipos_colores ORDER BY nombre_tipo_color"
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.obtener_conexion() as conn:
                 cursor = conn.cursor()
                 cursor.execute(query)
                 return [row[0] for row in cursor.fetchall()]
@@ -361,13 +494,13 @@ class TipoColorRepositorySQLite(TipoColorRepository):
 
 
 class HorarioEntregaRepositorySQLite(HorarioEntregaRepository):
-    def __init__(self, db_path: str):
-        self.db_path = db_path
+    def __init__(self, pool: SQLiteConnectionPool):
+        self.pool = pool
 
     def obtener_horario(self) -> Horario | None:
         query = "SELECT hora_inicio, hora_fin FROM horario_entrega LIMIT 1"
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.obtener_conexion() as conn:
                 cursor = conn.cursor()
                 cursor.execute(query)
                 row = cursor.fetchone()
@@ -381,31 +514,74 @@ class HorarioEntregaRepositorySQLite(HorarioEntregaRepository):
 
 
 class DiaFestivoRepositorySQLite(DiaFestivoRepository):
-    def __init__(self, db_path: str):
-        self.db_path = db_path
+    def __init__(self, pool: SQLiteConnectionPool):
+        self.pool = pool
 
     def es_festivo(self, fecha: datetime.date) -> bool:
         query = "SELECT 1 FROM dias_festivos WHERE strftime('%m-%d', festivo) = ?"
 
         fecha_str = fecha.strftime('%m-%d')
 
-        logger.info(f"\n[DEBUG] Verificando si '{fecha_str}' es festivo...")
-
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.obtener_conexion() as conn:
                 cursor = conn.cursor()
                 cursor.execute(query, (fecha_str,))
-                resultado = cursor.fetchone() is not None
-                logger.info(f"[DEBUG] Resultado: {resultado}")
-                return resultado
+                return cursor.fetchone() is not None
         except sqlite3.Error as e:
             logger.error(f"Error al verificar día festivo: {e}")
         return False
 
+    def obtener_todos(self) -> set[tuple[int, int]]:
+        query = "SELECT DISTINCT strftime('%m', festivo), strftime('%d', festivo) FROM dias_festivos"
+        try:
+            with self.pool.obtener_conexion() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query)
+                return {(int(mes), int(dia)) for mes, dia in cursor.fetchall() if mes and dia}
+        except sqlite3.Error as e:
+            logger.error(f"Error al leer los días festivos: {e}")
+        return set()
+
+
+class OcupacionEntregaRepositorySQLite(OcupacionEntregaRepository):
+    def __init__(self, pool: SQLiteConnectionPool):
+        self.pool = pool
+        self._indice_creado = False
+
+    def _asegurar_indice(self, conn):
+        if not self._indice_creado:
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_pedidos_entrega ON pedidos (fecha_entrega, hora_entrega)")
+            self._indice_creado = True
+
+    def contar_por_rango(self, desde: datetime.date, hasta: datetime.date) -> dict[tuple[datetime.date, str], int]:
+        # fecha_entrega se guarda como 'YYYY-MM-DD' (a veces con hora); el rango abierto por arriba cubre ambos.
+        query = """
+                SELECT substr(fecha_entrega, 1, 10), hora_entrega, COUNT(*)
+                FROM pedidos
+                WHERE fecha_entrega >= ? AND fecha_entrega < ? AND hora_entrega IS NOT NULL
+                GROUP BY 1, 2
+                """
+        hasta_exclusivo = hasta + datetime.timedelta(days=1)
+        try:
+            with self.pool.obtener_conexion() as conn:
+                self._asegurar_indice(conn)
+                cursor = conn.cursor()
+                cursor.execute(query, (desde.isoformat(), hasta_exclusivo.isoformat()))
+                ocupacion = {}
+                for fecha, rango, cantidad in cursor.fetchall():
+                    try:
+                        ocupacion[(datetime.date.fromisoformat(fecha), rango)] = cantidad
+                    except ValueError:
+                        continue
+                return ocupacion
+        except sqlite3.Error as e:
+            logger.error(f"Error al contar los pedidos agendados: {e}")
+        return {}
+
 
 class PastelConfiguradoRepositorySQLite(PastelConfiguradoRepository):
-    def __init__(self, db_path: str):
-        self.db_path = db_path
+    def __init__(self, pool: SQLiteConnectionPool):
+        self.pool = pool
 
     def obtener_configuracion(self, id_cat: int, id_pan: int, id_forma: int, id_tam: int) -> PastelConfigurado | None:
         # Añadimos el ID y los campos que faltaban
@@ -427,9 +603,9 @@ class PastelConfiguradoRepositorySQLite(PastelConfiguradoRepository):
                   AND id_tipo_tamano_seleccionado = ? LIMIT 1 \
                 """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self.pool.obtener_conexion() as conn:
                 cursor = conn.cursor()
+                cursor.row_factory = sqlite3.Row
                 cursor.execute(query, (id_cat, id_forma, id_tam))
                 row = cursor.fetchone()
                 return PastelConfigurado(**row) if row else None
@@ -458,9 +634,9 @@ class PastelConfiguradoRepositorySQLite(PastelConfiguradoRepository):
                   AND id_tipo_tamano_seleccionado = ? \
                 """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self.pool.obtener_conexion() as conn:
                 cursor = conn.cursor()
+                cursor.row_factory = sqlite3.Row
                 cursor.execute(query, (id_cat, id_forma, id_tam))
                 rows = cursor.fetchall()
                 return [PastelConfigurado(**row) for row in rows]
@@ -486,9 +662,9 @@ class PastelConfiguradoRepositorySQLite(PastelConfiguradoRepository):
                 WHERE id_pastel_configurado = ? \
                 """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self.pool.obtener_conexion() as conn:
                 cursor = conn.cursor()
+                cursor.row_factory = sqlite3.Row
                 cursor.execute(query, (id_config,))
                 row = cursor.fetchone()
                 return PastelConfigurado(**row) if row else None
@@ -527,13 +703,13 @@ class PastelConfiguradoRepositorySQLite(PastelConfiguradoRepository):
 
 
 class ExtraRepositorySQLite(ExtraRepository):
-    def __init__(self, db_path: str):
-        self.db_path = db_path
+    def __init__(self, pool: SQLiteConnectionPool):
+        self.pool = pool
 
     def obtener_por_descripcion(self, descripcion: str) -> Extra | None:
         query = "SELECT id, descripcion, costo FROM extras WHERE descripcion = ?"
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.obtener_conexion() as conn:
                 cursor = conn.cursor()
                 cursor.execute(query, (descripcion,))
                 row = cursor.fetchone()
@@ -545,13 +721,13 @@ class ExtraRepositorySQLite(ExtraRepository):
 
 
 class ExtraChorreadoRepositorySQLite(ExtraChorreadoRepository):
-    def __init__(self, db_path: str):
-        self.db_path = db_path
+    def __init__(self, pool: SQLiteConnectionPool):
+        self.pool = pool
 
     def obtener_precio_por_tamano(self, tamano: str) -> float | None:
         query = "SELECT costo FROM extra_chorreado WHERE LOWER(tamano) = LOWER(?)"
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.obtener_conexion() as conn:
                 cursor = conn.cursor()
                 cursor.execute(query, (tamano,))
                 row = cursor.fetchone()
@@ -567,13 +743,13 @@ class ExtraChorreadoRepositorySQLite(ExtraChorreadoRepository):
 
 
 class TamanoRectangularRepositorySQLite(TamanoRectangularRepository):
-    def __init__(self, db_path: str):
-        self.db_path = db_path
+    def __init__(self, pool: SQLiteConnectionPool):
+        self.pool = pool
 
     def obtener_precio_por_peso(self, peso: str) -> float | None:
         query = "SELECT costo FROM tamano_rectangular WHERE LOWER(tamano) = LOWER(?)"
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.pool.obtener_conexion() as conn:
                 cursor = conn.cursor()
                 cursor.execute(query, (peso,))
                 row = cursor.fetchone()
@@ -586,3 +762,24 @@ class TamanoRectangularRepositorySQLite(TamanoRectangularRepository):
         except sqlite3.Error as e:
             logger.error(f"Error al obtener precio de tamano_rectangular por peso '{peso}': {e}")
             return 0.0
+
+
+class SucursalRepositorySQLite(SucursalRepository):
+    def __init__(self, pool: SQLiteConnectionPool):
+        self.pool = pool
+
+    def obtener(self) -> Sucursal | None:
+        query = "SELECT nSucursalPK, cIdentificador FROM Sucursales LIMIT 1"
+        try:
+            with self.pool.obtener_conexion() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query)
+                row = cursor.fetchone()
+                if row:
+                    return Sucursal(
+                        n_sucursal_pk=int(row[0]) if row[0] is not None else 1,
+                        c_identificador=str(row[1]) if row[1] is not None else "",
+                    )
+        except sqlite3.Error as e:
+            logger.error(f"Error al obtener los datos de la sucursal: {e}")
+        return None
@@ -0,0 +1,186 @@
+"""Matriz precalculada con el precio de cada pastel configurado.
+
+Se genera a partir del catálogo al iniciar la app (solo si el catálogo cambió) y también como paso de publicación:
+    python -m src.infrastructure.price_matrix --db C:/KioscoPP/config.db --salida C:/KioscoPP/matriz_precios.json
+
+Dos matrices se pueden comparar para auditar los cambios de precio antes de publicar un catálogo:
+    python -m src.infrastructure.price_matrix --comparar anterior.json nueva.json
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import sys
+from typing import Iterable
+from src.application.pricing import PricingEngine, PrecioPastel, ClaveCotizacion, ID_PAN_CHOCOLATE
+from src.application.repositories import PastelConfigurado
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Columnas de `filas`; una fila por configuración x fondant x pan de chocolate.
+COLUMNAS = (
+    "id_pastel_configurado", "fondant", "pan_chocolate",
+    "precio_base", "precio_chocolate", "precio_pastel", "monto_deposito",
+)
+
+
+def huella_configuraciones(configuraciones: Iterable[PastelConfigurado]) -> str:
+    digest = hashlib.sha1()
+    for config in sorted(configuraciones, key=lambda c: c.id_pastel_configurado):
+        digest.update(repr(tuple(config)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class MatrizPrecios:
+    """Índice en memoria (id de configuración, fondant, pan de chocolate) -> PrecioPastel."""
+
+    VERSION = 1
+
+    def __init__(self, huella: str, precios: dict[tuple[int, bool, bool], PrecioPastel],
+                 primera_por_clave: dict[tuple[int, int, int], int], generada_en: str | None = None):
+        self.huella = huella
+        self.precios = precios
+        # Igual que PastelConfiguradoRepository.obtener_configuracion: la primera variante por (categoría, forma, tamaño).
+        self.primera_por_clave = primera_por_clave
+        self.generada_en = generada_en or datetime.datetime.now().isoformat(timespec="seconds")
+
+    @classmethod
+    def construir(cls, configuraciones: Iterable[PastelConfigurado]) -> "MatrizPrecios":
+        configuraciones = sorted(configuraciones, key=lambda c: c.id_pastel_configurado)
+        precios = {}
+        primera_por_clave = {}
+        for config in configuraciones:
+            primera_por_clave.setdefault(
+                (config.id_categoria, config.id_tipo_forma_seleccionada, config.id_tipo_tamano_seleccionado),
+                config.id_pastel_configurado,
+            )
+            for fondant in (False, True):
+                for pan_chocolate in (False, True):
+                    precios[(config.id_pastel_configurado, fondant, pan_chocolate)] = \
+                        PricingEngine.precio_pastel(config, fondant, pan_chocolate)
+        return cls(huella_configuraciones(configuraciones), precios, primera_por_clave)
+
+    def buscar(self, clave: ClaveCotizacion) -> PrecioPastel | None:
+        id_config = clave.id_pastel_configurado
+        if not id_config and all([clave.id_categoria, clave.id_pan, clave.id_forma, clave.id_tamano]):
+            id_config = self.primera_por_clave.get((clave.id_categoria, clave.id_forma, clave.id_tamano))
+        if not id_config:
+            return None
+        return self.precios.get((id_config, clave.fondant, clave.id_pan == ID_PAN_CHOCOLATE))
+
+    def __len__(self):
+        return len(self.precios)
+
+    def a_dict(self) -> dict:
+        configuraciones = {}
+        filas = []
+        for (id_config, fondant, pan_chocolate), precio in sorted(self.precios.items()):
+            configuraciones.setdefault(str(id_config), [precio.peso_pastel, precio.medidas_pastel, precio.incluye])
+            filas.append([id_config, fondant, pan_chocolate, precio.precio_base, precio.precio_chocolate,
+                          precio.precio_pastel, precio.monto_deposito])
+        return {
+            "version": self.VERSION,
+            "huella": self.huella,
+            "generada_en": self.generada_en,
+            "columnas": list(COLUMNAS),
+            "filas": filas,
+            "configuraciones": configuraciones,
+            "primera_por_clave": [[*clave, id_config] for clave, id_config in sorted(self.primera_por_clave.items())],
+        }
+
+    @classmethod
+    def desde_dict(cls, datos: dict) -> "MatrizPrecios":
+        if datos.get("version") != cls.VERSION or datos.get("columnas") != list(COLUMNAS):
+            raise ValueError(f"versión de matriz no soportada: {datos.get('version')}")
+        precios = {}
+        for id_config, fondant, pan_chocolate, base, chocolate, pastel, deposito in datos["filas"]:
+            peso, medidas, incluye = datos["configuraciones"][str(id_config)]
+            precios[(id_config, fondant, pan_chocolate)] = PrecioPastel(
+                id_config, base, chocolate, pastel, deposito, peso, medidas, incluye
+            )
+        primera_por_clave = {(cat, forma, tam): id_config for cat, forma, tam, id_config in datos["primera_por_clave"]}
+        return cls(datos["huella"], precios, primera_por_clave, datos.get("generada_en"))
+
+    def guardar(self, ruta: str):
+        temporal = ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(self.a_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def cargar(cls, ruta: str) -> "MatrizPrecios | None":
+        try:
+            with open(ruta, "r", encoding="utf-8") as f:
+                return cls.desde_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"WARN: Matriz de precios ilegible en {ruta}, se regenerará: {e}")
+            return None
+
+    @classmethod
+    def vigente(cls, ruta: str, configuraciones: Iterable[PastelConfigurado]) -> "MatrizPrecios":
+        """La matriz guardada si corresponde al catálogo actual; si no, una nueva que además se guarda."""
+        configuraciones = list(configuraciones)
+        guardada = cls.cargar(ruta)
+        if guardada and guardada.huella == huella_configuraciones(configuraciones):
+            logger.info(f"INFO: Matriz de precios vigente cargada ({len(guardada)} precios).")
+            return guardada
+
+        matriz = cls.construir(configuraciones)
+        if guardada:
+            cambios = matriz.diferencias(guardada)
+            logger.info(f"INFO: El catálogo cambió; la matriz de precios se regenera ({len(cambios)} cambios).")
+            for cambio in cambios[:20]:
+                logger.info(f"INFO:   {cambio}")
+        try:
+            matriz.guardar(ruta)
+        except OSError as e:
+            logger.warning(f"WARN: No se pudo guardar la matriz de precios en {ruta}: {e}")
+        logger.info(f"INFO: Matriz de precios generada ({len(matriz)} precios).")
+        return matriz
+
+    def diferencias(self, anterior: "MatrizPrecios") -> list[str]:
+        """Cambios de precio de `anterior` a esta matriz, uno por línea."""
+        cambios = []
+        for llave in sorted(set(self.precios) | set(anterior.precios)):
+            id_config, fondant, pan_chocolate = llave
+            etiqueta = (f"config {id_config}" + (" fondant" if fondant else "")
+                        + (" pan chocolate" if pan_chocolate else ""))
+            nuevo, viejo = self.precios.get(llave), anterior.precios.get(llave)
+            if viejo is None:
+                cambios.append(f"+ {etiqueta}: pastel ${nuevo.precio_pastel:.2f}, depósito ${nuevo.monto_deposito:.2f}")
+            elif nuevo is None:
+                cambios.append(f"- {etiqueta}: pastel ${viejo.precio_pastel:.2f}, depósito ${viejo.monto_deposito:.2f}")
+            elif (nuevo.precio_pastel, nuevo.monto_deposito) != (viejo.precio_pastel, viejo.monto_deposito):
+                cambios.append(f"~ {etiqueta}: pastel ${viejo.precio_pastel:.2f} -> ${nuevo.precio_pastel:.2f}, "
+                               f"depósito ${viejo.monto_deposito:.2f} -> ${nuevo.monto_deposito:.2f}")
+        return cambios
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera o compara la matriz de precios del kiosco.")
+    parser.add_argument("--db", default=r"C:/KioscoPP/config.db")
+    parser.add_argument("--salida", default=r"C:/KioscoPP/matriz_precios.json")
+    parser.add_argument("--comparar", nargs=2, metavar=("ANTERIOR", "NUEVA"))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    if args.comparar:
+        anterior, nueva = (MatrizPrecios.cargar(ruta) for ruta in args.comparar)
+        if anterior is None or nueva is None:
+            sys.exit("No se pudieron leer las dos matrices.")
+        cambios = nueva.diferencias(anterior)
+        print("\n".join(cambios) if cambios else "Sin cambios de precio.")
+        sys.exit(1 if cambios else 0)
+
+    from src.infrastructure.persistence.sqlite_pool import SQLiteConnectionPool
+    from src.infrastructure.persistence.catalog_snapshot import CatalogSnapshot
+
+    snapshot = CatalogSnapshot.cargar(SQLiteConnectionPool(args.db))
+    matriz = MatrizPrecios.construir(snapshot.configuraciones.values())
+    matriz.guardar(args.salida)
+    print(f"{len(matriz)} precios escritos en {args.salida}")
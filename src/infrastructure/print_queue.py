@@ -0,0 +1,137 @@
+import datetime
+import itertools
+import queue
+import threading
+from collections import OrderedDict
+from src.application.repositories import Ticket
+from src.infrastructure.printing_service import PrintingService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+ESTADO_EN_COLA = "en_cola"
+ESTADO_GENERANDO = "generando"
+ESTADO_ENVIADO = "enviado"
+ESTADO_FALLIDO = "fallido"
+
+
+class TrabajoImpresion:
+    def __init__(self, id_trabajo: int, ticket: Ticket):
+        self.id = id_trabajo
+        self.ticket = ticket
+        self.estado = ESTADO_EN_COLA
+        self.intentos = 0
+        self.error: str | None = None
+        self.destino: str | None = None
+        self.creado_en = datetime.datetime.now()
+        self.actualizado_en = self.creado_en
+
+    @property
+    def id_pedido(self) -> int:
+        return self.ticket.id_pedido
+
+    def __repr__(self):
+        return f"TrabajoImpresion(id={self.id}, pedido={self.id_pedido}, estado={self.estado})"
+
+
+class ColaImpresion:
+    """Cola de tickets por imprimir atendida por un hilo propio.
+
+    La pantalla de confirmación solo encola el ticket; la generación del ticket y su envío a la impresora
+    ocurren aquí. Cada trabajo pasa por en_cola -> generando -> enviado, o termina en fallido y puede reintentarse
+    desde la pantalla de administración. Se conservan los últimos `historial_max` trabajos.
+    """
+
+    def __init__(self, printing_service: PrintingService, historial_max: int = 50):
+        self.printing_service = printing_service
+        self.historial_max = historial_max
+
+        self._trabajos: OrderedDict[int, TrabajoImpresion] = OrderedDict()
+        self._pendientes: queue.Queue = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._suscriptores = []
+        self._hilo: threading.Thread | None = None
+
+    def suscribir(self, callback):
+        """`callback(trabajo)` se llama desde el hilo de impresión en cada cambio de estado."""
+        self._suscriptores.append(callback)
+
+    def _cambiar_estado(self, trabajo: TrabajoImpresion, estado: str, error: str | None = None):
+        with self._lock:
+            trabajo.estado = estado
+            trabajo.error = error
+            trabajo.actualizado_en = datetime.datetime.now()
+        for callback in list(self._suscriptores):
+            try:
+                callback(trabajo)
+            except Exception as e:
+                logger.warning(f"WARN: Falló un suscriptor de la cola de impresión: {e}")
+
+    def encolar(self, ticket: Ticket) -> TrabajoImpresion:
+        trabajo = TrabajoImpresion(next(self._ids), ticket)
+        with self._lock:
+            self._trabajos[trabajo.id] = trabajo
+            while len(self._trabajos) > self.historial_max:
+                id_antiguo, antiguo = next(iter(self._trabajos.items()))
+                if antiguo.estado in (ESTADO_EN_COLA, ESTADO_GENERANDO):
+                    break
+                del self._trabajos[id_antiguo]
+        self._pendientes.put(trabajo.id)
+        logger.info(f"INFO: Ticket del pedido {ticket.id_pedido} encolado para impresión (trabajo {trabajo.id}).")
+        return trabajo
+
+    def reintentar(self, id_trabajo: int) -> bool:
+        with self._lock:
+            trabajo = self._trabajos.get(id_trabajo)
+            if not trabajo or trabajo.estado != ESTADO_FALLIDO:
+                return False
+        self._cambiar_estado(trabajo, ESTADO_EN_COLA)
+        self._pendientes.put(trabajo.id)
+        logger.info(f"INFO: Reintento de impresión del pedido {trabajo.id_pedido} (trabajo {trabajo.id}).")
+        return True
+
+    def trabajos(self) -> list[TrabajoImpresion]:
+        with self._lock:
+            return list(reversed(self._trabajos.values()))
+
+    def fallidos(self) -> list[TrabajoImpresion]:
+        return [t for t in self.trabajos() if t.estado == ESTADO_FALLIDO]
+
+    def profundidad(self) -> int:
+        return self._pendientes.qsize()
+
+    def _procesar(self, trabajo: TrabajoImpresion):
+        trabajo.intentos += 1
+        self._cambiar_estado(trabajo, ESTADO_GENERANDO)
+        try:
+            trabajo.destino = self.printing_service.imprimir(trabajo.ticket)
+        except Exception as e:
+            logger.error(f"ERROR: No se pudo imprimir el ticket del pedido {trabajo.id_pedido}: {e}")
+            self._cambiar_estado(trabajo, ESTADO_FALLIDO, str(e))
+            return
+        self._cambiar_estado(trabajo, ESTADO_ENVIADO)
+
+    def _ejecutar(self):
+        logger.info("INFO: Cola de impresión iniciada.")
+        while True:
+            id_trabajo = self._pendientes.get()
+            if id_trabajo is None:
+                break
+            with self._lock:
+                trabajo = self._trabajos.get(id_trabajo)
+            if trabajo and trabajo.estado == ESTADO_EN_COLA:
+                self._procesar(trabajo)
+        logger.info("INFO: Cola de impresión detenida.")
+
+    def iniciar(self):
+        if self._hilo and self._hilo.is_alive():
+            return
+        self._hilo = threading.Thread(target=self._ejecutar, name="cola-impresion", daemon=True)
+        self._hilo.start()
+
+    def detener(self, timeout: float = 5.0):
+        self._pendientes.put(None)
+        if self._hilo:
+            self._hilo.join(timeout=timeout)
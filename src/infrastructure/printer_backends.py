@@ -0,0 +1,237 @@
+import os
+import platform
+import socket
+from abc import ABC, abstractmethod
+from src.infrastructure.ticket_template import ContenidoTicket, PlantillaTicket, CAMPOS_CLIENTE
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ErrorImpresion(Exception):
+    pass
+
+
+class ImpresoraBackend(ABC):
+    nombre = ""
+
+    @abstractmethod
+    def imprimir(self, contenido: ContenidoTicket) -> str:
+        """Imprime el ticket y devuelve una descripción del destino. Lanza ErrorImpresion si falla."""
+        pass
+
+
+# --- Salidas de bytes para ESC/POS ---
+
+class SalidaBytes(ABC):
+    @abstractmethod
+    def escribir(self, datos: bytes, nombre_trabajo: str):
+        pass
+
+
+class SalidaArchivo(SalidaBytes):
+    """Escribe a un archivo o dispositivo: /dev/usb/lp0, \\\\.\\COM3, una impresora compartida o un .bin de prueba."""
+
+    def __init__(self, ruta: str, agregar: bool = False):
+        self.ruta = ruta
+        self.agregar = agregar
+
+    def escribir(self, datos: bytes, nombre_trabajo: str):
+        try:
+            with open(self.ruta, "ab" if self.agregar else "wb") as f:
+                f.write(datos)
+        except OSError as e:
+            raise ErrorImpresion(f"No se pudo escribir en {self.ruta}: {e}")
+
+    def __str__(self):
+        return self.ruta
+
+
+class SalidaSocket(SalidaBytes):
+    """Impresora de red en modo RAW (puerto 9100)."""
+
+    def __init__(self, host: str, puerto: int = 9100, timeout_seg: float = 5.0):
+        self.host = host
+        self.puerto = puerto
+        self.timeout_seg = timeout_seg
+
+    def escribir(self, datos: bytes, nombre_trabajo: str):
+        try:
+            with socket.create_connection((self.host, self.puerto), timeout=self.timeout_seg) as sock:
+                sock.sendall(datos)
+        except OSError as e:
+            raise ErrorImpresion(f"No se pudo enviar a {self.host}:{self.puerto}: {e}")
+
+    def __str__(self):
+        return f"tcp://{self.host}:{self.puerto}"
+
+
+class SalidaSpoolerWindows(SalidaBytes):
+    """Envía los bytes en modo RAW a una impresora instalada en Windows (USB con controlador del fabricante)."""
+
+    def __init__(self, nombre_impresora: str | None = None):
+        self.nombre_impresora = nombre_impresora
+
+    def escribir(self, datos: bytes, nombre_trabajo: str):
+        try:
+            import win32print
+        except ImportError:
+            raise ErrorImpresion("La librería 'pywin32' no está instalada. Ejecuta: pip install pywin32")
+        try:
+            nombre = self.nombre_impresora or win32print.GetDefaultPrinter()
+            handle = win32print.OpenPrinter(nombre)
+            try:
+                win32print.StartDocPrinter(handle, 1, (nombre_trabajo, None, "RAW"))
+                try:
+                    win32print.StartPagePrinter(handle)
+                    win32print.WritePrinter(handle, datos)
+                    win32print.EndPagePrinter(handle)
+                finally:
+                    win32print.EndDocPrinter(handle)
+            finally:
+                win32print.ClosePrinter(handle)
+        except Exception as e:
+            raise ErrorImpresion(f"No se pudo enviar al spooler de Windows: {e}")
+
+    def __str__(self):
+        return f"spooler:{self.nombre_impresora or '(predeterminada)'}"
+
+
+def crear_salida(destino: str) -> SalidaBytes:
+    """Interpreta el destino de config.json: tcp://host:puerto, spooler:Nombre, o una ruta de archivo/dispositivo."""
+    if destino.startswith("tcp://"):
+        host, _, puerto = destino[len("tcp://"):].partition(":")
+        return SalidaSocket(host, int(puerto or 9100))
+    if destino.startswith("spooler:"):
+        return SalidaSpoolerWindows(destino[len("spooler:"):] or None)
+    if destino.startswith("archivo:"):
+        return SalidaArchivo(destino[len("archivo:"):])
+    return SalidaArchivo(destino)
+
+
+# --- Backends ---
+
+class ImpresoraEscPos(ImpresoraBackend):
+    """Genera el ticket como comandos ESC/POS (texto y Code128 nativo) sin pasar por PDF ni visor."""
+
+    nombre = "escpos"
+
+    ESC = b"\x1b"
+    GS = b"\x1d"
+
+    def __init__(self, salida: SalidaBytes, columnas: int = 48, codificacion: str = "cp1252",
+                 tabla_caracteres: int = 16, alto_codigo_puntos: int = 80, ancho_modulo: int = 2):
+        self.salida = salida
+        self.columnas = columnas
+        self.codificacion = codificacion
+        self.tabla_caracteres = tabla_caracteres
+        self.alto_codigo_puntos = alto_codigo_puntos
+        self.ancho_modulo = ancho_modulo
+
+    def _texto(self, texto: str) -> bytes:
+        return texto.encode(self.codificacion, errors="replace") + b"\n"
+
+    def _alinear(self, n: int) -> bytes:
+        return self.ESC + b"a" + bytes([n])
+
+    def _negritas(self, activar: bool) -> bytes:
+        return self.ESC + b"E" + bytes([1 if activar else 0])
+
+    def _renglon(self, izquierda: str, derecha: str) -> bytes:
+        espacio = max(1, self.columnas - len(izquierda) - len(derecha))
+        return self._texto(f"{izquierda}{' ' * espacio}{derecha}")
+
+    def _code128(self, valor: str) -> bytes:
+        datos = b"{B" + valor.encode("ascii", errors="replace")
+        return (self.GS + b"h" + bytes([self.alto_codigo_puntos])
+                + self.GS + b"w" + bytes([self.ancho_modulo])
+                + self.GS + b"H" + b"\x00"
+                + self.GS + b"k" + bytes([73, len(datos)]) + datos)
+
+    def renderizar(self, contenido: ContenidoTicket) -> bytes:
+        partes = [
+            self.ESC + b"@",
+            self.ESC + b"t" + bytes([self.tabla_caracteres]),
+            self._alinear(1),
+            self._negritas(True),
+            self._texto("Pastelería Pepe"),
+            self._negritas(False),
+            self._texto("¡Pedido Confirmado!"),
+            b"\n",
+            self._code128(contenido.folio),
+            b"\n",
+            self._texto(f"Folio: {contenido.folio}"),
+            b"\n",
+            self._alinear(0),
+        ]
+        for campo in CAMPOS_CLIENTE:
+            if campo.clave:
+                partes.append(self._texto(f"{campo.etiqueta}{contenido.valores.get(campo.clave)}"))
+            else:
+                partes.append(self._texto(campo.etiqueta))
+        partes.append(b"\n")
+        for etiqueta, monto in contenido.precios:
+            partes.append(self._renglon(f"{etiqueta}:", f"${monto:.2f}"))
+        partes += [
+            self._negritas(True),
+            self._renglon("Total:", f"${contenido.total:.2f}"),
+            self._negritas(False),
+            b"\n",
+            self._alinear(1),
+            self._texto("¡Gracias por su compra!"),
+            self.GS + b"V" + bytes([66, 3]),  # Avanza y corta el papel
+        ]
+        return b"".join(partes)
+
+    def imprimir(self, contenido: ContenidoTicket) -> str:
+        self.salida.escribir(self.renderizar(contenido), f"Ticket {contenido.id_pedido}")
+        return str(self.salida)
+
+
+class ImpresoraPDF(ImpresoraBackend):
+    """Genera el PDF del ticket y lo entrega al visor predeterminado de Windows para imprimirlo."""
+
+    nombre = "pdf"
+
+    def __init__(self, plantilla: PlantillaTicket | None = None, carpeta: str = r"c:/KioscoPP"):
+        self.plantilla = plantilla or PlantillaTicket()
+        self.carpeta = carpeta
+
+    def generar_pdf(self, contenido: ContenidoTicket) -> str:
+        file_path = f"{self.carpeta}/ticket_{contenido.id_pedido}.pdf"
+        self.plantilla.generar(file_path, contenido)
+        return os.path.abspath(file_path)
+
+    def imprimir(self, contenido: ContenidoTicket) -> str:
+        file_path = self.generar_pdf(contenido)
+        self.enviar_a_impresora(file_path)
+        return file_path
+
+    def enviar_a_impresora(self, file_path: str):
+        """Entrega el PDF al spooler de Windows. Lanza ErrorImpresion si no se pudo."""
+        if not os.path.exists(file_path):
+            raise ErrorImpresion(f"El archivo a imprimir no existe: {file_path}")
+
+        if platform.system() != "Windows":
+            raise ErrorImpresion("La impresión directa de PDF solo está configurada para Windows.")
+
+        try:
+            import win32api
+            import win32print
+        except ImportError:
+            raise ErrorImpresion("La librería 'pywin32' no está instalada. Ejecuta: pip install pywin32")
+
+        try:
+            printer_name = win32print.GetDefaultPrinter()
+            logger.info(f"INFO: Enviando a la impresora por defecto: '{printer_name}'")
+
+            win32api.ShellExecute(
+                    0,
+                    "print",
+                    f'"{file_path}"',  # Es importante poner la ruta entre comillas
+                    f'/d:"{printer_name}"',
+                    ".",
+                    0
+                )
+        except Exception as e:
+            raise ErrorImpresion(f"No se pudo imprimir con win32api. {e}")
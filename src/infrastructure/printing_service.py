@@ -1,148 +1,50 @@
-import os
-import platform
-import sqlite3
 from src.application.repositories import Ticket
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch, mm
-import barcode
-from barcode.writer import ImageWriter
+from src.application.pricing import PricingEngine
+from src.infrastructure.identidad_kiosco import IdentidadKiosco
+from src.infrastructure.ticket_template import ContenidoTicket
+from src.infrastructure.printer_backends import ImpresoraBackend, ImpresoraPDF, ErrorImpresion
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 class PrintingService:
+    """Arma el contenido del ticket y lo manda al backend de impresión configurado.
 
-    def _obtener_n_sucursal_pk(self, db_path: str = r"C:/KioscoPP/config.db") -> str:
-        try:
-            with sqlite3.connect(db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT cIdentificador FROM Sucursales LIMIT 1")
-                row = cursor.fetchone()
-                return str(row[0]) if row and row[0] is not None else ""
-        except Exception as e:
-            logger.warning(f"WARN: No se pudo leer nSucursalPK desde Sucursales: {e}. Usando 1 por defecto.")
-            return 1
-
-    def generar_ticket_pdf(self, ticket: Ticket) -> str:
-        file_path = f"c:/KioscoPP/ticket_{ticket.id_pedido}.pdf"
+    Si el backend principal falla y hay uno de respaldo (normalmente el PDF), se intenta con éste.
+    """
 
-        ancho_mm = 80
-        # Reducimos la altura para un ticket más compacto
-        alto_mm = 297
+    def __init__(self, identidad: IdentidadKiosco, backend: ImpresoraBackend | None = None,
+                 respaldo: ImpresoraBackend | None = None):
+        self.identidad = identidad
+        self.backend = backend or ImpresoraPDF()
+        self.respaldo = respaldo
 
-        c = canvas.Canvas(file_path, pagesize=(ancho_mm * mm, alto_mm * mm))
-        width, height = (ancho_mm * mm, alto_mm * mm)
-
-        # --- 1. Generar la imagen del código de barras ---
-        CODE128 = barcode.get_barcode_class('code128')
-        writer = ImageWriter()
+    def preparar_contenido(self, ticket: Ticket) -> ContenidoTicket:
         # Usamos zfill para asegurar una longitud mínima, es una buena práctica
         folio_str = str(ticket.id_pedido).zfill(6)
-        n_sucursal_pk = self._obtener_n_sucursal_pk()
+        n_sucursal_pk = self.identidad.identificador
         c_identificador = f"KIO-{n_sucursal_pk}{folio_str}"
-        codigo_barras = CODE128(c_identificador, writer=writer)
-        filename = f"barcode_{ticket.id_pedido}"
-        barcode_path = codigo_barras.save(filename)  # generará PNG con ImageWriter
-
-        # --- 2. Dibujar el Ticket en el PDF ---
-        y = height - (10 * mm)  # Posición vertical inicial
 
-        # Encabezado
-        c.drawCentredString(width / 2, y, "Pastelería Pepe")
-        y -= (5 * mm)
-        c.drawCentredString(width / 2, y, "¡Pedido Confirmado!")
-        y -= (15 * mm)  # Espacio para el código de barras
+        # Mismo desglose que se mostró en pantalla
+        cotizacion = PricingEngine.cotizar_ticket(ticket)
 
-        # Código de Barras (ahora va arriba)
-        barcode_width = 45 * mm
-        barcode_height = 15 * mm
-        c.drawImage(
-            barcode_path,
-            (width - barcode_width) / 2, y,
-            width=barcode_width, height=barcode_height
+        return ContenidoTicket(
+            id_pedido=ticket.id_pedido,
+            folio=c_identificador,
+            valores=ticket._asdict(),
+            precios=cotizacion.lineas(),
+            total=cotizacion.total,
         )
-        y -= (15 * mm)
-        c.drawCentredString(width / 2, y, f"Folio: {c_identificador}")
-        y -= (10 * mm)
-
-        # Detalles del Pedido
-        margen_izquierdo = 5 * mm
-        c.drawString(margen_izquierdo, y, f"Cliente: {ticket.nombre_cliente}")
-        y -= (5 * mm)
-        c.drawString(margen_izquierdo, y, f"Fecha de Entrega: {ticket.fecha_entrega}")
-        y -= (5 * mm)
-        c.drawString(margen_izquierdo, y, f"Hora de Entrega: {ticket.hora_entrega}")
-        y -= (8 * mm)
-
-        c.drawString(margen_izquierdo, y, "--- Detalles del Pastel ---")
-        y -= (5 * mm)
-        c.drawString(margen_izquierdo, y, f"Pastel: {ticket.nombre_categoria}")
-        y -= (5 * mm)
-        c.drawString(margen_izquierdo, y, f"Pan: {ticket.tipo_pan}")
-        y -= (5 * mm)
-        c.drawString(margen_izquierdo, y, f"Forma: {ticket.tipo_forma}")
-        y -= (5 * mm)
-        c.drawString(margen_izquierdo, y, f"Relleno: {ticket.tipo_relleno}")
-        y -= (5 * mm)
-        c.drawString(margen_izquierdo, y, f"Cobertura: {ticket.tipo_cobertura}")
-        y -= (5 * mm)
-        c.drawString(margen_izquierdo, y, f"Tamaño (personas): {ticket.tamano_pastel}")
-        y -= (8 * mm)
-
-        # Precios
-        costo_pastel = (ticket.precio_pastel or 0.0)
-        costo_extras = (ticket.extra_costo or 0.0)
-        if ticket.extra_seleccionado == "Flor Artificial" and ticket.extra_flor_cantidad:
-            costo_extras *= ticket.extra_flor_cantidad
-        deposito = (ticket.monto_deposito or 0.0)
-        # 'total' en el ticket normalmente es pastel + extras (sin depósito). Si viene None, recalculamos del desglose.
-        subtotal = (ticket.total if ticket.total is not None else (costo_pastel + costo_extras))
-        envio = 50.0 if subtotal < 500 else 0.0
 
-        c.drawString(margen_izquierdo, y, f"Costo Pastel: ${costo_pastel:.2f}")
-        y -= (5 * mm)
-        c.drawString(margen_izquierdo, y, f"Costo Extras: ${costo_extras:.2f}")
-        y -= (5 * mm)
-        c.drawString(margen_izquierdo, y, f"Deposito: ${deposito:.2f}")
-        y -= (5 * mm)
-        if envio > 0:
-            c.drawString(margen_izquierdo, y, f"Costo Envío: ${envio:.2f}")
-            y -= (5 * mm)
-        total_a_mostrar = subtotal + envio
-        c.drawString(margen_izquierdo, y, f"Total: ${total_a_mostrar:.2f}")
-        y -= (8 * mm)
-
-        c.drawCentredString(width / 2, y, "¡Gracias por su compra!")
-
-        c.save()
-        os.remove(barcode_path)
-
-        return os.path.abspath(file_path)
-
-    def enviar_a_impresora(self, file_path: str):
-        if not os.path.exists(file_path):
-            logger.error(f"ERROR: El archivo a imprimir no existe: {file_path}")
-            return
-
-        if platform.system() == "Windows":
-            try:
-                import win32api
-                import win32print
-                printer_name = win32print.GetDefaultPrinter()
-                logger.info(f"INFO: Enviando a la impresora por defecto: '{printer_name}'")
-
-                win32api.ShellExecute(
-                        0,
-                        "print",
-                        f'"{file_path}"',  # Es importante poner la ruta entre comillas
-                        f'/d:"{printer_name}"',
-                        ".",
-                        0
-                    )
-            except ImportError:
-                logger.error("ERROR: La librería 'pywin32' no está instalada. Ejecuta: pip install pywin32")
-            except Exception as e:
-                logger.error(f"ERROR: No se pudo imprimir con win32api. {e}")
-        else:
-            logger.error("ERROR: La impresión directa de PDF solo está configurada para Windows.")
+    def imprimir(self, ticket: Ticket) -> str:
+        """Imprime el ticket y devuelve el destino usado. Lanza ErrorImpresion si fallan todos los backends."""
+        contenido = self.preparar_contenido(ticket)
+        try:
+            return self.backend.imprimir(contenido)
+        except ErrorImpresion as e:
+            if not self.respaldo:
+                raise
+            logger.warning(f"WARN: Falló la impresión {self.backend.nombre} del pedido {ticket.id_pedido}: {e}. "
+                           f"Se usa el respaldo {self.respaldo.nombre}.")
+            return self.respaldo.imprimir(contenido)
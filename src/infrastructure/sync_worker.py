@@ -0,0 +1,116 @@
+import random
+import threading
+import time
+from src.infrastructure.persistence.api_repository import FinalizarPedidoRepositoryAPI
+from src.infrastructure.persistence.outbox_repository import OutboxRepositorySQLite
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxSyncWorker:
+    """Hilo en segundo plano que vacía la bandeja de salida hacia el web service.
+
+    Con varios mensajes vencidos se intenta primero un envío en lote comprimido; si el servidor lo rechaza,
+    se cae al envío individual. Cada mensaje fallido se reintenta con backoff exponencial con jitter; los
+    rechazos definitivos del servidor (4xx no reintentables) quedan marcados como rechazados para revisión.
+    """
+
+    def __init__(self, outbox: OutboxRepositorySQLite, api_repo: FinalizarPedidoRepositoryAPI,
+                 intervalo_seg: float = 30.0, backoff_base_seg: float = 5.0, backoff_max_seg: float = 900.0,
+                 lote: int = 20, usar_lotes: bool = True):
+        self.outbox = outbox
+        self.api_repo = api_repo
+        self.intervalo_seg = intervalo_seg
+        self.backoff_base_seg = backoff_base_seg
+        self.backoff_max_seg = backoff_max_seg
+        self.lote = lote
+        self.usar_lotes = usar_lotes
+
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self._hilo: threading.Thread | None = None
+
+        self.enviados = 0
+        self.fallidos = 0
+        self.ultimo_error: str | None = None
+
+    def calcular_backoff(self, intentos: int) -> float:
+        espera = min(self.backoff_max_seg, self.backoff_base_seg * (2 ** intentos))
+        return espera * random.uniform(0.8, 1.2)
+
+    def profundidad(self) -> int:
+        return self.outbox.profundidad()
+
+    def despertar(self):
+        self._despertar.set()
+
+    def procesar_pendientes(self) -> int:
+        """Envía los mensajes vencidos. Devuelve cuántos se sincronizaron en esta pasada."""
+        enviados = 0
+        while not self._detener.is_set():
+            mensajes = self.outbox.obtener_vencidos(self.lote)
+            if not mensajes:
+                break
+            resultados = None
+            if self.usar_lotes and len(mensajes) > 1 and self.api_repo.lote_disponible():
+                resultados = self.api_repo.enviar_lote([(m.payload, m.clave_idempotencia) for m in mensajes])
+                if resultados is None:
+                    logger.info(f"INFO: Lote rechazado; se envían {len(mensajes)} pedidos uno por uno.")
+
+            for i, mensaje in enumerate(mensajes):
+                if self._detener.is_set():
+                    break
+                if resultados is not None:
+                    resultado = resultados[i]
+                else:
+                    resultado = self.api_repo.enviar_payload(mensaje.payload, mensaje.clave_idempotencia)
+                if resultado.exito:
+                    self.outbox.marcar_enviado(mensaje.id, resultado.id_remoto)
+                    self.enviados += 1
+                    enviados += 1
+                    continue
+
+                self.fallidos += 1
+                self.ultimo_error = resultado.error
+                if resultado.reintentable:
+                    espera = self.calcular_backoff(mensaje.intentos)
+                    self.outbox.marcar_fallo(mensaje.id, resultado.error, time.time() + espera)
+                    logger.warning(f"WARN: Pedido {mensaje.id_pedido} no sincronizado (intento {mensaje.intentos + 1}). "
+                                   f"Reintento en {espera:.0f}s.")
+                else:
+                    self.outbox.marcar_fallo(mensaje.id, resultado.error, None)
+                    logger.error(f"ERROR: El web service rechazó definitivamente el pedido {mensaje.id_pedido}.")
+        return enviados
+
+    def _siguiente_espera(self) -> float:
+        vencimiento = self.outbox.proximo_vencimiento()
+        if vencimiento is None:
+            return self.intervalo_seg
+        return max(0.5, min(self.intervalo_seg, vencimiento - time.time()))
+
+    def _ejecutar(self):
+        logger.info("INFO: Worker de sincronización de pedidos iniciado.")
+        while not self._detener.is_set():
+            try:
+                enviados = self.procesar_pendientes()
+                if enviados:
+                    logger.info(f"INFO: {enviados} pedido(s) sincronizados. Pendientes en cola: {self.profundidad()}")
+            except Exception as e:
+                logger.error(f"ERROR: Falló la pasada del worker de sincronización: {e}")
+            self._despertar.wait(self._siguiente_espera())
+            self._despertar.clear()
+        logger.info("INFO: Worker de sincronización de pedidos detenido.")
+
+    def iniciar(self):
+        if self._hilo and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._ejecutar, name="outbox-sync", daemon=True)
+        self._hilo.start()
+
+    def detener(self, timeout: float = 5.0):
+        self._detener.set()
+        self._despertar.set()
+        if self._hilo:
+            self._hilo.join(timeout=timeout)
@@ -0,0 +1,139 @@
+from typing import NamedTuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from reportlab.pdfgen.canvas import Canvas
+
+# reportlab se importa dentro de PlantillaTicket: el backend ESC/POS y el arranque no lo necesitan.
+mm = 72 / 25.4  # puntos por milímetro, igual que reportlab.lib.units.mm
+
+
+class ContenidoTicket(NamedTuple):
+    """Datos ya calculados de un ticket, comunes a todos los backends de impresión."""
+    id_pedido: int
+    folio: str
+    valores: dict
+    precios: list[tuple[str, float]]
+    total: float
+
+
+class CampoTicket(NamedTuple):
+    clave: str
+    etiqueta: str
+    avance_mm: float
+
+
+# Bloque fijo del ticket: (clave, etiqueta, espacio hasta la siguiente línea). Las claves vacías son
+# líneas sin valor; el resto recibe el valor del pedido a la derecha de la etiqueta.
+CAMPOS_CLIENTE = (
+    CampoTicket("nombre_cliente", "Cliente: ", 5),
+    CampoTicket("fecha_entrega", "Fecha de Entrega: ", 5),
+    CampoTicket("hora_entrega", "Hora de Entrega: ", 8),
+    CampoTicket("", "--- Detalles del Pastel ---", 5),
+    CampoTicket("nombre_categoria", "Pastel: ", 5),
+    CampoTicket("tipo_pan", "Pan: ", 5),
+    CampoTicket("tipo_forma", "Forma: ", 5),
+    CampoTicket("tipo_relleno", "Relleno: ", 5),
+    CampoTicket("tipo_cobertura", "Cobertura: ", 5),
+    CampoTicket("tamano_pastel", "Tamaño (personas): ", 8),
+)
+
+AVANCE_PRECIO_MM = 5
+AVANCE_TOTAL_MM = 8
+
+
+class PlantillaTicket:
+    """Geometría del ticket térmico calculada una sola vez.
+
+    Las posiciones, anchos de etiqueta y el alto de la parte fija se precalculan al crear la plantilla. Por
+    ticket, la parte fija (encabezado y etiquetas) se dibuja como un Form XObject y solo se escriben encima
+    los valores del pedido. El alto de la página se recorta al contenido en lugar de usar una hoja A4.
+    """
+
+    NOMBRE_FORMA = "ticket_fijo"
+
+    def __init__(self, ancho_mm: float = 80, margen_superior_mm: float = 10, margen_inferior_mm: float = 8,
+                 margen_izquierdo_mm: float = 5, fuente: str = "Helvetica", tamano_fuente: float = 12,
+                 ancho_codigo_mm: float = 45, alto_codigo_mm: float = 15):
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+
+        self.ancho = ancho_mm * mm
+        self.margen_inferior = margen_inferior_mm * mm
+        self.margen_izquierdo = margen_izquierdo_mm * mm
+        self.fuente = fuente
+        self.tamano_fuente = tamano_fuente
+        self.ancho_codigo = ancho_codigo_mm * mm
+        self.alto_codigo = alto_codigo_mm * mm
+
+        # Distancias desde el borde superior de la página (la y de reportlab se calcula al dibujar).
+        y = margen_superior_mm * mm
+        self.y_titulo = y
+        y += 5 * mm
+        self.y_subtitulo = y
+        y += 15 * mm
+        self.y_codigo = y
+        y += 15 * mm
+        self.y_folio = y
+        y += 10 * mm
+
+        self.campos = []
+        for campo in CAMPOS_CLIENTE:
+            x_valor = self.margen_izquierdo + stringWidth(campo.etiqueta, fuente, tamano_fuente)
+            self.campos.append((campo, y, x_valor))
+            y += campo.avance_mm * mm
+        self.alto_fijo = y
+
+    def alto_pagina(self, num_precios: int) -> float:
+        return self.alto_fijo + num_precios * AVANCE_PRECIO_MM * mm + AVANCE_TOTAL_MM * mm + self.margen_inferior
+
+    def _definir_forma(self, c: "Canvas"):
+        # La forma usa coordenadas relativas al borde superior (y negativa hacia abajo).
+        c.beginForm(self.NOMBRE_FORMA, lowerx=0, lowery=-self.alto_fijo, upperx=self.ancho, uppery=0)
+        c.setFont(self.fuente, self.tamano_fuente)
+        c.drawCentredString(self.ancho / 2, -self.y_titulo, "Pastelería Pepe")
+        c.drawCentredString(self.ancho / 2, -self.y_subtitulo, "¡Pedido Confirmado!")
+        for campo, y, _ in self.campos:
+            c.drawString(self.margen_izquierdo, -y, campo.etiqueta)
+        c.endForm()
+
+    def _dibujar_codigo_barras(self, c: "Canvas", valor: str, x: float, y: float):
+        """Dibuja el Code128 como vectores directamente en el PDF, sin imagen intermedia."""
+        from reportlab.graphics.barcode.code128 import Code128
+
+        codigo = Code128(valor, barHeight=self.alto_codigo, barWidth=0.3 * mm, quiet=False, humanReadable=False)
+        c.saveState()
+        c.translate(x, y)
+        c.scale(self.ancho_codigo / codigo.width, 1)
+        codigo.drawOn(c, 0, 0)
+        c.restoreState()
+
+    def generar(self, file_path: str, contenido: ContenidoTicket):
+        """Escribe el PDF del ticket."""
+        from reportlab.pdfgen import canvas
+
+        folio, valores, precios = contenido.folio, contenido.valores, contenido.precios
+        alto = self.alto_pagina(len(precios))
+        c = canvas.Canvas(file_path, pagesize=(self.ancho, alto))
+        c.setFont(self.fuente, self.tamano_fuente)
+
+        self._definir_forma(c)
+        c.saveState()
+        c.translate(0, alto)
+        c.doForm(self.NOMBRE_FORMA)
+        c.restoreState()
+
+        self._dibujar_codigo_barras(c, folio, (self.ancho - self.ancho_codigo) / 2, alto - self.y_codigo)
+        c.drawCentredString(self.ancho / 2, alto - self.y_folio, f"Folio: {folio}")
+
+        for campo, y, x_valor in self.campos:
+            if campo.clave:
+                c.drawString(x_valor, alto - y, str(valores.get(campo.clave)))
+
+        y = alto - self.alto_fijo
+        for etiqueta, monto in precios:
+            c.drawString(self.margen_izquierdo, y, f"{etiqueta}: ${monto:.2f}")
+            y -= AVANCE_PRECIO_MM * mm
+        c.drawString(self.margen_izquierdo, y, f"Total: ${contenido.total:.2f}")
+        y -= AVANCE_TOTAL_MM * mm
+        c.drawCentredString(self.ancho / 2, y, "¡Gracias por su compra!")
+
+        c.save()
@@ -0,0 +1,277 @@
+"""Trazas de latencia por interacción: rutas, vistas, page.update(), casos de uso y consultas a repositorios.
+
+Cada span lleva el id de correlación del pedido en curso (cambia con `iniciar_nuevo_pedido`). Los spans
+quedan en un buffer circular en memoria y se escriben, por lotes y en un hilo aparte, a
+`C:/KioscoPP/trazas/trazas-AAAA-MM-DD.jsonl`. Con el trazador inactivo cada punto instrumentado cuesta una
+sola comprobación de atributo, así que puede dejarse instalado en campo.
+
+Resumen de percentiles por ruta y por consulta:
+    python -m src.infrastructure.tracing --dir C:/KioscoPP/trazas
+    python -m src.infrastructure.tracing --tipo repo C:/KioscoPP/trazas/trazas-2026-10-18.jsonl
+"""
+import argparse
+import datetime
+import functools
+import glob
+import itertools
+import json
+import math
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from collections import deque, defaultdict
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _SpanNulo:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_SPAN_NULO = _SpanNulo()
+
+
+class Span:
+    __slots__ = ("trazador", "tipo", "nombre", "atributos", "id", "padre", "inicio")
+
+    def __init__(self, trazador: "Trazador", tipo: str, nombre: str, atributos: dict):
+        self.trazador = trazador
+        self.tipo = tipo
+        self.nombre = nombre
+        self.atributos = atributos
+
+    def __enter__(self):
+        pila = self.trazador._pila()
+        self.id = next(self.trazador._ids)
+        self.padre = pila[-1] if pila else None
+        pila.append(self.id)
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo_exc, exc, tb):
+        duracion_ms = (time.perf_counter() - self.inicio) * 1000
+        self.trazador._pila().pop()
+        registro = {
+            "ts": round(time.time(), 3),
+            "tipo": self.tipo,
+            "nombre": self.nombre,
+            "ms": round(duracion_ms, 3),
+            "corr": self.trazador.correlacion,
+            "id": self.id,
+            "padre": self.padre,
+            "hilo": threading.current_thread().name,
+        }
+        if tipo_exc is not None:
+            registro["error"] = tipo_exc.__name__
+        if self.atributos:
+            registro.update(self.atributos)
+        self.trazador._registrar(registro)
+        return False
+
+
+class Trazador:
+    def __init__(self, directorio: str | None = r"C:/KioscoPP/trazas", activo: bool = True,
+                 capacidad_buffer: int = 5000, intervalo_flush_seg: float = 1.0, dias_retencion: int = 7):
+        self.directorio = directorio
+        self.activo = activo
+        self.intervalo_flush_seg = intervalo_flush_seg
+        self.dias_retencion = dias_retencion
+        self.buffer: deque[dict] = deque(maxlen=capacidad_buffer)
+        self.correlacion = uuid.uuid4().hex[:12]
+
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        self._cola: queue.SimpleQueue = queue.SimpleQueue()
+        self._detener = threading.Event()
+        self._hilo: threading.Thread | None = None
+        self._observadores = []
+        self.escritos = 0
+        self.errores = 0
+
+    def _pila(self) -> list:
+        pila = getattr(self._local, "pila", None)
+        if pila is None:
+            pila = self._local.pila = []
+        return pila
+
+    def nueva_correlacion(self) -> str:
+        self.correlacion = uuid.uuid4().hex[:12]
+        return self.correlacion
+
+    def span(self, tipo: str, nombre: str, **atributos):
+        if not self.activo:
+            return _SPAN_NULO
+        return Span(self, tipo, nombre, atributos)
+
+    def suscribir(self, callback):
+        """`callback(span)` se llama con cada span terminado, en el hilo que lo terminó."""
+        self._observadores.append(callback)
+
+    def _registrar(self, registro: dict):
+        self.buffer.append(registro)
+        if self._hilo is not None:
+            self._cola.put(registro)
+        for callback in self._observadores:
+            try:
+                callback(registro)
+            except Exception as e:
+                logger.warning(f"WARN: Falló un observador de trazas: {e}")
+
+    def recientes(self, n: int = 100) -> list[dict]:
+        return list(self.buffer)[-n:]
+
+    # --- Instrumentación -------------------------------------------------------------------------------
+
+    def envolver(self, funcion, tipo: str, nombre: str, nueva_correlacion: bool = False):
+        @functools.wraps(funcion)
+        def _trazada(*args, **kwargs):
+            if nueva_correlacion:
+                self.nueva_correlacion()
+            if not self.activo:
+                return funcion(*args, **kwargs)
+            with Span(self, tipo, nombre, {}):
+                return funcion(*args, **kwargs)
+        _trazada.__trazada__ = True
+        return _trazada
+
+    def instrumentar(self, objeto, tipo: str, metodos=None, prefijo: str | None = None,
+                     nuevas_correlaciones=()):
+        """Reemplaza en `objeto` (instancia o módulo) sus métodos públicos, o los de `metodos`, por versiones
+        trazadas. El nombre del span es `Clase.método` (o solo el nombre de la función en un módulo)."""
+        es_modulo = isinstance(objeto, type(sys))
+        etiqueta = prefijo if prefijo is not None else ("" if es_modulo else type(objeto).__name__ + ".")
+        if metodos is None:
+            metodos = [m for m in dir(objeto) if not m.startswith("_")]
+        for nombre in metodos:
+            funcion = getattr(objeto, nombre, None)
+            if not callable(funcion) or isinstance(funcion, type) or getattr(funcion, "__trazada__", False):
+                continue
+            if es_modulo and getattr(funcion, "__module__", None) != objeto.__name__:
+                continue
+            setattr(objeto, nombre, self.envolver(funcion, tipo, etiqueta + nombre,
+                                                  nueva_correlacion=nombre in nuevas_correlaciones))
+
+    # --- Escritura a disco -----------------------------------------------------------------------------
+
+    def iniciar(self):
+        if not self.directorio or (self._hilo and self._hilo.is_alive()):
+            return
+        os.makedirs(self.directorio, exist_ok=True)
+        self._purgar()
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._ejecutar, name="escritor-trazas", daemon=True)
+        self._hilo.start()
+
+    def detener(self, timeout: float = 5.0):
+        if not self._hilo:
+            return
+        self._detener.set()
+        self._hilo.join(timeout)
+        self._hilo = None
+
+    def _purgar(self):
+        limite = (datetime.date.today() - datetime.timedelta(days=self.dias_retencion)).isoformat()
+        for ruta in glob.glob(os.path.join(self.directorio, "trazas-*.jsonl")):
+            if os.path.basename(ruta)[len("trazas-"):][:10] < limite:
+                try:
+                    os.remove(ruta)
+                except OSError:
+                    pass
+
+    def _ejecutar(self):
+        while True:
+            terminar = self._detener.wait(self.intervalo_flush_seg)
+            lote = []
+            try:
+                while True:
+                    lote.append(self._cola.get_nowait())
+            except queue.Empty:
+                pass
+            if lote:
+                self._escribir(lote)
+            if terminar:
+                return
+
+    def _escribir(self, lote: list[dict]):
+        por_dia = defaultdict(list)
+        for registro in lote:
+            por_dia[datetime.date.fromtimestamp(registro["ts"]).isoformat()].append(registro)
+        for dia, registros in por_dia.items():
+            ruta = os.path.join(self.directorio, f"trazas-{dia}.jsonl")
+            try:
+                with open(ruta, "a", encoding="utf-8") as f:
+                    f.writelines(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in registros)
+                self.escritos += len(registros)
+            except OSError as e:
+                self.errores += 1
+                logger.warning(f"WARN: No se pudieron escribir {len(registros)} trazas en {ruta}: {e}")
+
+    def estadisticas(self) -> dict:
+        return {"activo": self.activo, "en_buffer": len(self.buffer), "escritos": self.escritos,
+                "errores": self.errores, "en_cola": self._cola.qsize()}
+
+
+# --- Resumen -------------------------------------------------------------------------------------------
+
+def percentil(valores_ordenados: list[float], p: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not valores_ordenados:
+        return 0.0
+    rango = math.ceil(p / 100 * len(valores_ordenados))
+    return valores_ordenados[min(max(rango, 1), len(valores_ordenados)) - 1]
+
+
+def leer_trazas(rutas) -> list[dict]:
+    registros = []
+    for ruta in rutas:
+        with open(ruta, "r", encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    registros.append(json.loads(linea))
+                except ValueError:
+                    continue
+    return registros
+
+
+def resumir(registros, tipos=None) -> list[dict]:
+    """p50/p95/p99 por (tipo, nombre), de mayor a menor p95."""
+    duraciones = defaultdict(list)
+    for r in registros:
+        if tipos and r.get("tipo") not in tipos:
+            continue
+        duraciones[(r.get("tipo"), r.get("nombre"))].append(r.get("ms", 0.0))
+    filas = []
+    for (tipo, nombre), valores in duraciones.items():
+        valores.sort()
+        filas.append({"tipo": tipo, "nombre": nombre, "n": len(valores), "p50": percentil(valores, 50),
+                      "p95": percentil(valores, 95), "p99": percentil(valores, 99), "max": valores[-1]})
+    return sorted(filas, key=lambda f: f["p95"], reverse=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Percentiles de latencia de las trazas del kiosco.")
+    parser.add_argument("archivos", nargs="*", help="archivos .jsonl; por omisión todos los de --dir")
+    parser.add_argument("--dir", default=r"C:/KioscoPP/trazas")
+    parser.add_argument("--tipo", action="append", choices=["ruta", "vista", "update", "caso_uso", "repo", "api"],
+                        help="solo estos tipos de span (se puede repetir)")
+    parser.add_argument("--top", type=int, default=40)
+    args = parser.parse_args()
+
+    rutas = args.archivos or sorted(glob.glob(os.path.join(args.dir, "trazas-*.jsonl")))
+    if not rutas:
+        sys.exit(f"No hay trazas en {args.dir}")
+    filas = resumir(leer_trazas(rutas), args.tipo)
+    print(f"{'tipo':<9} {'nombre':<60} {'n':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for fila in filas[:args.top]:
+        print(f"{fila['tipo']:<9} {fila['nombre'][:60]:<60} {fila['n']:>7} {fila['p50']:>9.2f} "
+              f"{fila['p95']:>9.2f} {fila['p99']:>9.2f} {fila['max']:>9.2f}")
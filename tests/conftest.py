@@ -0,0 +1,38 @@
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Columnas de `pedidos` que escribe FinalizarPedidoRepositorySQLite y que el config.db de muestra del
+# repositorio todavía no trae (el de las sucursales sí).
+COLUMNAS_PEDIDO_FALTANTES = (
+    "hora_entrega", "tipo_decorado", "decorado_liso_detalle", "decorado_tematica_detalle", "decorado_imagen_id",
+    "extra_seleccionado", "extra_flor_cantidad", "extra_costo", "precio_pastel", "monto_deposito", "total",
+    "nombre_categoria", "tamano_peso", "tamano_descripcion", "imagen_pastel", "edad_pastel",
+)
+
+
+@pytest.fixture
+def config_db(tmp_path) -> str:
+    """Copia de config.db del repositorio, para que cada prueba escriba sobre la suya."""
+    ruta = tmp_path / "config.db"
+    shutil.copy(os.path.join(RAIZ, "config.db"), ruta)
+    return str(ruta)
+
+
+@pytest.fixture
+def id_categoria(config_db) -> int:
+    """Completa el esquema de `pedidos` en la copia de config.db y devuelve una categoría existente."""
+    conn = sqlite3.connect(config_db)
+    try:
+        existentes = {fila[1] for fila in conn.execute("PRAGMA table_info(pedidos)")}
+        for columna in COLUMNAS_PEDIDO_FALTANTES:
+            if columna not in existentes:
+                conn.execute(f"ALTER TABLE pedidos ADD COLUMN {columna}")
+        conn.commit()
+        return conn.execute("SELECT MIN(id_categoria) FROM categorias").fetchone()[0]
+    finally:
+        conn.close()
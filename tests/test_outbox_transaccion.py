@@ -0,0 +1,105 @@
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from src.domain.pedido import Pedido
+from src.infrastructure.persistence.api_repository import FinalizarPedidoRepositoryAPI
+from src.infrastructure.persistence.composite_repository import FinalizarPedidoRepositoryComposite
+from src.infrastructure.persistence.outbox_repository import OutboxRepositorySQLite
+from src.infrastructure.persistence.sqlite_pool import SQLiteConnectionPool
+from src.infrastructure.persistence.sqlite_repository import FinalizarPedidoRepositorySQLite
+
+
+def _contar(ruta: str, tabla: str) -> int:
+    conn = sqlite3.connect(ruta)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def kiosco(config_db, id_categoria, tmp_path):
+    outbox_path = str(tmp_path / "outbox.db")
+    pool = SQLiteConnectionPool(config_db, adjuntos={"outbox": outbox_path})
+    sqlite_repo = FinalizarPedidoRepositorySQLite(pool)
+    outbox = OutboxRepositorySQLite(pool, esquema="outbox")
+    api_repo = FinalizarPedidoRepositoryAPI("http://127.0.0.1:9/pedidos", SimpleNamespace(id_sucursal=3))
+    compuesto = FinalizarPedidoRepositoryComposite(sqlite_repo, api_repo, outbox)
+    yield SimpleNamespace(config_db=config_db, outbox_path=outbox_path, id_categoria=id_categoria,
+                          sqlite_repo=sqlite_repo, outbox=outbox, compuesto=compuesto)
+    pool.cerrar()
+
+
+def _pedido(id_categoria: int) -> Pedido:
+    pedido = Pedido()
+    pedido.reiniciar()
+    pedido.id_categoria = id_categoria
+    pedido.nombre_cliente = "Cliente de prueba"
+    pedido.total = 450.0
+    return pedido
+
+
+def test_pedido_y_mensaje_se_confirman_juntos(kiosco):
+    pedidos_antes = _contar(kiosco.config_db, "pedidos")
+
+    id_pedido = kiosco.compuesto.guardar(_pedido(kiosco.id_categoria))
+
+    assert id_pedido > 0
+    assert _contar(kiosco.config_db, "pedidos") == pedidos_antes + 1
+    mensajes = kiosco.outbox.obtener_vencidos()
+    assert [m.id_pedido for m in mensajes] == [id_pedido]
+    assert mensajes[0].payload["nSucursalPK"] == 3
+
+
+def test_falla_al_encolar_deshace_el_pedido(kiosco, monkeypatch):
+    pedidos_antes = _contar(kiosco.config_db, "pedidos")
+
+    def _falla(*args, **kwargs):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(kiosco.outbox, "encolar", _falla)
+
+    assert kiosco.compuesto.guardar(_pedido(kiosco.id_categoria)) == 0
+    assert _contar(kiosco.config_db, "pedidos") == pedidos_antes
+    assert _contar(kiosco.outbox_path, "pedidos_por_sincronizar") == 0
+    # Sin la falla, el mismo pedido sí se guarda: lo de arriba fue un rollback y no un INSERT fallido.
+    monkeypatch.undo()
+    assert kiosco.compuesto.guardar(_pedido(kiosco.id_categoria)) > 0
+
+
+def test_pedido_ilegible_no_queda_sin_mensaje(kiosco, monkeypatch):
+    pedidos_antes = _contar(kiosco.config_db, "pedidos")
+    monkeypatch.setattr(kiosco.sqlite_repo, "obtener_por_id", lambda id_pedido: None)
+
+    assert kiosco.compuesto.guardar(_pedido(kiosco.id_categoria)) == 0
+    assert _contar(kiosco.config_db, "pedidos") == pedidos_antes
+    assert _contar(kiosco.outbox_path, "pedidos_por_sincronizar") == 0
+    monkeypatch.undo()
+    assert kiosco.compuesto.guardar(_pedido(kiosco.id_categoria)) > 0
+
+
+def test_adjunto_inaccesible_no_tumba_config_db(config_db, tmp_path):
+    # Un directorio en lugar del archivo: el ATTACH falla, pero config.db se sigue leyendo.
+    ruta_invalida = tmp_path / "outbox.db"
+    ruta_invalida.mkdir()
+    pool = SQLiteConnectionPool(config_db, adjuntos={"outbox": str(ruta_invalida)})
+    try:
+        assert pool.verificar()
+        with pool.obtener_conexion() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM categorias").fetchone()[0] > 0
+        # La conexión incompleta no vuelve al pool: la siguiente reintenta el ATTACH.
+        assert pool.estadisticas()["abiertas"] == 0
+    finally:
+        pool.cerrar()
+
+
+def test_adjunto_en_directorio_nuevo(config_db, tmp_path):
+    outbox_path = tmp_path / "no" / "existe" / "outbox.db"
+    pool = SQLiteConnectionPool(config_db, adjuntos={"outbox": str(outbox_path)})
+    try:
+        OutboxRepositorySQLite(pool, esquema="outbox")
+        assert outbox_path.exists()
+    finally:
+        pool.cerrar()
@@ -0,0 +1,13 @@
+import os
+
+from src.infrastructure.perfil_arranque import medir_imports, modulos_diferidos_cargados, tiempo_import_ms
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRESUPUESTO_IMPORT_MS = 2500
+
+
+def test_import_main_dentro_del_presupuesto():
+    costos = medir_imports("main", RAIZ)
+
+    assert modulos_diferidos_cargados(costos) == []
+    assert tiempo_import_ms(costos, "main") <= PRESUPUESTO_IMPORT_MS
@@ -0,0 +1,150 @@
+import pytest
+
+from src.application.pricing import COSTO_ENVIO, PricingEngine
+from src.application.repositories import PastelConfigurado, PastelConfiguradoRepository
+from src.domain.pedido import Pedido
+from src.infrastructure.persistence.sqlite_pool import SQLiteConnectionPool
+from src.infrastructure.persistence.sqlite_repository import FinalizarPedidoRepositorySQLite
+from src.infrastructure.price_matrix import MatrizPrecios
+
+# Categoría 1, pan 1, forma 1, tamaño 1. La primera variante de (categoría, forma, tamaño) es la 10: es la
+# que devuelve obtener_configuracion para cualquier pan, igual que el repositorio SQLite.
+CONFIGURACIONES = [
+    PastelConfigurado(10, 1, 1, 1, 1, 300.0, 380.0, 100.0, "1 kg", "20 cm", "Vela"),
+    PastelConfigurado(11, 1, 2, 1, 1, 300.0, 0.0, 100.0, "1 kg", "20 cm", None),
+    PastelConfigurado(20, 1, 1, 1, 2, 650.0, 700.0, 150.0, "2 kg", "28 cm", None),
+]
+
+
+class PastelConfiguradoRepositoryMemoria(PastelConfiguradoRepository):
+    def __init__(self, configuraciones: list[PastelConfigurado]):
+        self.configuraciones = configuraciones
+        self.consultas = 0
+
+    def obtener_configuraciones(self, id_cat, id_pan, id_forma, id_tam) -> list[PastelConfigurado]:
+        self.consultas += 1
+        return [c for c in self.configuraciones
+                if (c.id_categoria, c.id_tipo_forma_seleccionada, c.id_tipo_tamano_seleccionado) == (id_cat, id_forma, id_tam)]
+
+    def obtener_configuracion(self, id_cat, id_pan, id_forma, id_tam) -> PastelConfigurado | None:
+        configuraciones = self.obtener_configuraciones(id_cat, id_pan, id_forma, id_tam)
+        return configuraciones[0] if configuraciones else None
+
+    def obtener_configuracion_por_id(self, id_config) -> PastelConfigurado | None:
+        self.consultas += 1
+        return next((c for c in self.configuraciones if c.id_pastel_configurado == id_config), None)
+
+
+@pytest.fixture
+def engine() -> PricingEngine:
+    return PricingEngine(PastelConfiguradoRepositoryMemoria(CONFIGURACIONES))
+
+
+def _pedido(id_pan=1, id_tamano=1, cobertura="Chantilly", extra=None, extra_precio=None, flores=None) -> Pedido:
+    pedido = Pedido()
+    pedido.reiniciar()
+    pedido.id_categoria, pedido.id_pan, pedido.id_forma, pedido.id_tamano = 1, id_pan, 1, id_tamano
+    pedido.tipo_cobertura = cobertura
+    pedido.extra_seleccionado = extra
+    pedido.extra_precio = extra_precio
+    pedido.extra_flor_cantidad = flores
+    return pedido
+
+
+def test_precio_base_sin_extras(engine):
+    cot = engine.cotizar(_pedido())
+
+    assert cot.id_pastel_configurado == 10
+    assert cot.precio_pastel == 300.0
+    assert cot.extra_costo == 0.0
+    assert cot.monto_deposito == 100.0
+
+
+def test_fondant_duplica_base_y_chocolate(engine):
+    cot = engine.cotizar(_pedido(cobertura="Fondant liso"))
+
+    assert cot.precio_base == 600.0
+    assert cot.precio_chocolate == 760.0
+    assert cot.precio_pastel == 600.0
+    assert engine.cotizar(_pedido(id_pan=2, cobertura="Fondant liso")).precio_pastel == 760.0
+    # El depósito no lleva recargo.
+    assert cot.monto_deposito == 100.0
+
+
+def test_pan_de_chocolate_cobra_precio_de_chocolate(engine):
+    assert engine.cotizar(_pedido(id_pan=2)).precio_pastel == 380.0
+    assert engine.cotizar(_pedido(id_pan=3)).precio_pastel == 300.0
+    # Sin precio de chocolate en la configuración se cobra el precio base.
+    pedido = _pedido(id_pan=2)
+    pedido.id_pastel_configurado = 11
+    assert engine.cotizar(pedido).precio_pastel == 300.0
+
+
+def test_flor_artificial_se_cobra_por_pieza(engine):
+    cot = engine.cotizar(_pedido(extra="Flor Artificial", extra_precio=25.0, flores=3))
+
+    assert (cot.extra_unitario, cot.extra_cantidad, cot.extra_costo) == (25.0, 3, 75.0)
+    assert cot.subtotal == 375.0
+    # Cualquier otro extra es una sola pieza aunque quede una cantidad de flores de antes.
+    assert engine.cotizar(_pedido(extra="Chorreado", extra_precio=40.0, flores=3)).extra_costo == 40.0
+
+
+def test_envio_solo_debajo_de_500(engine):
+    cot = engine.cotizar(_pedido())
+    assert cot.costo_envio == COSTO_ENVIO == 50.0
+    assert cot.total == 300.0 + 50.0 + 100.0
+
+    # Pastel + extras en 499.99 todavía paga envío; en 500 exactos ya no.
+    assert engine.cotizar(_pedido(extra="Chorreado", extra_precio=199.99)).costo_envio == 50.0
+    cot = engine.cotizar(_pedido(extra="Chorreado", extra_precio=200.0))
+    assert cot.costo_envio == 0.0
+    assert cot.total == 500.0 + 100.0
+    assert engine.cotizar(_pedido(id_tamano=2)).costo_envio == 0.0
+
+
+def test_cotizacion_memorizada_por_clave(engine):
+    engine.cotizar(_pedido())
+    engine.cotizar(_pedido())
+    assert engine.pastel_config_repo.consultas == 1
+    assert engine.estadisticas()["aciertos"] == 1
+
+    engine.invalidar()
+    engine.cotizar(_pedido())
+    assert engine.pastel_config_repo.consultas == 2
+
+
+@pytest.mark.parametrize("pedido", [
+    _pedido(),
+    _pedido(id_pan=2, cobertura="Fondant", extra="Flor Artificial", extra_precio=25.0, flores=4),
+    _pedido(id_tamano=2, extra="Chorreado", extra_precio=40.0),
+], ids=["sencillo", "fondant-chocolate-flores", "sin-envio"])
+def test_ticket_guardado_da_la_misma_cotizacion(engine, config_db, id_categoria, pedido):
+    pool = SQLiteConnectionPool(config_db)
+    try:
+        repo = FinalizarPedidoRepositorySQLite(pool)
+        cot = engine.cotizar(pedido)
+        PricingEngine.aplicar(pedido, cot)
+        pedido.id_categoria = id_categoria  # la categoría debe existir en config.db para leer el ticket
+
+        ticket = repo.obtener_por_id(repo.guardar(pedido))
+        cot_ticket = PricingEngine.cotizar_ticket(ticket)
+    finally:
+        pool.cerrar()
+
+    assert cot_ticket.lineas() == cot.lineas()
+    assert cot_ticket.total == cot.total
+    assert (cot_ticket.extra_unitario, cot_ticket.extra_cantidad) == (cot.extra_unitario, cot.extra_cantidad)
+
+
+@pytest.mark.parametrize("pedido", [
+    _pedido(),
+    _pedido(id_pan=2, cobertura="Fondant", extra="Flor Artificial", extra_precio=25.0, flores=2),
+    _pedido(id_tamano=2),
+], ids=["sencillo", "fondant-chocolate-flores", "sin-envio"])
+def test_matriz_da_la_misma_cotizacion_que_el_repositorio(engine, pedido):
+    desde_repositorio = engine.cotizar(pedido)
+
+    con_matriz = PricingEngine(PastelConfiguradoRepositoryMemoria([]))
+    con_matriz.usar_matriz(MatrizPrecios.construir(CONFIGURACIONES))
+
+    assert con_matriz.cotizar(pedido) == desde_repositorio
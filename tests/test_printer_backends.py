@@ -0,0 +1,53 @@
+from src.infrastructure.printer_backends import ImpresoraEscPos, SalidaArchivo, crear_salida
+from src.infrastructure.ticket_template import ContenidoTicket
+
+ESC = b"\x1b"
+GS = b"\x1d"
+
+
+def _contenido() -> ContenidoTicket:
+    return ContenidoTicket(
+        id_pedido=42,
+        folio="00300042",
+        valores={"nombre_cliente": "José Núñez", "fecha_entrega": "20/10/2026", "hora_entrega": "10:00 - 12:00",
+                 "nombre_categoria": "Cumpleaños", "tipo_pan": "Vainilla", "tipo_forma": "Redondo",
+                 "tipo_relleno": "Fresa", "tipo_cobertura": "Chantilly", "tamano_pastel": "20"},
+        precios=[("Pastel", 480.0), ("Envío", 50.0)],
+        total=530.0,
+    )
+
+
+def test_escpos_a_archivo(tmp_path):
+    ruta = tmp_path / "ticket.bin"
+    impresora = ImpresoraEscPos(SalidaArchivo(str(ruta)))
+
+    destino = impresora.imprimir(_contenido())
+    datos = ruta.read_bytes()
+
+    assert destino == str(ruta)
+    # Inicializa la impresora y elige la tabla de caracteres WPC1252.
+    assert datos.startswith(ESC + b"@" + ESC + b"t" + bytes([16]))
+    # Code128 en modo B: GS k 73 <largo de los datos> "{B" + folio.
+    code128 = b"{B00300042"
+    assert GS + b"k" + bytes([73, len(code128)]) + code128 in datos
+    # Acentos y signos en cp1252, no en UTF-8.
+    assert "Cliente: José Núñez\n".encode("cp1252") in datos
+    assert "¡Pedido Confirmado!".encode("cp1252") in datos
+    assert "José".encode("utf-8") not in datos
+    # Renglón de precio alineado a 48 columnas y el total.
+    assert b"Pastel:" + b" " * (48 - len("Pastel:") - len("$480.00")) + b"$480.00\n" in datos
+    assert b"$530.00" in datos
+    # Termina avanzando y cortando el papel.
+    assert datos.endswith(GS + b"V" + bytes([66, 3]))
+
+
+def test_salida_archivo_agrega_o_reemplaza(tmp_path):
+    ruta = tmp_path / "lp0"
+    impresora = ImpresoraEscPos(crear_salida(f"archivo:{ruta}"))
+    impresora.imprimir(_contenido())
+    impresora.imprimir(_contenido())
+    un_ticket = len(impresora.renderizar(_contenido()))
+    assert len(ruta.read_bytes()) == un_ticket
+
+    ImpresoraEscPos(SalidaArchivo(str(ruta), agregar=True)).imprimir(_contenido())
+    assert len(ruta.read_bytes()) == 2 * un_ticket
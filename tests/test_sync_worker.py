@@ -0,0 +1,86 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.infrastructure.api_stub_server import ApiStubServer
+from src.infrastructure.persistence.api_repository import FinalizarPedidoRepositoryAPI
+from src.infrastructure.persistence.outbox_repository import OutboxRepositorySQLite
+from src.infrastructure.persistence.sqlite_pool import SQLiteConnectionPool
+from src.infrastructure.sync_worker import OutboxSyncWorker
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    pool = SQLiteConnectionPool(str(tmp_path / "outbox.db"))
+    yield OutboxRepositorySQLite(pool)
+    pool.cerrar()
+
+
+@pytest.fixture
+def servidor(request):
+    opciones = getattr(request, "param", {})
+    stub = ApiStubServer(puerto=0, **opciones).iniciar()
+    yield stub
+    stub.detener()
+
+
+def _worker(outbox, stub) -> OutboxSyncWorker:
+    api_repo = FinalizarPedidoRepositoryAPI(stub.url, SimpleNamespace(id_sucursal=3))
+    return OutboxSyncWorker(outbox, api_repo, backoff_base_seg=60.0)
+
+
+def _encolar(outbox, cantidad: int):
+    for id_pedido in range(1, cantidad + 1):
+        outbox.encolar(id_pedido, {"id": id_pedido, "nSucursalPK": 3, "total": 100.0 * id_pedido})
+
+
+def test_lote_aceptado_en_una_peticion(outbox, servidor):
+    _encolar(outbox, 5)
+    worker = _worker(outbox, servidor)
+
+    assert worker.procesar_pendientes() == 5
+    assert servidor.peticiones == 1
+    assert servidor.lotes_recibidos == 1
+    assert len(servidor.pedidos) == 5
+    assert outbox.profundidad() == 0
+
+
+@pytest.mark.parametrize("servidor", [{"acepta_lotes": False}], indirect=True)
+def test_lote_no_soportado_cae_a_envio_individual(outbox, servidor):
+    _encolar(outbox, 3)
+    worker = _worker(outbox, servidor)
+
+    assert worker.procesar_pendientes() == 3
+    assert servidor.lotes_recibidos == 0
+    assert servidor.peticiones == 1 + 3  # el lote rechazado con 404 y luego un POST por pedido
+    assert outbox.profundidad() == 0
+    assert not worker.api_repo.lote_disponible()
+
+
+def test_409_cuenta_como_enviado(outbox, servidor):
+    _encolar(outbox, 1)
+    worker = _worker(outbox, servidor)
+    # El servidor ya recibió el pedido, pero la respuesta se perdió: el reenvío con la misma clave da 409.
+    mensaje = outbox.obtener_vencidos()[0]
+    assert worker.api_repo.enviar_payload(mensaje.payload, mensaje.clave_idempotencia).exito
+
+    assert worker.procesar_pendientes() == 1
+    assert len(servidor.pedidos) == 1
+    assert outbox.profundidad() == 0
+    assert worker.fallidos == 0
+
+
+@pytest.mark.parametrize("servidor", [{"falla_cada": 1}], indirect=True)
+def test_503_en_lote_espera_el_backoff_sin_reenviar_uno_por_uno(outbox, servidor):
+    _encolar(outbox, 4)
+    worker = _worker(outbox, servidor)
+
+    assert worker.procesar_pendientes() == 0
+    assert servidor.peticiones == 1
+    assert worker.fallidos == 4
+    # Todo el lote queda pendiente y fuera de la ventana actual: la siguiente pasada no manda nada.
+    assert outbox.profundidad() == 4
+    assert outbox.proximo_vencimiento() > time.time() + 30
+    assert worker.procesar_pendientes() == 0
+    assert servidor.peticiones == 1